@@ -0,0 +1,250 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from forecasting import SERIES_KEYS, monthly_series
+from metrics import stage
+
+
+# ==================================================
+# STREAMING SERIES ANOMALY DETECTION
+# ==================================================
+# Every City x Crime Domain series is scored on its latest (current)
+# month against a rolling window of the `window` months before it:
+#
+#   z = (count this month - window mean) / window std
+#
+# The window mean and sum of squared deviations (M2) are kept per series
+# with Welford-style updates, in parallel NumPy arrays indexed by series:
+#
+#   * a new incident in the current month bumps one count          O(1)
+#   * a late incident inside the window replaces one window value,
+#     shifting that series' mean / M2 in place                     O(1)
+#   * the first incident of a new month slides every series' window
+#     by one month (add the closed month, drop the oldest)  O(series)
+#
+# so history is never rescanned after the initial build, which is taken
+# once per data version from the count cube's monthly matrix. Incidents
+# older than the window only change history that is no longer scored.
+
+ANOMALY_WINDOW = 12
+ANOMALY_Z = 3.0
+
+# Windows shorter than this are not scored
+MIN_WINDOW_MONTHS = 3
+
+# Std floor: on count data a difference under one incident is never
+# anomalous on its own (and a flat series would divide by zero)
+MIN_STD = 1.0
+
+
+class WindowStats:
+    """Rolling-window mean / M2 and current-month counts for many series."""
+
+    def __init__(self, keys, ordinals, Y, window=ANOMALY_WINDOW):
+        self.window = window
+        self.keys = keys.reset_index(drop=True)
+        self._index = {tuple(k): i for i, k in enumerate(self.keys.itertuples(index=False))}
+        n = len(self.keys)
+
+        # Ring buffer: month m of the window lives in column m % window
+        self.buffer = np.zeros((n, window))
+        if len(ordinals) == 0:
+            self.month = None
+            self.current = np.zeros(n)
+            self.n = 0
+            self.mean = np.zeros(n)
+            self.m2 = np.zeros(n)
+            return
+
+        self.month = int(ordinals[-1])
+        self.current = Y[:, -1].astype(np.float64)
+        past = Y[:, :-1][:, -window:]
+        past_months = ordinals[:-1][-window:]
+        self.buffer[:, past_months % window] = past
+
+        # Same values a sequence of Welford updates would reach
+        self.n = past.shape[1]
+        self.mean = past.mean(axis=1) if self.n else np.zeros(n)
+        self.m2 = ((past - self.mean[:, None]) ** 2).sum(axis=1) if self.n else np.zeros(n)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def copy(self):
+        """Independent copy (updates go to a copy, see AnomalyDetector)."""
+        other = object.__new__(WindowStats)
+        other.__dict__.update(self.__dict__)
+        other._index = dict(self._index)
+        for name in ("buffer", "current", "mean", "m2"):
+            setattr(other, name, getattr(self, name).copy())
+        return other
+
+    # ---- Series lookup ----
+    def _series(self, keys):
+        """Series index for every (city, domain) key, adding unseen series."""
+        new = [k for k in dict.fromkeys(keys) if k not in self._index]
+        if new:
+            start = len(self.keys)
+            self.keys = pd.concat(
+                [self.keys, pd.DataFrame(new, columns=SERIES_KEYS)],
+                ignore_index=True
+            )
+            for i, k in enumerate(new):
+                self._index[k] = start + i
+            grow = len(new)
+            self.buffer = np.vstack([self.buffer, np.zeros((grow, self.window))])
+            self.current = np.concatenate([self.current, np.zeros(grow)])
+            self.mean = np.concatenate([self.mean, np.zeros(grow)])
+            self.m2 = np.concatenate([self.m2, np.zeros(grow)])
+        return np.array([self._index[k] for k in keys], dtype=np.int64)
+
+    # ---- Online updates ----
+    def _advance(self):
+        # The current month closes and enters the window; once the window
+        # is full the oldest month leaves it in the same step
+        slot = self.month % self.window
+        x_new = self.current
+        if self.n < self.window:
+            self.n += 1
+            delta = x_new - self.mean
+            self.mean = self.mean + delta / self.n
+            self.m2 = self.m2 + delta * (x_new - self.mean)
+        else:
+            x_old = self.buffer[:, slot]
+            mean = self.mean + (x_new - x_old) / self.n
+            self.m2 = self.m2 + (x_new - x_old) * (x_new - mean + x_old - self.mean)
+            self.mean = mean
+        self.buffer[:, slot] = x_new
+        self.current = np.zeros(len(self.keys))
+        self.month += 1
+
+    def _bump_window(self, series, month, counts):
+        # Late incidents: window value x -> x + c for each series
+        slot = month % self.window
+        x_old = self.buffer[series, slot]
+        x_new = x_old + counts
+        mean_old = self.mean[series]
+        mean = mean_old + counts / self.n
+        self.m2[series] += counts * (x_new - mean + x_old - mean_old)
+        self.mean[series] = mean
+        self.buffer[series, slot] = x_new
+
+    def add(self, cities, domains, months, counts):
+        """Adds incident counts per (city, domain, month ordinal) cell.
+
+        Cells must be unique (one row per series and month).
+        """
+        series = self._series(list(zip(cities, domains)))
+        months = np.asarray(months, dtype=np.int64)
+        counts = np.asarray(counts, dtype=np.float64)
+        if len(months) == 0:
+            return 0
+
+        if self.month is None:
+            self.month = int(months.min())
+        # New months first, so every cell is current, in the window or older
+        for _ in range(min(int(months.max()) - self.month, self.window + 1)):
+            self._advance()
+        if months.max() > self.month:
+            # Jumped further than a whole window: only zeros remain in it
+            self.month = int(months.max())
+
+        current = months == self.month
+        np.add.at(self.current, series[current], counts[current])
+
+        in_window = (months < self.month) & (months >= self.month - self.n)
+        for month in np.unique(months[in_window]):
+            cells = in_window & (months == month)
+            self._bump_window(series[cells], int(month), counts[cells])
+
+        # Cells older than the window are not scored any more
+        return int(counts[~current & ~in_window].sum())
+
+    # ---- Scores ----
+    def std(self):
+        if self.n < 2:
+            return np.zeros(len(self.keys))
+        return np.sqrt(np.clip(self.m2, 0, None) / (self.n - 1))
+
+    def scores(self):
+        if self.n < MIN_WINDOW_MONTHS:
+            return np.zeros(len(self.keys))
+        return (self.current - self.mean) / np.maximum(self.std(), MIN_STD)
+
+
+def _batch_cells(batch):
+    # Incident counts per (city, domain, month) cell of appended rows
+    rows = batch.dropna(subset=SERIES_KEYS + ["Year", "Month"])
+    if rows.empty:
+        return [], [], np.empty(0, dtype=np.int64), np.empty(0)
+    counts = rows.groupby(SERIES_KEYS + ["Year", "Month"], observed=True).size()
+    index = counts.index
+    months = (
+        index.get_level_values("Year").to_numpy(dtype=np.int64) * 12
+        + index.get_level_values("Month").to_numpy(dtype=np.int64) - 1
+    )
+    return (
+        index.get_level_values("City").tolist(),
+        index.get_level_values("Crime Domain").tolist(),
+        months,
+        counts.to_numpy()
+    )
+
+
+class AnomalyDetector:
+    """WindowStats for a CrimeCube's dataset, kept current across appends.
+
+    Built from the cube once per data version; apply_batch folds appended
+    rows in with online updates instead of a rebuild.
+
+    A published WindowStats is never modified: an append updates a copy
+    and swaps the single (version, stats) reference, so request threads
+    holding the previous one keep reading consistent arrays.
+    """
+
+    def __init__(self, crime_cube, window=ANOMALY_WINDOW):
+        self.crime_cube = crime_cube
+        self.window = window
+        self._state = (None, None)      # (version, WindowStats)
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self._state[0]
+
+    def get(self):
+        return self.state()[1]
+
+    def state(self):
+        """(data version, WindowStats) of the current data, as one pair."""
+        version = self.crime_cube.dataset.current_version()
+        state = self._state
+        if version == state[0]:
+            return state
+
+        with self._lock:
+            state = self._state
+            if version != state[0]:
+                keys, ordinals, Y = monthly_series(self.crime_cube.get())
+                with stage("anomaly_build", rows=len(keys)):
+                    state = (version, WindowStats(keys, ordinals, Y, self.window))
+                self._state = state
+        return state
+
+    def apply_batch(self, batch, previous_version, version):
+        """Folds newly appended rows into the window statistics.
+
+        Only valid when the detector is current for ``previous_version``;
+        otherwise it is left stale and the next get() rebuilds it.
+        """
+        with self._lock:
+            current_version, stats = self._state
+            if stats is None or current_version != previous_version:
+                return None
+            with stage("anomaly_update", rows=len(batch)):
+                stats = stats.copy()
+                stats.add(*_batch_cells(batch))
+            self._state = (version, stats)
+        return stats
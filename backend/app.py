@@ -1,15 +1,42 @@
+import io
 import os
+import time
+APP_IMPORT_START = time.perf_counter()
+import importlib
+from functools import partial, wraps
 import pandas as pd
-import joblib
-from flask import Flask, render_template, jsonify
+from flask import Flask, Response, render_template, jsonify, request, stream_with_context
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import confusion_matrix
-from sklearn.ensemble import GradientBoostingRegressor
-from sklearn.metrics import roc_curve, auc
-from sklearn.linear_model import LogisticRegression
+from dataset import CrimeDataset, ingest_csv
+from columnar import read_store
+from streaming import DEFAULT_CHUNK_SIZE, STREAM_COLUMNS, StreamingCrimeSource
+from http_cache import ResponseCache
+from metrics import init_metrics, metrics, stage
+from cube_index import FILTER_DIMENSIONS, MONTH, CubeIndexCache, frame_mask, parse_month
+from binning import AGE_BIN_WIDTH, distribution_summary, integer_counts
+from cube import CrimeCube, CubeSnapshot, DAY_NAMES, filter_notna, rollup, write_cube
+from classifiers import (
+    DEFAULT_LOCATION_SCENARIO,
+    TRAINING_BACKENDS,
+    score_location_grid,
+    score_location_rows,
+    train_category_model,
+    train_location_model,
+    unknown_cities
+)
+from anomalies import ANOMALY_Z, AnomalyDetector
+from forecasting import FORECAST_HORIZON, ForecastCache, month_label
+from geo import Gazetteer
+from maptiles import GRID, MAX_TILES, MAX_ZOOM, MapTiles, tile_bounds, tile_range
+from recurrence import RECURRENCE_DAYS, RISK_HORIZON_DAYS, RecurrenceCache, events_from_chunks
+from incremental import train_category_model_incremental, train_location_model_incremental
+from model_registry import ModelRegistry
+from jobs import FAILED, JobQueue
+from batching import MicroBatcher
+from case_closure import encode_case_closure_records, encoders_from_classes, fit_case_closure_encoders
+from model_artifacts import load_model_artifact, read_artifact_meta
+from startup import Lazy, Warmup
+MODULES_IMPORTED = time.perf_counter()
 
 
 # ==================================================
@@ -17,9 +44,58 @@ from sklearn.linear_model import LogisticRegression
 # ==================================================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-DATA_DIR = os.path.join(BASE_DIR, "data")
+# CRIME_DATA_DIR points the app at another dataset (e.g. benchmark data)
+DATA_DIR = os.environ.get("CRIME_DATA_DIR", os.path.join(BASE_DIR, "data"))
 CRIME_DATA = os.path.join(DATA_DIR, "crime_dataset_india.csv")
 
+# Typed columnar copy of CRIME_DATA (built with `python manage.py ingest`)
+CRIME_STORE = os.path.join(DATA_DIR, "crime_store")
+CRIME_STORE_MMAP = os.environ.get("CRIME_STORE_MMAP", "0") == "1"
+
+# Pre-aggregated count cube (built at ingest, rebuilt on version change)
+CRIME_CUBE = os.path.join(DATA_DIR, "crime_cube")
+
+# Streaming mode: aggregate endpoints walk CRIME_DATA in chunks instead
+# of holding it in memory (for histories larger than the worker's RAM)
+CRIME_STREAMING = os.environ.get("CRIME_STREAMING", "0") == "1"
+CRIME_CHUNK_SIZE = int(os.environ.get("CRIME_CHUNK_SIZE", DEFAULT_CHUNK_SIZE))
+
+# In-memory LRU of serialized API responses (per worker)
+RESPONSE_CACHE_MB = int(os.environ.get("RESPONSE_CACHE_MB", "64"))
+
+# Directory where every process writes its metrics so /metrics can sum
+# them (set by gunicorn.conf.py; unset = this process only)
+METRICS_DIR = os.environ.get("CRIME_METRICS_DIR")
+
+# Background job processes (0 = run jobs inline in the request thread)
+CRIME_JOB_WORKERS = int(os.environ.get("CRIME_JOB_WORKERS", "2"))
+
+# Columns the API actually reads (free text is never loaded from the store)
+CRIME_COLUMNS = [
+    "Report Number",
+    "Date Reported",
+    "City",
+    "Victim Age",
+    "Victim Gender",
+    "Crime Domain",
+    "Police Deployed",
+    "Weapon Used",
+    "Case Closed",
+    "Year",
+    "Month",
+    "weekday",
+    "Day",
+    "hour",
+    "Victim Gender Label"
+]
+
+# City coordinates for the maps and spatial queries (reference data,
+# independent of CRIME_DATA_DIR)
+CITY_GAZETTEER = os.environ.get(
+    "CITY_GAZETTEER",
+    os.path.join(BASE_DIR, "data", "city_coords.csv")
+)
+
 # Model directory (relative path for deployment)
 MODEL_DIR = os.path.join(BASE_DIR, "models")
 FORECAST_MODEL_PATH = os.path.join(
@@ -27,15 +103,323 @@ FORECAST_MODEL_PATH = os.path.join(
     "final_crime_case_prediction_model.joblib"
 )
 
+# Same model exported as an mmap-loadable artifact with metadata
+# (built with `python manage.py export-model`)
+CASE_CLOSURE_ARTIFACT = os.path.join(MODEL_DIR, "case_closure")
+MODEL_MMAP = os.environ.get("MODEL_MMAP", "1") == "1"
+# Serve tree ensembles from flat node arrays instead of sklearn objects
+FLAT_INFERENCE = os.environ.get("FLAT_INFERENCE", "1") == "1"
+
+# Models trained from the dataset, persisted per data version
+MODEL_REGISTRY_DIR = os.environ.get(
+    "MODEL_REGISTRY_DIR",
+    os.path.join(MODEL_DIR, "registry")
+)
+# Job records shared by the workers (status URLs work on any worker)
+JOB_STORE_PATH = os.path.join(MODEL_REGISTRY_DIR, "jobs.sqlite3")
+
+# Training backend for the classification models: exact (RandomForest /
+# GradientBoosting), hist (HistGradientBoosting) or incremental
+# (chunked SGD with bounded memory); see classifiers.py
+MODEL_BACKEND = os.environ.get("MODEL_BACKEND", "exact")
+if MODEL_BACKEND not in TRAINING_BACKENDS:
+    print(f"⚠️ Unknown MODEL_BACKEND {MODEL_BACKEND!r}, using exact")
+    MODEL_BACKEND = "exact"
+
+# Startup mode (see startup.py). Nothing heavy loads at import in any
+# mode; the modes differ in when the warmup runs:
+#   eager       inline before serving (the gunicorn master before
+#               forking, or `python app.py` before app.run())
+#   background  in a background thread of each worker once it starts
+#   lazy        on first use; the first /readyz probe starts the warmup
+# Under any other WSGI host /readyz starts the warmup if nothing has.
+STARTUP_MODES = ("eager", "background", "lazy")
+STARTUP_MODE = os.environ.get("STARTUP_MODE", "eager")
+if STARTUP_MODE not in STARTUP_MODES:
+    print(f"⚠️ Unknown STARTUP_MODE {STARTUP_MODE!r}, using eager")
+    STARTUP_MODE = "eager"
+
+# Modules the request path imports on first use, warmed with the data
+DEFERRED_IMPORTS = [
+    "joblib",
+    "sklearn.linear_model",
+    "sklearn.metrics",
+    "sklearn.neighbors"
+]
+
+# ==================================================
+# LOAD DATASET ONCE (PER WORKER)
+# ==================================================
+crime_data = CrimeDataset(
+    CRIME_DATA,
+    store_path=CRIME_STORE,
+    columns=CRIME_COLUMNS,
+    mmap=CRIME_STORE_MMAP
+)
+if CRIME_STREAMING:
+    crime_stream = StreamingCrimeSource(CRIME_DATA, chunk_size=CRIME_CHUNK_SIZE)
+    crime_cube = CrimeCube(crime_stream, cube_path=CRIME_CUBE, builder=crime_stream.build_cube)
+else:
+    crime_stream = None
+    crime_cube = CrimeCube(crime_data, cube_path=CRIME_CUBE)
+
+# Inverted index over the cube for filtered queries
+crime_index = CubeIndexCache(crime_cube)
+
+# City gazetteer with a haversine BallTree
+gazetteer = Gazetteer(CITY_GAZETTEER)
+
+# Zoom-level map clusters per tile, built once per data version
+map_tiles = MapTiles(crime_cube, gazetteer)
+
+# City x Crime Domain monthly forecasts, refit once per data version
+crime_forecasts = ForecastCache(crime_cube)
+
+# City x Crime Domain monthly anomaly scores, updated online on append
+crime_anomalies = AnomalyDetector(crime_cube)
+
+# Inter-arrival times and survival curves, rebuilt once per data version
+if CRIME_STREAMING:
+    crime_recurrence = RecurrenceCache(
+        crime_stream,
+        builder=lambda: events_from_chunks(crime_stream.iter_chunks())
+    )
+else:
+    crime_recurrence = RecurrenceCache(crime_data)
+
+# ==================================================
+# MODEL REGISTRY (TRAIN ONCE PER DATA VERSION)
+# ==================================================
+model_registry = ModelRegistry(crime_data, MODEL_REGISTRY_DIR)
+if MODEL_BACKEND == "incremental":
+    # Trained from CRIME_DATA chunk by chunk, never from the full frame
+    training_chunks = crime_stream or StreamingCrimeSource(CRIME_DATA, chunk_size=CRIME_CHUNK_SIZE)
+    model_registry.register(
+        "crime_category", train_category_model_incremental,
+        backend=MODEL_BACKEND, chunks=training_chunks
+    )
+    model_registry.register(
+        "location_risk", train_location_model_incremental,
+        backend=MODEL_BACKEND, chunks=training_chunks
+    )
+else:
+    model_registry.register(
+        "crime_category", partial(train_category_model, backend=MODEL_BACKEND),
+        backend=MODEL_BACKEND
+    )
+    model_registry.register(
+        "location_risk", partial(train_location_model, backend=MODEL_BACKEND),
+        backend=MODEL_BACKEND
+    )
+model_registry.register("case_closure_encoders", fit_case_closure_encoders)
+
+# ==================================================
+# BACKGROUND JOBS (PROCESS POOL)
+# ==================================================
+job_queue = JobQueue(max_workers=CRIME_JOB_WORKERS, store_path=JOB_STORE_PATH)
+
+
+# Job tasks run in pool processes, which import this module once and
+# keep their own dataset/registry. Results are written to the shared
+# registry/cube directories, where request workers pick them up.
+def run_model_training(name):
+    bundle = model_registry.train(name)
+    return {
+        "model": name,
+        "backend": bundle["backend"],
+        "version": bundle["version"],
+        "train_seconds": bundle["train_seconds"],
+        "metrics": bundle["metrics"]
+    }
+
+
+def run_cube_build():
+    cube = crime_cube.get()
+    return {"cells": int(len(cube)), "version": crime_cube.version}
+
+
+def submit_model_training(name):
+    version = crime_data.current_version()
+    return job_queue.submit("train", run_model_training, name, key=("train", name, version))
+
+
+def submit_cube_build():
+    version = (crime_stream or crime_data).current_version()
+    return job_queue.submit("cube", run_cube_build, key=("cube", version))
+
+
+def job_accepted(job):
+    # 202 pointing the client at the job to poll
+    response = jsonify({"job": job.to_dict(), "status_url": f"/api/jobs/{job.id}"})
+    response.status_code = 202
+    response.headers["Location"] = f"/api/jobs/{job.id}"
+    return response
+
+
+def job_response(job):
+    # Result (200) or error (500) of a finished job, 202 while it runs.
+    # Inline jobs (CRIME_JOB_WORKERS=0) are finished on submit.
+    if not job.finished:
+        return job_accepted(job)
+    if job.status == FAILED:
+        return jsonify({"job": job.to_dict(), "error": job.error}), 500
+    return jsonify({"job": job.to_dict(), "result": job.result()})
+
+
+def trained_model(name):
+    # (bundle, None), or (None, 202 response) while its training job
+    # runs. Inline training has finished by the time submit returns,
+    # so the caller answers at once instead of sending it to poll.
+    bundle = model_registry.peek(name)
+    if bundle is not None:
+        return bundle, None
+
+    job = submit_model_training(name)
+    if job.finished:
+        job.result()  # raises the training error
+        bundle = model_registry.peek(name)
+        if bundle is not None:
+            return bundle, None
+    return None, job_accepted(job)
+
+
+def append_crime_records(records):
+    # Appends new incident rows and updates every derived aggregate in
+    # place: the count cube and the anomaly window statistics absorb
+    # just the new rows, registry models retrain lazily on the new data
+    # version.
+    if crime_stream is not None:
+        # The streamed cube is versioned by the CSV, not the store, so
+        # appended rows would never reach it
+        raise RuntimeError(
+            "Incremental append is not available with CRIME_STREAMING=1; "
+            "append to the CSV instead"
+        )
+
+    crime_cube.get()
+    crime_anomalies.get()
+    previous_version = crime_data.current_version()
+
+    added = crime_data.append(records)
+    if not added.empty:
+        crime_cube.apply_batch(added, previous_version, crime_data.version)
+        crime_anomalies.apply_batch(added, previous_version, crime_data.version)
+
+    return {
+        "received": int(len(records)),
+        "added": int(len(added)),
+        "duplicates": int(len(records) - len(added)),
+        "version": crime_data.version
+    }
+
+# ==================================================
+# WARMUP (SHARED PRELOAD / BACKGROUND)
+# ==================================================
+def build_crime_store():
+    # Columnar store + cube, when the CSV changed since the last ingest
+    if not crime_data.store_is_current():
+        meta = ingest_csv(CRIME_DATA, CRIME_STORE)
+        write_cube(read_store(CRIME_STORE), CRIME_CUBE, meta["source"]["version"])
+        print(f"✅ Columnar store built for preload ({meta['rows']} rows)")
+
+
+def warm_registry_models():
+    for name in model_registry.names():
+        model_registry.peek(name)
+
+
+warmup = Warmup()
+warmup.step("imports", lambda: [importlib.import_module(m) for m in DEFERRED_IMPORTS])
+if not CRIME_STREAMING:
+    warmup.step("store", build_crime_store)
+    warmup.step("dataset", crime_data.frame)
+warmup.step("cube", crime_cube.get)
+warmup.step("index", crime_index.get)
+warmup.step("forecasts", crime_forecasts.get)
+warmup.step("anomalies", crime_anomalies.get)
+warmup.step("recurrence", crime_recurrence.get)
+warmup.step("map_tiles", map_tiles.index)
+warmup.step("gazetteer", lambda: gazetteer.tree)
+warmup.step("registry_models", warm_registry_models)
+# case_closure_model is defined below; looked up when the step runs
+warmup.step("case_closure_model", lambda: case_closure_model.get())
+
+
+def preload_shared_data():
+    # Runs once in the gunicorn master before workers fork (see
+    # gunicorn.conf.py). With the store memory-mapped every worker maps
+    # the same page-cache pages instead of parsing its own copy; what
+    # else is loaded here is shared copy-on-write after the fork.
+    warmup.run()
+
 # ==================================================
 # LOAD MODEL ONCE
 # ==================================================
-try:
-    forecast_model = joblib.load(FORECAST_MODEL_PATH)
-    print("✅ Forecast model loaded successfully")
-except Exception as e:
-    forecast_model = None
-    print("❌ Forecast model load failed:", e)
+def load_case_closure_model():
+    # Prefers the exported artifact; falls back to the notebook's file
+    if read_artifact_meta(CASE_CLOSURE_ARTIFACT) is not None:
+        return load_model_artifact(CASE_CLOSURE_ARTIFACT, mmap=MODEL_MMAP, flat=FLAT_INFERENCE)
+
+    import joblib
+
+    start = time.perf_counter()
+    model = joblib.load(FORECAST_MODEL_PATH)
+    return model, {
+        "estimator": type(model).__name__,
+        "features": list(getattr(model, "feature_names_in_", [])) or None,
+        "encoder_classes": {},
+        "data_version": None,
+        "bytes": os.path.getsize(FORECAST_MODEL_PATH),
+        "load_seconds": round(time.perf_counter() - start, 3),
+        "mmap": False,
+        "engine": "sklearn"
+    }
+
+def load_case_closure():
+    # (model, meta, encoders). Encoder classes recorded with the model
+    # pin the encoding it was trained with; without them they are refit
+    # from the current data (encoders None).
+    try:
+        model, meta = load_case_closure_model()
+    except Exception as e:
+        print("❌ Forecast model load failed:", e)
+        raise
+    print(f"✅ Forecast model loaded ({meta['bytes'] / 1e6:.1f} MB "
+          f"in {meta['load_seconds']}s, {meta['engine']} engine, "
+          f"mmap={meta['mmap']}, "
+          f"data version {meta['data_version']})")
+
+    encoders = (
+        encoders_from_classes(meta["encoder_classes"])
+        if meta["encoder_classes"] else None
+    )
+    return model, meta, encoders
+
+
+case_closure_model = Lazy(load_case_closure)
+
+
+def loaded_case_closure():
+    # (model, meta, encoders), or None if the model could not be loaded
+    try:
+        return case_closure_model.get()
+    except Exception:
+        return None
+
+
+def predict_case_closure(X):
+    # Probability of is_case_closed == 1
+    model = case_closure_model.get()[0]
+    closed = list(model.classes_).index(1)
+    return model.predict_proba(X)[:, closed]
+
+
+# Coalesces concurrent prediction requests into one predict_proba call
+case_closure_batcher = MicroBatcher(
+    predict_case_closure,
+    max_rows=int(os.environ.get("CASE_CLOSURE_BATCH_ROWS", "4096")),
+    max_wait=float(os.environ.get("CASE_CLOSURE_BATCH_WAIT_MS", "5")) / 1000
+)
 
 # ==================================================
 # FLASK APP CONFIG
@@ -46,6 +430,16 @@ app = Flask(
     static_folder=os.path.join(BASE_DIR, "..", "frontend", "static"),
     static_url_path="/static"
 )
+init_metrics(app, METRICS_DIR)
+
+# ==================================================
+# RESPONSE CACHE (KEYED ON DATASET VERSION)
+# ==================================================
+response_cache = ResponseCache(
+    (crime_stream or crime_data).current_version,
+    (crime_stream or crime_data).last_modified,
+    max_bytes=RESPONSE_CACHE_MB * 1024 * 1024
+)
 
 # ==================================================
 # AUTH / HOME
@@ -58,76 +452,259 @@ def login_page():
 def home_page():
     return render_template("home.html")
 
+# ==================================================
+# QUERY FILTERS
+# ==================================================
+def query_list(name):
+    # ?city=Delhi&city=Mumbai or ?city=Delhi,Mumbai
+    return [v.strip() for arg in request.args.getlist(name) for v in arg.split(",") if v.strip()]
+
+
+def crime_filters():
+    # ?city=&domain=&gender= (lists) and ?start=&end= (YYYY-MM[-DD],
+    # inclusive, by reported month); raises ValueError on a bad date
+    filters = {name: query_list(name) for name in FILTER_DIMENSIONS}
+    start, end = (request.args.get(k, "").strip() for k in ("start", "end"))
+    filters[MONTH] = (parse_month(start) if start else None, parse_month(end) if end else None)
+    return filters
+
+
+def crime_filtered(view):
+    # Passes the parsed filters to the view; 400 on an invalid date
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            filters = crime_filters()
+        except ValueError as e:
+            return jsonify({"error": f"start / end must be YYYY-MM or YYYY-MM-DD: {e}"}), 400
+        return view(filters, *args, **kwargs)
+    return wrapper
+
+
+def filtered_cube(filters):
+    # Cube cells matching the filters, from the inverted index
+    return crime_index.get().filter(filters)
+
+
+def crime_snapshot(filters):
+    # Filtered cube with rollups shared by every panel of the request
+    return CubeSnapshot(filtered_cube(filters))
+
+
 # ==================================================
 # DASHBOARD API
 # ==================================================
+def dashboard_payload(snapshot):
+    total_records = int(snapshot.cube["count"].sum())
+    top_cities = snapshot.value_counts("City").head(5)
+
+    year_trend = snapshot.rollup("Year").sort_index()
+
+    return {
+        "total_records": total_records,
+        "top_cities": {
+            "labels": top_cities.index.tolist(),
+            "values": top_cities.values.tolist()
+        },
+        "year_trend": {
+            "labels": year_trend.index.astype(str).tolist(),
+            "values": year_trend.values.tolist()
+        }
+    }
+
+
 @app.route("/api/dashboard")
-def dashboard_api():
+@response_cache.cached
+@crime_filtered
+def dashboard_api(filters):
     try:
-        df = pd.read_csv(CRIME_DATA)
-        df.columns = df.columns.str.strip()
+        return jsonify(dashboard_payload(crime_snapshot(filters)))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+# ==================================================
+# MAP API — CRIME DISTRIBUTION (HOMEPAGE MAP)
+# ==================================================
+def city_map_points(counts):
+    # One marker per city with coordinates in the gazetteer
+    missing = gazetteer.missing(counts.index)
+    if missing:
+        print("⚠️ No gazetteer coordinates for:", ", ".join(map(str, missing)))
+
+    points = []
+    for city, count in counts.items():
+        coords = gazetteer.coords(city)
+        if coords is not None:
+            points.append({
+                "city": city,
+                "lat": coords[0],
+                "lng": coords[1],
+                "count": int(count)
+            })
+    return points
+
+
+def city_map_payload(snapshot):
+    # City-level aggregation, placed with the gazetteer
+    return city_map_points(snapshot.rollup("City"))
+
+
+@app.route("/api/map/crimes")
+@response_cache.cached
+@crime_filtered
+def crime_map_api(filters):
+    try:
+        return jsonify(city_map_payload(crime_snapshot(filters)))
 
-        total_records = len(df)
-        top_cities = df["City"].value_counts().head(5)
+    except Exception as e:
+        print("Map API Error:", e)
+        return jsonify({"error": str(e)}), 500
+
+# ==================================================
+# MAP API — RADIUS / BOUNDING-BOX QUERIES
+# ==================================================
+def city_counts_in_domains(domains):
+    cube = crime_cube.get()
+    if domains:
+        cube = cube[cube["Crime Domain"].isin(domains)]
+    return rollup(cube, "City")
+
+
+def bounds_dict(south, west, north, east):
+    return {"south": south, "west": west, "north": north, "east": east}
+
+
+def spatial_result(positions, counts, distances=None):
+    cities = []
+    for j, i in enumerate(positions):
+        city = gazetteer.names[i]
+        item = {
+            "city": city,
+            "lat": float(gazetteer.lat[i]),
+            "lng": float(gazetteer.lng[i]),
+            "count": int(counts.get(city, 0))
+        }
+        if distances is not None:
+            item["distance_km"] = round(float(distances[j]), 2)
+        cities.append(item)
+    return {
+        "count": sum(c["count"] for c in cities),
+        "cities": cities
+    }
 
-        df["Date Reported"] = pd.to_datetime(df["Date Reported"], errors="coerce")
-        df["Year"] = df["Date Reported"].dt.year
-        year_trend = df["Year"].value_counts().sort_index()
 
+@app.route("/api/map/radius")
+@response_cache.cached
+def crime_radius_api():
+    # ?lat=28.6&lng=77.2&km=100[&domain=Violent Crime]
+    lat, lng, km = (request.args.get(k, type=float) for k in ("lat", "lng", "km"))
+    if None in (lat, lng, km):
+        return jsonify({"error": "lat, lng and km are required numbers"}), 400
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180) or km <= 0:
+        return jsonify({"error": "lat/lng out of range or km not positive"}), 400
+
+    try:
+        positions, distances = gazetteer.within_radius(lat, lng, km)
+        counts = city_counts_in_domains(query_list("domain"))
         return jsonify({
-            "total_records": total_records,
-            "top_cities": {
-                "labels": top_cities.index.tolist(),
-                "values": top_cities.values.tolist()
-            },
-            "year_trend": {
-                "labels": year_trend.index.astype(str).tolist(),
-                "values": year_trend.values.tolist()
-            }
+            "center": {"lat": lat, "lng": lng},
+            "radius_km": km,
+            **spatial_result(positions, counts, distances)
         })
+
+    except Exception as e:
+        print("Radius API Error:", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/map/bbox")
+@response_cache.cached
+def crime_bbox_api():
+    # ?south=18&west=72&north=29&east=78[&domain=...]
+    bounds = [request.args.get(k, type=float) for k in ("south", "west", "north", "east")]
+    if None in bounds:
+        return jsonify({"error": "south, west, north and east are required numbers"}), 400
+    south, west, north, east = bounds
+    if not (-90 <= south <= north <= 90 and -180 <= west <= east <= 180):
+        return jsonify({"error": "Expected -90 <= south <= north <= 90 and -180 <= west <= east <= 180"}), 400
+
+    try:
+        positions = gazetteer.within_bbox(south, west, north, east)
+        counts = city_counts_in_domains(query_list("domain"))
+        return jsonify({
+            "bbox": bounds_dict(south, west, north, east),
+            **spatial_result(positions, counts)
+        })
+
     except Exception as e:
+        print("BBox API Error:", e)
         return jsonify({"error": str(e)}), 500
+
+
 # ==================================================
-# MAP API — CRIME DISTRIBUTION (HOMEPAGE MAP)
+# MAP API — TILED CLUSTERS
 # ==================================================
-@app.route("/api/map/crimes")
-def crime_map_api():
+@app.route("/api/map/tiles/<int:z>/<int:x>/<int:y>")
+@response_cache.cached
+def crime_tile_api(z, x, y):
+    # At most GRID x GRID clusters per tile[?domain=...]
+    if not (0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        return jsonify({"error": f"Expected 0 <= z <= {MAX_ZOOM} and 0 <= x, y < 2^z"}), 400
+
     try:
-        df = pd.read_csv(CRIME_DATA)
-        df.columns = df.columns.str.strip()
+        clusters = map_tiles.index(query_list("domain")).tile(z, x, y)
+        return jsonify({
+            "z": z,
+            "x": x,
+            "y": y,
+            "grid": GRID,
+            "bounds": bounds_dict(*tile_bounds(z, x, y)),
+            "count": sum(c["count"] for c in clusters),
+            "clusters": clusters
+        })
 
-        # City-level aggregation
-        city_counts = (
-            df.groupby("City")
-              .size()
-              .reset_index(name="count")
-        )
+    except Exception as e:
+        print("Tile API Error:", e)
+        return jsonify({"error": str(e)}), 500
 
-        # Hardcoded city coordinates (stable & acceptable)
-        city_coords = {
-            "Delhi": [28.6139, 77.2090],
-            "Mumbai": [19.0760, 72.8777],
-            "Bangalore": [12.9716, 77.5946],
-            "Chennai": [13.0827, 80.2707],
-            "Hyderabad": [17.3850, 78.4867],
-            "Kolkata": [22.5726, 88.3639]
-        }
 
-        data = []
-        for _, row in city_counts.iterrows():
-            city = row["City"]
-            if city in city_coords:
-                data.append({
-                    "city": city,
-                    "lat": city_coords[city][0],
-                    "lng": city_coords[city][1],
-                    "count": int(row["count"])
-                })
+@app.route("/api/map/clusters")
+@response_cache.cached
+def crime_clusters_api():
+    # ?south=18&west=72&north=29&east=78&zoom=6[&domain=...]
+    bounds = [request.args.get(k, type=float) for k in ("south", "west", "north", "east")]
+    zoom = request.args.get("zoom", type=int)
+    if None in bounds or zoom is None:
+        return jsonify({"error": "south, west, north, east and zoom are required numbers"}), 400
+    south, west, north, east = bounds
+    if not (-90 <= south <= north <= 90 and -180 <= west <= east <= 180):
+        return jsonify({"error": "Expected -90 <= south <= north <= 90 and -180 <= west <= east <= 180"}), 400
+    if not 0 <= zoom <= MAX_ZOOM:
+        return jsonify({"error": f"Expected 0 <= zoom <= {MAX_ZOOM}"}), 400
+
+    x0, x1, y0, y1 = tile_range(zoom, south, west, north, east)
+    tiles = (x1 - x0 + 1) * (y1 - y0 + 1)
+    if tiles > MAX_TILES:
+        return jsonify({"error": f"bbox covers {tiles} tiles at zoom {zoom} (max {MAX_TILES})"}), 400
 
-        return jsonify(data)
+    try:
+        index = map_tiles.index(query_list("domain"))
+        clusters = [
+            c
+            for x in range(x0, x1 + 1)
+            for y in range(y0, y1 + 1)
+            for c in index.tile(zoom, x, y)
+        ]
+        return jsonify({
+            "zoom": zoom,
+            "bbox": bounds_dict(south, west, north, east),
+            "tiles": tiles,
+            "grid": GRID,
+            "count": sum(c["count"] for c in clusters),
+            "clusters": clusters
+        })
 
     except Exception as e:
-        print("Map API Error:", e)
+        print("Clusters API Error:", e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -146,62 +723,63 @@ def geo_page():
 def temporal_page():
     return render_template("temporal.html")
 
-@app.route("/api/hotspots/geographic")
-def hotspots_geographic_api():
-    try:
-        df = pd.read_csv(CRIME_DATA)
-        df.columns = df.columns.str.strip()
-        df = df.dropna(subset=["City", "Crime Domain"])
+def hotspots_geographic_payload(snapshot):
+    notna = ("City", "Crime Domain")
 
-        city_counts = df["City"].value_counts()
-        top_cities = city_counts.head(5)
-        other_count = city_counts.iloc[5:].sum()
+    city_counts = snapshot.value_counts("City", notna)
+    top_cities = city_counts.head(5)
+    other_count = city_counts.iloc[5:].sum()
 
-        concentration = {
-            "labels": top_cities.index.tolist() + ["Other Cities"],
-            "values": top_cities.values.tolist() + [int(other_count)]
-        }
+    concentration = {
+        "labels": top_cities.index.tolist() + ["Other Cities"],
+        "values": top_cities.values.tolist() + [int(other_count)]
+    }
 
-        domain_pivot = (
-            df.pivot_table(
-                index="City",
-                columns="Crime Domain",
-                values="Report Number",
-                aggfunc="count",
-                fill_value=0
-            ).loc[top_cities.index]
-        )
+    domain_pivot = (
+        snapshot.rollup(["City", "Crime Domain"], notna)
+          .unstack(fill_value=0)
+          .loc[top_cities.index]
+    )
 
-        domain_data = {
-            city: domain_pivot.loc[city].to_dict()
-            for city in domain_pivot.index
-        }
+    domain_data = {
+        city: domain_pivot.loc[city].to_dict()
+        for city in domain_pivot.index
+    }
 
-        return jsonify({
-            "cities": top_cities.index.tolist(),
-            "counts": top_cities.values.tolist(),
-            "concentration": concentration,
-            "domain": domain_data
-        })
+    return {
+        "cities": top_cities.index.tolist(),
+        "counts": top_cities.values.tolist(),
+        "concentration": concentration,
+        "domain": domain_data
+    }
+
+
+@app.route("/api/hotspots/geographic")
+@response_cache.cached
+@crime_filtered
+def hotspots_geographic_api(filters):
+    try:
+        return jsonify(hotspots_geographic_payload(crime_snapshot(filters)))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route("/api/hotspots/temporal")
-def hotspots_temporal_api():
-    try:
-        df = pd.read_csv(CRIME_DATA)
-        df.columns = df.columns.str.strip()
+def hotspots_temporal_payload(snapshot):
+    day = snapshot.value_counts("weekday")
+    day = day.set_axis([DAY_NAMES[int(d)] for d in day.index])
 
-        df["Date Reported"] = pd.to_datetime(df["Date Reported"], errors="coerce")
-        df["Year"] = df["Date Reported"].dt.year
-        df["Month"] = df["Date Reported"].dt.month
-        df["Day"] = df["Date Reported"].dt.day_name()
+    return {
+        "year": snapshot.rollup("Year").sort_index().rename(index=int).to_dict(),
+        "month": snapshot.rollup("Month").sort_index().rename(index=int).to_dict(),
+        "day": day.to_dict()
+    }
 
-        return jsonify({
-            "year": df["Year"].value_counts().sort_index().to_dict(),
-            "month": df["Month"].value_counts().sort_index().to_dict(),
-            "day": df["Day"].value_counts().to_dict()
-        })
+
+@app.route("/api/hotspots/temporal")
+@response_cache.cached
+@crime_filtered
+def hotspots_temporal_api(filters):
+    try:
+        return jsonify(hotspots_temporal_payload(crime_snapshot(filters)))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -224,35 +802,27 @@ def predictive_anomaly_page():
 # PREDICTIVE APIs
 # ==================================================
 @app.route("/api/predictive/forecast")
+@response_cache.cached
 def predictive_forecast_api():
     try:
-        df = pd.read_csv(CRIME_DATA)
-        df.columns = df.columns.str.strip()
-
         # ---- Date cleanup ----
-        df["Date Reported"] = pd.to_datetime(
-            df["Date Reported"], errors="coerce"
-        )
-        df = df.dropna(subset=["Date Reported"])
+        cube = filter_notna(crime_cube.get(), "Year")
 
-        if df.empty:
+        if cube.empty:
             return jsonify({"error": "No valid date records found"}), 400
 
         # ---- Time features ----
-        df["year"] = df["Date Reported"].dt.year
-        df["month"] = df["Date Reported"].dt.month
-
         yearly = (
-            df.groupby("year")
-              .size()
+            rollup(cube, "Year")
               .reset_index(name="count")
+              .rename(columns={"Year": "year"})
               .sort_values("year")
         )
 
         monthly = (
-            df.groupby("month")
-              .size()
+            rollup(cube, "Month")
               .reset_index(name="count")
+              .rename(columns={"Month": "month"})
               .sort_values("month")
         )
 
@@ -291,15 +861,66 @@ def predictive_forecast_api():
         print("❌ Forecast API Error:", e)
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/predictive/forecast/series")
+@response_cache.cached
+def predictive_series_forecast_api():
+    try:
+        horizon = request.args.get("horizon", FORECAST_HORIZON, type=int)
+        limit = request.args.get("limit", 200, type=int)
+        if horizon is None or not 1 <= horizon <= FORECAST_HORIZON:
+            return jsonify({"error": f"horizon must be between 1 and {FORECAST_HORIZON}"}), 400
+        if limit is None or limit < 0:
+            return jsonify({"error": "limit must be a non-negative integer"}), 400
+        include_history = request.args.get("history", "1") != "0"
+
+        forecasts = crime_forecasts.get()
+        rows = forecasts.select(query_list("city"), query_list("domain"))
+
+        history = forecasts.history[rows]
+        forecast = forecasts.forecast[rows, :horizon]
+        shown = rows[:limit]
+
+        series = []
+        for i, (city, domain) in zip(shown, forecasts.keys.iloc[shown].itertuples(index=False)):
+            item = {
+                "city": city,
+                "domain": domain,
+                "forecast": forecasts.forecast[i, :horizon].round(2).tolist(),
+                "lower": forecasts.lower[i, :horizon].round(2).tolist(),
+                "upper": forecasts.upper[i, :horizon].round(2).tolist(),
+                "sigma": round(float(forecasts.sigma[i]), 3)
+            }
+            if include_history:
+                item["history"] = forecasts.history[i].astype(int).tolist()
+            series.append(item)
+
+        # The fit is linear, so summed forecasts are the forecast of the total
+        total = {"forecast": forecast.sum(axis=0).round(2).tolist()}
+        if include_history:
+            total["history"] = history.sum(axis=0).astype(int).tolist()
+
+        return jsonify({
+            "version": crime_forecasts.version,
+            "model": forecasts.model_info(),
+            "months": forecasts.months if include_history else [],
+            "forecast_months": forecasts.forecast_months[:horizon],
+            "count": int(len(rows)),
+            "series": series,
+            "total": total
+        })
+
+    except Exception as e:
+        print("❌ Series Forecast API Error:", e)
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route("/api/predictive/anomalies")
+@response_cache.cached
 def predictive_anomaly_api():
     try:
-        df = pd.read_csv(CRIME_DATA)
-        df["Date Reported"] = pd.to_datetime(df["Date Reported"], errors="coerce")
-        df = df.dropna(subset=["Date Reported"])
+        cube = filter_notna(crime_cube.get(), "Year")
 
-        df["Year"] = df["Date Reported"].dt.year
-        yearly = df.groupby("Year").size().reset_index(name="count")
+        yearly = rollup(cube, "Year").reset_index(name="count")
 
         mean = yearly["count"].mean()
         std = yearly["count"].std() or 1
@@ -307,10 +928,10 @@ def predictive_anomaly_api():
         yearly["z_score"] = (yearly["count"] - mean) / std
         anomalies = yearly[yearly["z_score"].abs() > 1.5]
 
-        city_counts = df.groupby("City").size().sort_values(ascending=False).head(6)
+        city_counts = rollup(cube, "City").sort_values(ascending=False).head(6)
 
         return jsonify({
-            "timeline": yearly["Year"].tolist(),
+            "timeline": yearly["Year"].astype(int).tolist(),
             "scores": yearly["z_score"].round(2).tolist(),
             "cities": city_counts.index.tolist(),
             "city_counts": city_counts.tolist(),
@@ -320,6 +941,69 @@ def predictive_anomaly_api():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/predictive/anomalies/series")
+@response_cache.cached
+def predictive_series_anomaly_api():
+    try:
+        threshold = request.args.get("z", ANOMALY_Z, type=float)
+        limit = request.args.get("limit", 200, type=int)
+        direction = request.args.get("direction", "both")
+        if threshold is None or threshold <= 0:
+            return jsonify({"error": "z must be a positive number"}), 400
+        if limit is None or limit < 0:
+            return jsonify({"error": "limit must be a non-negative integer"}), 400
+        if direction not in ("high", "low", "both"):
+            return jsonify({"error": "direction must be high, low or both"}), 400
+
+        version, stats = crime_anomalies.state()
+        scores = stats.scores()
+        std = stats.std()
+
+        flagged = np.abs(scores) > threshold
+        if direction == "high":
+            flagged &= scores > 0
+        elif direction == "low":
+            flagged &= scores < 0
+
+        cities, domains = query_list("city"), query_list("domain")
+        if cities:
+            flagged &= stats.keys["City"].isin(cities).to_numpy()
+        if domains:
+            flagged &= stats.keys["Crime Domain"].isin(domains).to_numpy()
+
+        rows = np.flatnonzero(flagged)
+        rows = rows[np.argsort(-np.abs(scores[rows]), kind="stable")]
+        month = month_label(stats.month) if stats.month is not None else None
+
+        anomalies = [
+            {
+                "city": stats.keys.at[i, "City"],
+                "domain": stats.keys.at[i, "Crime Domain"],
+                "month": month,
+                "count": int(stats.current[i]),
+                "mean": round(float(stats.mean[i]), 2),
+                "std": round(float(std[i]), 2),
+                "z": round(float(scores[i]), 2)
+            }
+            for i in rows[:limit]
+        ]
+
+        return jsonify({
+            "version": version,
+            "month": month,
+            "window": stats.window,
+            "window_months": stats.n,
+            "threshold": threshold,
+            "series": len(stats),
+            "count": int(len(rows)),
+            "anomalies": anomalies
+        })
+
+    except Exception as e:
+        print("❌ Series Anomaly API Error:", e)
+        return jsonify({"error": str(e)}), 500
+
+
 # ==================================================
 # MODULE 3 — SOCIO-ECONOMIC FACTORS API
 # ==================================================
@@ -334,69 +1018,60 @@ def criminogenic_environment_page():
     return render_template("environment.html")
 
 @app.route("/api/criminogenic/socio")
+@response_cache.cached
 def socio_api():
-    df = pd.read_csv(CRIME_DATA)
-    df.columns = df.columns.str.strip()
+    if CRIME_STREAMING:
+        stats = crime_stream.aggregates()
+
+        # Victim Age (exact per-age counts)
+        age_values = stats.age_counts.index.to_numpy()
+        age_counts = stats.age_counts.to_numpy()
+
+        # Correlation matrix (pairwise-complete, merged across chunks)
+        corr = stats.socio.corr().round(2).tolist()
+
+        mean_age = stats.socio.mean("x")
+        mean_police = stats.socio.mean("y")
+    else:
+        df = crime_data.frame()
 
-    # Victim Age
-    ages = df["Victim Age"].dropna().astype(int).tolist()
+        with stage("socio_stats", rows=len(df)):
+            # Victim Age (exact per-age counts)
+            age_values, age_counts = integer_counts(df["Victim Age"].dropna().astype(int).to_numpy())
 
-    # Correlation matrix
-    corr_df = df[["Victim Age", "Police Deployed"]].dropna()
-    corr = corr_df.corr().round(2).values.tolist()
+            # Correlation matrix
+            corr_df = df[["Victim Age", "Police Deployed"]].dropna()
+            corr = corr_df.corr().round(2).values.tolist()
+
+            mean_age = df["Victim Age"].mean()
+            mean_police = df["Police Deployed"].mean()
 
     # Radar values (normalized)
     radar = {
         "labels": ["Age Vulnerability", "Police Presence", "Crime Pressure"],
         "values": [
-            float(df["Victim Age"].mean() / 80),
-            float(df["Police Deployed"].mean() / 20),
+            float(mean_age / 80),
+            float(mean_police / 20),
             1.0
         ]
     }
 
     return jsonify({
-        "ages": ages,
+        # Histogram + box summary instead of one entry per victim
+        "age": distribution_summary(age_values, age_counts, AGE_BIN_WIDTH),
         "corr": corr,
         "radar": radar
     })
-@app.route("/api/criminogenic/environment")
-def environment_api():
-    df = pd.read_csv(CRIME_DATA)
-    df.columns = df.columns.str.strip()
-
-    df["Date Reported"] = pd.to_datetime(df["Date Reported"], errors="coerce")
-
-    df["hour"] = (
-        pd.to_numeric(df["Time of Occurrence"].str[:2], errors="coerce")
-        .fillna(0)
-        .astype(int)
-    )
-
-    df["weekday"] = df["Date Reported"].dt.dayofweek
-
+def environment_payload(snapshot):
     # Time heatmap
-    heat = pd.crosstab(
-      df["weekday"],
-      df["hour"]
-    ).reindex(index=range(7), fill_value=0)
-
-
-    # Stacked bar (Gender × Crime)
-    df["Victim Gender"] = (
-    df["Victim Gender"]
-    .astype(str)
-    .str.strip()
-    .str.upper()
+    heat = (
+        snapshot.rollup(["weekday", "hour"])
+          .unstack(fill_value=0)
+          .reindex(index=range(7), fill_value=0)
     )
 
-    df["Victim Gender"] = df["Victim Gender"].map({
-    "M": "Male",
-    "F": "Female",
-    "X": "Other"
-    }).fillna("Other")
-
-    stacked = pd.crosstab(df["Crime Domain"], df["Victim Gender"])
+    # Stacked bar (Gender × Crime)
+    stacked = snapshot.rollup(["Crime Domain", "Victim Gender Label"]).unstack(fill_value=0)
 
     male = stacked.get("Male", pd.Series()).fillna(0).astype(int)
     female = stacked.get("Female", pd.Series()).fillna(0).astype(int)
@@ -404,7 +1079,7 @@ def environment_api():
 
 
 
-    return jsonify({
+    return {
         "heat": heat.values.tolist(),
         "hours": heat.columns.astype(int).tolist(),
         "days": ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"],
@@ -412,32 +1087,21 @@ def environment_api():
         "male": male.tolist(),
         "female": female.tolist(),
         "other" : other.tolist(),
-     })
-@app.route("/api/criminogenic/map")
-def criminogenic_map():
-    df = pd.read_csv(CRIME_DATA)
-    df.columns = df.columns.str.strip()
-
-    coords = {
-        "Delhi": [28.61, 77.20],
-        "Mumbai": [19.07, 72.87],
-        "Bangalore": [12.97, 77.59],
-        "Chennai": [13.08, 80.27],
-        "Hyderabad": [17.38, 78.48],
-        "Kolkata": [22.57, 88.36]
-    }
+     }
 
-    out = []
-    for city, cnt in df.groupby("City").size().items():
-        if city in coords:
-            out.append({
-                "city": city,
-                "lat": coords[city][0],
-                "lng": coords[city][1],
-                "count": int(cnt)
-            })
 
-    return jsonify(out)
+@app.route("/api/criminogenic/environment")
+@response_cache.cached
+@crime_filtered
+def environment_api(filters):
+    return jsonify(environment_payload(crime_snapshot(filters)))
+
+
+@app.route("/api/criminogenic/map")
+@response_cache.cached
+@crime_filtered
+def criminogenic_map(filters):
+    return jsonify(city_map_payload(crime_snapshot(filters)))
 # ==================================================
 # MODULE 4 — ML CLASSIFICATION PAGES
 # ==================================================
@@ -460,70 +1124,15 @@ def classification_location_page():
 # ==================================================
 
 @app.route("/api/classification/category")
+@response_cache.cached
 def classification_category_api():
     try:
-        df = pd.read_csv(CRIME_DATA)
-        df.columns = df.columns.str.strip()
-
-        # Clean & Prepare Data
-        df["Date Reported"] = pd.to_datetime(df["Date Reported"], errors="coerce")
-        df = df.dropna(subset=["Crime Domain", "Date Reported"])
-
-        df["Month"] = df["Date Reported"].dt.month
-        df["Hour"] = pd.to_numeric(
-            df["Time of Occurrence"].astype(str).str[:2],
-            errors="coerce"
-        ).fillna(0)
-
-        features = [
-            "City",
-            "Victim Age",
-            "Victim Gender",
-            "Police Deployed",
-            "Month",
-            "Hour"
-        ]
-
-        df = df.dropna(subset=features)
-
-        X = df[features].copy()
-        y = df["Crime Domain"]
-
-        # Encoding
-        le_city = LabelEncoder()
-        le_gender = LabelEncoder()
-        le_target = LabelEncoder()
-
-        X["City"] = le_city.fit_transform(X["City"])
-        X["Victim Gender"] = le_gender.fit_transform(X["Victim Gender"])
-        y_encoded = le_target.fit_transform(y)
+        # Train in the job pool instead of this request thread
+        bundle, pending = trained_model("crime_category")
+        if pending:
+            return pending
 
-        # Train Test Split
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y_encoded,
-            test_size=0.3,
-            random_state=42
-        )
-
-        # Model
-        model = RandomForestClassifier(
-            n_estimators=150,
-            random_state=42
-        )
-        model.fit(X_train, y_train)
-
-        # Predictions
-        y_pred = model.predict(X_test)
-        probs = model.predict_proba(X_test)
-        cm = confusion_matrix(y_test, y_pred)
-
-        return jsonify({
-            "labels": le_target.classes_.tolist(),
-            "confusion_matrix": cm.tolist(),
-            "probabilities": probs.mean(axis=0).round(3).tolist(),
-            "feature_importance": model.feature_importances_.round(3).tolist(),
-            "feature_names": features
-        })
+        return jsonify(bundle["metrics"])
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -536,87 +1145,34 @@ def classification_category_api():
 # ==================================================
 
 @app.route("/api/classification/location")
+@response_cache.cached
 def classification_location_api():
     try:
         # -----------------------------
-        # Load Data
-        # -----------------------------
-        df = pd.read_csv(CRIME_DATA)
-        df.columns = df.columns.str.strip()
-
-        df["Date Reported"] = pd.to_datetime(
-            df["Date Reported"],
-            errors="coerce"
-        )
-
-        df = df.dropna(subset=["City", "Date Reported"])
-
-        df["Month"] = df["Date Reported"].dt.month
-
-        # -----------------------------
-        # Encode City
+        # Trained Model (from registry,
+        # trained in the job pool)
         # -----------------------------
-        le_city = LabelEncoder()
-        df["City_encoded"] = le_city.fit_transform(df["City"])
+        bundle, pending = trained_model("location_risk")
+        if pending:
+            return pending
 
         # -----------------------------
-        # Define Risk Threshold
+        # Predict Risk for Each City (one batch)
         # -----------------------------
-        city_counts = df["City"].value_counts()
-        threshold = city_counts.mean()
-
-        df["High_Risk"] = df["City"].map(
-            lambda x: 1 if city_counts[x] > threshold else 0
+        cities = bundle["metrics"]["cities"]
+        probs = score_location_rows(
+            bundle,
+            cities,
+            DEFAULT_LOCATION_SCENARIO["Month"],
+            DEFAULT_LOCATION_SCENARIO["Victim Age"],
+            DEFAULT_LOCATION_SCENARIO["Police Deployed"]
         )
 
-        # -----------------------------
-        # Feature Set
-        # -----------------------------
-        feature_cols = [
-            "City_encoded",
-            "Month",
-            "Victim Age",
-            "Police Deployed"
-        ]
-
-        X = df[feature_cols].fillna(0)
-        y = df["High_Risk"]
-
-        # -----------------------------
-        # Train/Test Split
-        # -----------------------------
-        X_train, X_test, y_train, y_test = train_test_split(
-            X,
-            y,
-            test_size=0.3,
-            random_state=42
-        )
-
-        # -----------------------------
-        # Model Training
-        # -----------------------------
-        model = GradientBoostingClassifier(random_state=42)
-        model.fit(X_train, y_train)
-
-        # -----------------------------
-        # Predict Risk for Each City
-        # -----------------------------
-        city_risk = {}
-
-        for city in df["City"].unique():
-            encoded = le_city.transform([city])[0]
-
-            sample_df = pd.DataFrame([{
-                "City_encoded": encoded,
-                "Month": 6,
-                "Victim Age": 30,
-                "Police Deployed": 5
-            }])
-
-            prob = model.predict_proba(sample_df)[0][1]
-
-            # Convert to native float
-            city_risk[city] = float(round(prob * 100, 2))
+        # Convert to native float
+        city_risk = {
+            city: float(round(prob * 100, 2))
+            for city, prob in zip(cities, probs)
+        }
 
         # -----------------------------
         # Sort Risk
@@ -650,6 +1206,115 @@ def classification_location_api():
     except Exception as e:
         print("Location Classification Error:", e)
         return jsonify({"error": str(e)}), 500
+
+LOCATION_SCORE_DEFAULTS = {
+    "month": DEFAULT_LOCATION_SCENARIO["Month"],
+    "victim_age": DEFAULT_LOCATION_SCENARIO["Victim Age"],
+    "police_deployed": DEFAULT_LOCATION_SCENARIO["Police Deployed"]
+}
+
+def numeric_field(values, default=None):
+    # Float Series of a JSON field, omitted values -> default; None if a
+    # given value is not a number (or one is omitted without a default)
+    raw = pd.Series(values, dtype=object)
+    numbers = pd.to_numeric(raw, errors="coerce")
+    if (numbers.isna() & raw.notna()).any():
+        return None
+    if default is None:
+        return None if numbers.isna().any() else numbers.astype(np.float64)
+    return numbers.fillna(default).astype(np.float64)
+
+def parse_location_score_body(payload):
+    # (grid or rows fields, None), or (None, 400 error message)
+    if "grid" in payload:
+        grid = payload["grid"] or {}
+        cities = grid.get("cities")
+        if cities is not None and not (
+            isinstance(cities, list) and all(isinstance(c, str) for c in cities)
+        ):
+            return None, "Expected 'cities' to be a list of city names"
+
+        months = grid.get("months") or list(range(1, 13))
+        numbers = {
+            "months": numeric_field(months),
+            "victim_age": numeric_field([grid.get("victim_age")], LOCATION_SCORE_DEFAULTS["victim_age"]),
+            "police_deployed": numeric_field([grid.get("police_deployed")], LOCATION_SCORE_DEFAULTS["police_deployed"])
+        }
+        bad = [field for field, values in numbers.items() if values is None]
+        parsed = {"cities": cities or None, "month_labels": months, **numbers}
+        return (None, f"Non-numeric values in: {bad}") if bad else (parsed, None)
+
+    rows = payload.get("rows")
+    if not isinstance(rows, list):
+        return None, "Expected 'rows' or 'grid' in JSON body"
+    if not all(isinstance(row, dict) for row in rows):
+        return None, "Expected 'rows' to be a list of objects"
+
+    batch = pd.DataFrame(rows, columns=["city", *LOCATION_SCORE_DEFAULTS])
+    if batch["city"].isna().any():
+        return None, "Missing fields: ['city']"
+    if not batch["city"].map(lambda c: isinstance(c, str)).all():
+        return None, "Expected 'city' to be a city name"
+
+    parsed = {"city": batch["city"]}
+    for field, default in LOCATION_SCORE_DEFAULTS.items():
+        parsed[field] = numeric_field(batch[field], default)
+    bad = [field for field in LOCATION_SCORE_DEFAULTS if parsed[field] is None]
+    return (None, f"Non-numeric values in: {bad}") if bad else (parsed, None)
+
+@app.route("/api/classification/location/score", methods=["POST"])
+def classification_location_score_api():
+    # Batch risk scoring. Body is either
+    #   {"rows": [{"city", "month", "victim_age", "police_deployed"}, ...]}
+    # or
+    #   {"grid": {"cities": [...], "months": [...], "victim_age", "police_deployed"}}
+    # Omitted grid fields default to all cities / all months and the
+    # dashboard scenario; omitted row fields (except city) to the latter.
+    # Malformed bodies get a 400 naming the bad fields.
+    try:
+        parsed, error = parse_location_score_body(request.get_json(silent=True) or {})
+        if error:
+            return jsonify({"error": error}), 400
+
+        bundle, pending = trained_model("location_risk")
+        if pending:
+            return pending
+
+        if "cities" in parsed:
+            cities = parsed["cities"] or bundle["metrics"]["cities"]
+            unknown = unknown_cities(bundle, cities)
+            if unknown:
+                return jsonify({"error": "Unknown cities", "unknown": unknown}), 400
+
+            risk = score_location_grid(
+                bundle,
+                cities,
+                parsed["months"],
+                parsed["victim_age"].iloc[0],
+                parsed["police_deployed"].iloc[0]
+            )
+            return jsonify({
+                "cities": list(cities),
+                "months": list(parsed["month_labels"]),
+                "risk": (risk * 100).round(2).tolist()
+            })
+
+        unknown = unknown_cities(bundle, parsed["city"])
+        if unknown:
+            return jsonify({"error": "Unknown cities", "unknown": unknown}), 400
+
+        probs = score_location_rows(
+            bundle,
+            parsed["city"],
+            parsed["month"],
+            parsed["victim_age"],
+            parsed["police_deployed"]
+        )
+        return jsonify({"risk_scores": (probs * 100).round(2).tolist()})
+
+    except Exception as e:
+        print("Location Scoring Error:", e)
+        return jsonify({"error": str(e)}), 500
 # ==================================================
 # MODULE 5 — REAL-TIME CRIME RISK SCORING
 # ==================================================
@@ -666,81 +1331,93 @@ def risk_index_page():
 def risk_alert_page():
     return render_template("risk_alert.html")
 
-@app.route("/api/risk/index")
-def risk_index_api():
-    try:
-        df = pd.read_csv(CRIME_DATA)
-        df.columns = df.columns.str.strip()
+def risk_index_payload(snapshot):
+    notna = ("Year", "City")
 
-        df["Date Reported"] = pd.to_datetime(df["Date Reported"], errors="coerce")
-        df = df.dropna(subset=["Date Reported", "City"])
+    yearly_counts = snapshot.rollup("Year", notna).reset_index(name="count")
+    if yearly_counts.empty:
+        raise LookupError("No records match the filters")
 
-        df["Year"] = df["Date Reported"].dt.year
+    # Risk Score scaled 0–100
+    max_count = yearly_counts["count"].max()
+    yearly_counts["risk_score"] = (
+        yearly_counts["count"] / max_count * 100
+    )
 
-        yearly_counts = df.groupby("Year").size().reset_index(name="count")
+    current_score = float(round(yearly_counts["risk_score"].iloc[-1], 2))
 
-        # Risk Score scaled 0–100
-        max_count = yearly_counts["count"].max()
-        yearly_counts["risk_score"] = (
-            yearly_counts["count"] / max_count * 100
-        )
+    # City comparison
+    city_counts = snapshot.value_counts("City", notna).head(6)
+    city_risk = (
+        city_counts / city_counts.max() * 100
+    ).round(2)
 
-        current_score = float(round(yearly_counts["risk_score"].iloc[-1], 2))
+    return {
+        "current_score": current_score,
+        "years": yearly_counts["Year"].astype(str).tolist(),
+        "risk_trend": yearly_counts["risk_score"].round(2).tolist(),
+        "cities": city_risk.index.tolist(),
+        "city_scores": city_risk.tolist()
+    }
 
-        # City comparison
-        city_counts = df["City"].value_counts().head(6)
-        city_risk = (
-            city_counts / city_counts.max() * 100
-        ).round(2)
 
-        return jsonify({
-            "current_score": current_score,
-            "years": yearly_counts["Year"].astype(str).tolist(),
-            "risk_trend": yearly_counts["risk_score"].round(2).tolist(),
-            "cities": city_risk.index.tolist(),
-            "city_scores": city_risk.tolist()
-        })
+@app.route("/api/risk/index")
+@response_cache.cached
+@crime_filtered
+def risk_index_api(filters):
+    try:
+        return jsonify(risk_index_payload(crime_snapshot(filters)))
 
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-@app.route("/api/risk/alerts")
-def risk_alert_api():
-    try:
-        df = pd.read_csv(CRIME_DATA)
-        df.columns = df.columns.str.strip()
 
-        df["Date Reported"] = pd.to_datetime(df["Date Reported"], errors="coerce")
-        df = df.dropna(subset=["Date Reported"])
 
-        df["Year"] = df["Date Reported"].dt.year
+def risk_alert_payload(snapshot):
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import auc, roc_curve
 
-        yearly = df.groupby("Year").size().reset_index(name="count")
+    yearly = snapshot.rollup("Year", ("Year",)).reset_index(name="count")
 
-        threshold = yearly["count"].mean()
+    threshold = yearly["count"].mean()
 
-        yearly["High_Risk"] = (yearly["count"] > threshold).astype(int)
+    yearly["High_Risk"] = (yearly["count"] > threshold).astype(int)
+    if yearly["High_Risk"].nunique() < 2:
+        raise LookupError("Filtered data needs years both above and below the mean")
 
-        X = yearly[["Year"]]
-        y = yearly["High_Risk"]
+    X = yearly[["Year"]]
+    y = yearly["High_Risk"]
 
-        model = LogisticRegression()
+    model = LogisticRegression()
+    with stage("model_fit", rows=len(X)):
         model.fit(X, y)
 
-        y_prob = model.predict_proba(X)[:, 1]
+    y_prob = model.predict_proba(X)[:, 1]
 
-        fpr, tpr, _ = roc_curve(y, y_prob)
-        roc_auc = float(auc(fpr, tpr))
+    fpr, tpr, _ = roc_curve(y, y_prob)
+    roc_auc = float(auc(fpr, tpr))
 
-        high = int(sum(yearly["High_Risk"]))
-        low = int(len(yearly) - high)
+    high = int(sum(yearly["High_Risk"]))
+    low = int(len(yearly) - high)
 
-        return jsonify({
-            "fpr": fpr.tolist(),
-            "tpr": tpr.tolist(),
-            "roc_auc": roc_auc,
-            "distribution": [high, low]
-        })
+    return {
+        "fpr": fpr.tolist(),
+        "tpr": tpr.tolist(),
+        "roc_auc": roc_auc,
+        "distribution": [high, low]
+    }
+
+
+@app.route("/api/risk/alerts")
+@response_cache.cached
+@crime_filtered
+def risk_alert_api(filters):
+    try:
+        return jsonify(risk_alert_payload(crime_snapshot(filters)))
 
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 # ==================================================
@@ -759,80 +1436,44 @@ def recurrence_prediction_page():
 def recurrence_persistence_page():
     return render_template("recurrence_persistence.html")
 @app.route("/api/recurrence/prediction")
+@response_cache.cached
 def recurrence_prediction_api():
     try:
-        df = pd.read_csv(CRIME_DATA)
-        df.columns = df.columns.str.strip()
+        stats = crime_recurrence.get()
 
-        df["Date Reported"] = pd.to_datetime(
-            df["Date Reported"],
-            errors="coerce"
-        )
-
-        df = df.dropna(subset=["Date Reported", "City"])
-        df = df.sort_values("Date Reported")
-
-        # Time difference in days
-        df["Days_Since_Last"] = (
-            df["Date Reported"].diff().dt.days.fillna(0)
-        )
-
-        # Survival probability (inverse scale)
-        survival_days = list(range(1, 31))
-        survival_prob = [
-            float(round(max(0, 1 - (d / 30)), 2))
-            for d in survival_days
-        ]
+        # Survival: P(no same-city, same-domain incident within d days)
+        survival_days = list(range(1, RECURRENCE_DAYS + 1))
+        survival = stats.survival(survival_days)
 
-        # Recurrence probability curve
-        recurrence_prob = [
-            float(round(min(1, d / 30), 2))
-            for d in survival_days
-        ]
-
-        # City recurrence risk
-        city_counts = df["City"].value_counts().head(6)
+        # City recurrence risk: P(recurrence within the horizon), in %
+        city_survival = stats.survival([RISK_HORIZON_DAYS], by="City")[:, 0]
         city_risk = (
-            city_counts / city_counts.max() * 100
-        ).round(2)
+            pd.Series((1 - city_survival) * 100, index=stats.cities)
+              .sort_values(ascending=False, kind="stable")
+              .head(6)
+              .round(2)
+        )
 
         return jsonify({
             "days": survival_days,
-            "survival": survival_prob,
-            "recurrence": recurrence_prob,
+            "survival": survival.round(2).tolist(),
+            "recurrence": (1 - survival).round(2).tolist(),
             "cities": city_risk.index.tolist(),
-            "city_scores": city_risk.tolist()
+            "city_scores": city_risk.tolist(),
+            "risk_horizon_days": RISK_HORIZON_DAYS,
+            "median_gap_days": round(stats.median_gap_days() or 0, 2)
         })
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 @app.route("/api/recurrence/persistence")
+@response_cache.cached
 def recurrence_persistence_api():
     try:
-        df = pd.read_csv(CRIME_DATA)
-        df.columns = df.columns.str.strip()
-
-        df["Date Reported"] = pd.to_datetime(
-            df["Date Reported"],
-            errors="coerce"
-        )
-
-        df = df.dropna(subset=["Date Reported", "City"])
-
-        df["Year"] = df["Date Reported"].dt.year
-
-        yearly_city = (
-            df.groupby(["Year", "City"])
-            .size()
-            .reset_index(name="count")
-        )
+        cube = filter_notna(crime_cube.get(), "Year", "City")
 
         # Stability trend (total yearly crimes)
-        yearly_total = (
-            df.groupby("Year")
-            .size()
-            .reset_index(name="count")
-        )
+        yearly_total = rollup(cube, "Year").reset_index(name="count")
 
         # Persistence distribution
         high = int(sum(yearly_total["count"] > yearly_total["count"].mean()))
@@ -847,6 +1488,254 @@ def recurrence_persistence_api():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# ==================================================
+# MODULE 7 — CASE CLOSURE PREDICTION
+# ==================================================
+@app.route("/api/predict/case-closure", methods=["POST"])
+def case_closure_predict_api():
+    # Body: {"records": [{...}, ...]} or a single record, with the CSV
+    # column names (City, Crime Code, Victim Age, Victim Gender, Weapon
+    # Used, Crime Domain, Police Deployed, Case Closed, Date of
+    # Occurrence, Time of Occurrence). Weapon Used may be omitted.
+    loaded = loaded_case_closure()
+    if loaded is None:
+        return jsonify({"error": "Case closure model is not loaded"}), 503
+    model, _, model_encoders = loaded
+
+    try:
+        payload = request.get_json(silent=True)
+        records = payload.get("records") if isinstance(payload, dict) and "records" in payload else payload
+        if isinstance(records, dict):
+            records = [records]
+        if not records or not isinstance(records, list):
+            return jsonify({"error": "Expected a record or {\"records\": [...]}"}), 400
+
+        encoders = model_encoders or model_registry.get("case_closure_encoders")["encoders"]
+        try:
+            X = encode_case_closure_records(
+                records,
+                encoders,
+                getattr(model, "feature_names_in_", None)
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        probs = case_closure_batcher.submit(X)
+
+        return jsonify({
+            "closure_probability": [float(round(p, 4)) for p in probs],
+            "predicted_closed": [bool(p >= 0.5) for p in probs]
+        })
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/predict/case-closure/model")
+def case_closure_model_api():
+    loaded = loaded_case_closure()
+    if loaded is None:
+        return jsonify({"error": "Case closure model is not loaded"}), 503
+    return jsonify(loaded[1])
+
+# ==================================================
+# BATCH PANELS
+# ==================================================
+# Several cube-backed panels from one filtered cube snapshot: rollups
+# shared between panels (e.g. counts per City) are computed once, and a
+# page needs a single round trip.
+PANELS = {
+    "dashboard": dashboard_payload,
+    "crime_map": city_map_payload,
+    "hotspots_geographic": hotspots_geographic_payload,
+    "hotspots_temporal": hotspots_temporal_payload,
+    "environment": environment_payload,
+    "criminogenic_map": city_map_payload,
+    "risk_index": risk_index_payload,
+    "risk_alerts": risk_alert_payload
+}
+
+@app.route("/api/panels")
+@response_cache.cached
+@crime_filtered
+def panels_api(filters):
+    # ?panels=dashboard,crime_map plus the query filters; a panel that
+    # fails is reported under "errors" without failing the others
+    names = list(dict.fromkeys(query_list("panels")))
+    unknown = [name for name in names if name not in PANELS]
+    if not names or unknown:
+        return jsonify({"error": f"panels must be a list of {sorted(PANELS)}", "unknown": unknown}), 400
+
+    try:
+        snapshot = crime_snapshot(filters)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    panels, errors = {}, {}
+    for name in names:
+        try:
+            with stage(f"panel_{name}"):
+                panels[name] = PANELS[name](snapshot)
+        except Exception as e:
+            errors[name] = str(e)
+
+    return jsonify({"panels": panels, "errors": errors})
+
+# ==================================================
+# INGESTION — INCREMENTAL APPEND
+# ==================================================
+@app.route("/api/ingest/append", methods=["POST"])
+def ingest_append_api():
+    # Accepts either a CSV body (text/csv, same header as CRIME_DATA) or
+    # JSON {"records": [{column: value, ...}, ...]}.
+    try:
+        if request.mimetype == "text/csv":
+            records = pd.read_csv(io.StringIO(request.get_data(as_text=True)))
+        else:
+            payload = request.get_json(silent=True) or {}
+            if not isinstance(payload.get("records"), list):
+                return jsonify({"error": "Expected JSON 'records' list or a text/csv body"}), 400
+            records = pd.DataFrame(payload["records"])
+
+        return jsonify(append_crime_records(records))
+
+    except (ValueError, RuntimeError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print("Append Ingestion Error:", e)
+        return jsonify({"error": str(e)}), 500
+
+# ==================================================
+# EXPORT — STREAMING ROW DUMP
+# ==================================================
+# Incident rows matching the query filters, serialized chunk by chunk
+# from a generator: memory stays at one chunk whatever the export size.
+EXPORT_COLUMNS = [
+    "Report Number",
+    "Date Reported",
+    "City",
+    "Crime Domain",
+    "Victim Age",
+    "Victim Gender",
+    "Police Deployed",
+    "Weapon Used",
+    "Case Closed"
+]
+
+# Rows per serialized chunk
+EXPORT_CHUNK_ROWS = 10_000
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+
+def export_source_chunks():
+    if CRIME_STREAMING:
+        yield from crime_stream.iter_chunks(STREAM_COLUMNS + EXPORT_COLUMNS)
+    else:
+        df = crime_data.frame()
+        for start in range(0, len(df), CRIME_CHUNK_SIZE):
+            yield df.iloc[start:start + CRIME_CHUNK_SIZE]
+
+
+def export_rows(filters, fmt):
+    header = True
+    for chunk in export_source_chunks():
+        chunk = chunk.loc[frame_mask(chunk, filters), EXPORT_COLUMNS]
+        for start in range(0, len(chunk), EXPORT_CHUNK_ROWS):
+            part = chunk.iloc[start:start + EXPORT_CHUNK_ROWS]
+            with stage("export_chunk", rows=len(part)):
+                if fmt == "csv":
+                    text = part.to_csv(index=False, header=header, date_format="%Y-%m-%d %H:%M:%S")
+                    header = False
+                else:
+                    text = part.to_json(orient="records", lines=True, date_format="iso")
+                    if not text.endswith("\n"):
+                        text += "\n"
+            yield text
+
+    # Header-only CSV when nothing matched
+    if fmt == "csv" and header:
+        yield ",".join(EXPORT_COLUMNS) + "\n"
+
+
+@app.route("/api/export/crimes")
+@crime_filtered
+def export_crimes_api(filters):
+    # ?format=ndjson|csv plus the dashboard filters (city, domain,
+    # gender, start, end)
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of {sorted(EXPORT_FORMATS)}"}), 400
+
+    return Response(
+        stream_with_context(export_rows(filters, fmt)),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename=crimes.{fmt}"}
+    )
+
+# ==================================================
+# BACKGROUND JOBS
+# ==================================================
+JOB_KINDS = {
+    "train": lambda body: submit_model_training(body["model"]),
+    "cube": lambda body: submit_cube_build()
+}
+
+@app.route("/api/jobs", methods=["GET", "POST"])
+def jobs_api():
+    if request.method == "GET":
+        return jsonify({"jobs": [job.to_dict() for job in job_queue.jobs()]})
+
+    # Body: {"kind": "train", "model": "<name>"} or {"kind": "cube"}
+    body = request.get_json(silent=True) or {}
+    kind = body.get("kind")
+    if kind not in JOB_KINDS:
+        return jsonify({"error": f"kind must be one of {sorted(JOB_KINDS)}"}), 400
+    if kind == "train" and body.get("model") not in model_registry.names():
+        return jsonify({"error": f"model must be one of {model_registry.names()}"}), 400
+
+    try:
+        return job_response(JOB_KINDS[kind](body))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/jobs/<job_id>")
+def job_status_api(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    return jsonify(job.to_dict())
+
+@app.route("/api/jobs/<job_id>/result")
+def job_result_api(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    return job_response(job)
+
+# ==================================================
+# OBSERVABILITY
+# ==================================================
+@app.route("/metrics")
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/healthz")
+def healthz():
+    # Liveness: the process is up and serving requests
+    return jsonify({"status": "ok", "pid": os.getpid()})
+
+@app.route("/readyz")
+def readyz():
+    # Readiness: data and models are warm (503 until then). Starts the
+    # warmup when no one has (lazy mode, or a host without the gunicorn
+    # hooks); a no-op once it is running or done in this process.
+    warmup.start()
+    body = {"mode": STARTUP_MODE, **warmup.status()}
+    return jsonify(body), 200 if warmup.ready else 503
+
 # ==================================================
 # MISC
 # ==================================================
@@ -855,9 +1744,24 @@ def favicon():
     return app.send_static_file("favicon.ico")
 
 
+# ==================================================
+# IMPORT TIMINGS (REPORTED BY /readyz)
+# ==================================================
+warmup.imports = {
+    "modules_seconds": round(MODULES_IMPORTED - APP_IMPORT_START, 3),
+    "app_seconds": round(time.perf_counter() - APP_IMPORT_START, 3)
+}
+print(f"✅ App imported in {warmup.imports['app_seconds']}s "
+      f"(modules {warmup.imports['modules_seconds']}s, startup mode {STARTUP_MODE})")
+
+
 # ==================================================
 # RUN SERVER
 # ==================================================
 
 if __name__ == "__main__":
+    if STARTUP_MODE == "eager":
+        warmup.run()
+    elif STARTUP_MODE == "background":
+        warmup.start()
     app.run()
@@ -0,0 +1,104 @@
+import os
+import queue
+import threading
+import time
+
+import pandas as pd
+
+from metrics import stage
+
+
+# ==================================================
+# REQUEST MICRO-BATCHING
+# ==================================================
+# Concurrent requests hand their feature rows to one batching thread,
+# which waits at most `max_wait` seconds for more requests (or until
+# `max_rows` rows are pending) and then makes a single predict call for
+# all of them. Under bursty load this replaces many small predict_proba
+# calls, each paying the full per-call overhead of every tree, with a
+# few large ones. An idle server adds at most `max_wait` of latency.
+
+class _Pending:
+
+    def __init__(self, X):
+        self.X = X
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class MicroBatcher:
+
+    def __init__(self, predict_fn, max_rows=4096, max_wait=0.005):
+        self.predict_fn = predict_fn
+        self.max_rows = max_rows
+        self.max_wait = max_wait
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_thread(self):
+        # Started lazily, and again after a fork (threads do not survive
+        # it), so a batcher created in the gunicorn master still works
+        # in every worker.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+
+    def submit(self, X):
+        """Blocks until the batch containing ``X`` is predicted; returns its rows."""
+        self._ensure_thread()
+        pending = _Pending(X)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _collect(self):
+        first = self._queue.get()
+        batch = [first]
+        rows = len(first.X)
+        deadline = time.perf_counter() + self.max_wait
+        while rows < self.max_rows:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            rows += len(item.X)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                X = batch[0].X if len(batch) == 1 else pd.concat(
+                    [p.X for p in batch], ignore_index=True
+                )
+                with stage("predict_batch", rows=len(X)):
+                    result = self.predict_fn(X)
+            except Exception as e:
+                for p in batch:
+                    p.error = e
+                    p.done.set()
+                continue
+
+            self.batches += 1
+            self.requests += len(batch)
+            offset = 0
+            for p in batch:
+                p.result = result[offset:offset + len(p.X)]
+                offset += len(p.X)
+                p.done.set()
@@ -0,0 +1,326 @@
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.synthetic_data import generate_chunk, parse_size, write_dataset  # noqa: E402
+
+
+# ==================================================
+# DATA-SIZE SCALING BENCHMARK
+# ==================================================
+# For every dataset size a fresh worker process imports the app against
+# a synthetic dataset and drives every /api route through the Flask
+# test client, recording cold/warm latency and peak memory. Sizes run
+# in separate processes so one size's caches never help the next.
+#
+#   python -m benchmarks.scaling --sizes 10k,1m,10m --report bench_report.json
+
+# Sample request per route that needs one to reach its 200 path
+# (method, path, JSON body). Paths are formatted with {job_id} (a cube
+# job submitted before the run) and {panels} (every panel name); body
+# None on a POST route means "built by the worker" (_sample_bodies).
+# India at zoom 4 is tiles x=11, y=6..7.
+INDIA_BBOX = "south=6&west=68&north=36&east=98"
+SAMPLE_REQUESTS = {
+    "/api/classification/location/score": ("POST", "/api/classification/location/score",
+                                           {"grid": {"months": list(range(1, 13))}}),
+    "/api/predict/case-closure": ("POST", "/api/predict/case-closure", None),
+    "/api/jobs/<job_id>": ("GET", "/api/jobs/{job_id}", None),
+    "/api/jobs/<job_id>/result": ("GET", "/api/jobs/{job_id}/result", None),
+    "/api/map/bbox": ("GET", f"/api/map/bbox?{INDIA_BBOX}", None),
+    "/api/map/clusters": ("GET", f"/api/map/clusters?{INDIA_BBOX}&zoom=5", None),
+    "/api/map/radius": ("GET", "/api/map/radius?lat=22&lng=79&km=1500", None),
+    "/api/map/tiles/<int:z>/<int:x>/<int:y>": ("GET", "/api/map/tiles/4/11/6", None),
+    "/api/panels": ("GET", "/api/panels?panels={panels}", None),
+}
+
+# Incident records per case-closure prediction request
+CASE_CLOSURE_RECORDS = 100
+
+# Routes that modify the dataset run last, after everything else
+MUTATING_ROUTES = ["/api/ingest/append"]
+
+# Scaling exponent above which an endpoint is flagged
+SUPERLINEAR_EXPONENT = 1.2
+
+
+def _rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+def _append_body(rows):
+    import numpy as np
+    batch = generate_chunk(np.random.default_rng(7), rows + 1, 1000)
+    return batch.to_csv(index=False)
+
+
+def _sample_bodies(crime_app):
+    import numpy as np
+    rng = np.random.default_rng(11)
+    batch = generate_chunk(rng, 1, CASE_CLOSURE_RECORDS)
+
+    # Only categories the case-closure encoders know (the shipped model
+    # was fit on the real extract, not on the synthetic data)
+    loaded = crime_app.loaded_case_closure()
+    encoders = (loaded and loaded[2]) or crime_app.model_registry.get("case_closure_encoders")["encoders"]
+    for column, encoder in encoders.items():
+        if column in batch:
+            batch[column] = rng.choice(encoder.classes_, len(batch))
+
+    return {
+        "/api/predict/case-closure": {"records": json.loads(batch.to_json(orient="records"))}
+    }
+
+
+# ==================================================
+# WORKER (ONE DATASET SIZE)
+# ==================================================
+def _requests(crime_app, client, rules):
+    # rule -> (method, path, JSON body); rules without a usable sample
+    # (path parameters nobody filled in) are left out
+    job_id = client.post("/api/jobs", json={"kind": "cube"}).get_json()["job"]["id"]
+    values = {"job_id": job_id, "panels": ",".join(crime_app.PANELS)}
+    bodies = _sample_bodies(crime_app)
+
+    requests = {}
+    for rule in rules:
+        method, path, body = SAMPLE_REQUESTS.get(rule, ("GET", rule, None))
+        if "<" in path:
+            print(f"⚠️ No sample request for {rule}, skipped")
+            continue
+        requests[rule] = (method, path.format(**values), body if body is not None else bodies.get(rule))
+    return requests
+
+
+def _call(client, request, csv_body=None):
+    method, path, body = request
+    if csv_body is not None:
+        return client.post(path, data=csv_body, content_type="text/csv")
+    if method == "POST":
+        return client.post(path, json=body)
+    return client.get(path)
+
+
+def _measure(client, request, repeat, csv_body=None):
+    # Cold call, traced for peak Python/NumPy allocations
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = _call(client, request, csv_body)
+    cold_ms = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Warm calls, untraced (tracing skews latency)
+    warm = []
+    for _ in range(repeat if csv_body is None else 0):
+        start = time.perf_counter()
+        _call(client, request)
+        warm.append((time.perf_counter() - start) * 1000)
+    warm.sort()
+
+    return {
+        "status": response.status_code,
+        "bytes": len(response.get_data()),
+        "cold_ms": round(cold_ms, 2),
+        "warm_ms_median": round(warm[len(warm) // 2], 2) if warm else None,
+        "warm_ms_max": round(warm[-1], 2) if warm else None,
+        "peak_alloc_mb": round(peak / (1024 * 1024), 2),
+        "rss_mb_after": round(_rss_mb(), 1)
+    }
+
+
+def run_worker(args):
+    result = {"rows": args.rows, "mode": args.mode}
+
+    start = time.perf_counter()
+    import app as crime_app
+    result["import_seconds"] = round(time.perf_counter() - start, 3)
+
+    if args.mode == "store":
+        from cube import write_cube
+        from columnar import read_store
+        from dataset import ingest_csv
+
+        start = time.perf_counter()
+        meta = ingest_csv(crime_app.CRIME_DATA, crime_app.CRIME_STORE)
+        write_cube(
+            read_store(crime_app.CRIME_STORE),
+            crime_app.CRIME_CUBE,
+            meta["source"]["version"]
+        )
+        result["ingest_seconds"] = round(time.perf_counter() - start, 3)
+
+    # Dataset load is measured on its own so it is not charged to
+    # whichever endpoint happens to run first.
+    tracemalloc.start()
+    start = time.perf_counter()
+    if args.mode != "streaming":
+        crime_app.crime_data.frame()
+    crime_app.crime_cube.get()
+    result["load_seconds"] = round(time.perf_counter() - start, 3)
+    result["load_peak_alloc_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+    tracemalloc.stop()
+
+    rules = sorted(
+        r.rule for r in crime_app.app.url_map.iter_rules()
+        if r.rule.startswith("/api")
+    )
+    if args.routes:
+        rules = [r for r in rules if any(p in r for p in args.routes)]
+    rules = [r for r in rules if not any(p in r for p in args.skip)]
+    if args.mode in ("csv", "streaming"):
+        # Appends go to the columnar store and its cube, which CSV and
+        # streaming modes do not serve from
+        rules = [r for r in rules if r not in MUTATING_ROUTES]
+    rules = [r for r in rules if r not in MUTATING_ROUTES] + [r for r in rules if r in MUTATING_ROUTES]
+
+    client = crime_app.app.test_client()
+    requests = _requests(crime_app, client, rules)
+    endpoints = {}
+    for rule in rules:
+        if rule not in requests:
+            continue
+        csv_body = _append_body(args.rows) if rule in MUTATING_ROUTES else None
+        endpoints[rule] = _measure(client, requests[rule], args.repeat, csv_body)
+        print(f"   {rule:<45} {endpoints[rule]['status']} "
+              f"cold {endpoints[rule]['cold_ms']:>10.1f}ms  "
+              f"peak {endpoints[rule]['peak_alloc_mb']:>8.1f}MB", flush=True)
+
+    result["endpoints"] = endpoints
+    result["peak_rss_mb"] = round(_rss_mb(), 1)
+
+    with open(args.result, "w") as fh:
+        json.dump(result, fh, indent=2)
+
+
+# ==================================================
+# DRIVER
+# ==================================================
+def _scaling_exponents(sizes):
+    # Slope of log(latency) against log(rows) between the smallest and
+    # largest size each endpoint succeeded at; ~1 is linear.
+    runs = sorted(
+        (s for s in sizes.values() if "endpoints" in s),
+        key=lambda s: s["rows"]
+    )
+    if len(runs) < 2:
+        return {}
+
+    exponents = {}
+    for rule in runs[-1]["endpoints"]:
+        points = [
+            (r["rows"], r["endpoints"][rule]["cold_ms"])
+            for r in runs
+            if rule in r["endpoints"] and r["endpoints"][rule]["status"] < 500
+        ]
+        if len(points) < 2 or points[0][1] <= 0:
+            continue
+        (n0, t0), (n1, t1) = points[0], points[-1]
+        exponent = math.log(t1 / t0) / math.log(n1 / n0)
+        exponents[rule] = {
+            "exponent": round(exponent, 3),
+            "superlinear": exponent > SUPERLINEAR_EXPONENT
+        }
+    return exponents
+
+
+def run_driver(args):
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mode": args.mode,
+        "repeat": args.repeat,
+        "sizes": {}
+    }
+
+    for label in args.sizes.split(","):
+        rows = parse_size(label)
+        data_dir = os.path.abspath(os.path.join(args.data_root, str(rows)))
+        csv_path = os.path.join(data_dir, "crime_dataset_india.csv")
+        if not os.path.exists(csv_path):
+            print(f"⏳ Generating {rows} rows ...", flush=True)
+            write_dataset(csv_path, rows)
+
+        if args.mode == "csv":
+            # Measure CSV parsing: a columnar store (and its cube) left
+            # by an earlier store-mode run would otherwise be loaded
+            for name in ("crime_store", "crime_cube"):
+                shutil.rmtree(os.path.join(data_dir, name), ignore_errors=True)
+
+        print(f"▶ {rows} rows ({args.mode})", flush=True)
+        result_path = os.path.join(data_dir, "bench_result.json")
+        env = dict(
+            os.environ,
+            CRIME_DATA_DIR=data_dir,
+            MODEL_REGISTRY_DIR=os.path.join(data_dir, "registry"),
+            RESPONSE_CACHE_MB="0",
+            CRIME_JOB_WORKERS="0",
+            CRIME_STREAMING="1" if args.mode == "streaming" else "0"
+        )
+        cmd = [
+            sys.executable, "-m", "benchmarks.scaling", "--worker",
+            "--rows", str(rows), "--mode", args.mode,
+            "--repeat", str(args.repeat), "--result", result_path
+        ]
+        for r in args.routes:
+            cmd += ["--routes", r]
+        for r in args.skip:
+            cmd += ["--skip", r]
+
+        try:
+            subprocess.run(cmd, cwd=BACKEND_DIR, env=env, check=True, timeout=args.timeout)
+            with open(result_path) as fh:
+                report["sizes"][str(rows)] = json.load(fh)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            report["sizes"][str(rows)] = {"rows": rows, "error": str(e)}
+            print(f"❌ {rows} rows failed: {e}")
+
+    report["scaling"] = _scaling_exponents(report["sizes"])
+    flagged = [r for r, s in report["scaling"].items() if s["superlinear"]]
+
+    with open(args.report, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"✅ Report written to {args.report}")
+    if flagged:
+        print("⚠️ Super-linear endpoints:", ", ".join(flagged))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Endpoint latency/memory vs dataset size")
+    parser.add_argument("--sizes", default="10k,1m,10m")
+    parser.add_argument("--mode", choices=["csv", "store", "streaming"], default="store")
+    parser.add_argument("--data-root", default=os.path.join(BACKEND_DIR, "benchmarks", "data"))
+    parser.add_argument("--report", default="bench_report.json")
+    parser.add_argument("--repeat", type=int, default=5, help="warm calls per endpoint")
+    parser.add_argument("--routes", action="append", default=[], help="only routes containing this text")
+    parser.add_argument("--skip", action="append", default=[], help="skip routes containing this text")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per dataset size")
+    # internal: run a single size in this process
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--rows", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(args)
+    else:
+        run_driver(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# ==================================================
+# SYNTHETIC CRIME DATASET GENERATOR
+# ==================================================
+# Writes CSVs with the same schema and value formats as
+# crime_dataset_india.csv, in bounded-memory chunks, so the app can be
+# exercised at sizes we do not have real extracts for.
+
+# The dataset's 29 cities (all in data/city_coords.csv, so every
+# synthetic row reaches the map endpoints)
+CITIES = {
+    "Delhi": 14, "Mumbai": 11, "Bangalore": 9, "Hyderabad": 7,
+    "Kolkata": 6, "Chennai": 6, "Pune": 5, "Lucknow": 4, "Ahmedabad": 4,
+    "Jaipur": 3, "Surat": 2, "Kanpur": 2, "Nagpur": 2, "Indore": 2,
+    "Thane": 2, "Bhopal": 2, "Visakhapatnam": 2, "Patna": 2,
+    "Vasai": 2, "Ghaziabad": 2, "Ludhiana": 2, "Agra": 2, "Nashik": 2,
+    "Faridabad": 1, "Meerut": 1, "Rajkot": 1, "Kalyan": 1, "Varanasi": 1,
+    "Srinagar": 1
+}
+
+CRIME_DESCRIPTIONS = [
+    "IDENTITY THEFT", "HOMICIDE", "KIDNAPPING", "BURGLARY", "VANDALISM",
+    "ASSAULT", "FRAUD", "ROBBERY", "SHOPLIFTING", "ARSON", "COUNTERFEITING",
+    "DOMESTIC VIOLENCE", "CYBERCRIME", "DRUG OFFENSE", "EXTORTION",
+    "FIREARM OFFENSE", "ILLEGAL POSSESSION", "PUBLIC INTOXICATION",
+    "SEXUAL ASSAULT", "TRAFFIC VIOLATION", "VEHICLE - STOLEN"
+]
+
+CRIME_DOMAINS = {
+    "Other Crime": 0.57,
+    "Violent Crime": 0.28,
+    "Fire Accident": 0.1,
+    "Traffic Fatality": 0.05
+}
+
+WEAPONS = ["Blunt Object", "Poison", "Firearm", "Other", "Knife", "Explosives", None]
+GENDERS = ["M", "F", "X"]
+
+DATE_FORMAT = "%d-%m-%Y %H:%M"
+START = pd.Timestamp("2020-01-01")
+DAYS = 365 * 4
+
+# Size labels accepted on the command line
+SIZES = {
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000
+}
+
+
+def parse_size(label):
+    label = label.strip().lower()
+    return SIZES[label] if label in SIZES else int(label)
+
+
+def _weighted(rng, mapping, n):
+    keys = list(mapping)
+    p = np.array(list(mapping.values()), dtype=float)
+    return np.asarray(keys, dtype=object)[rng.choice(len(keys), n, p=p / p.sum())]
+
+
+def generate_chunk(rng, start_report, n):
+    occurred = (
+        START
+        + pd.to_timedelta(rng.integers(0, DAYS, n), unit="D")
+        + pd.to_timedelta(rng.integers(0, 24 * 60, n), unit="min")
+    )
+    reported = occurred + pd.to_timedelta(rng.integers(0, 72 * 60, n), unit="min")
+
+    closed = rng.random(n) < 0.5
+    closed_at = reported + pd.to_timedelta(rng.integers(1, 120, n), unit="D")
+
+    occurred_text = occurred.strftime(DATE_FORMAT)
+
+    return pd.DataFrame({
+        "Report Number": np.arange(start_report, start_report + n),
+        "Date Reported": reported.strftime(DATE_FORMAT),
+        "Date of Occurrence": occurred_text,
+        "Time of Occurrence": occurred_text,
+        "City": _weighted(rng, CITIES, n),
+        "Crime Code": rng.integers(100, 500, n),
+        "Crime Description": np.asarray(CRIME_DESCRIPTIONS, dtype=object)[
+            rng.integers(0, len(CRIME_DESCRIPTIONS), n)
+        ],
+        "Victim Age": rng.integers(10, 80, n),
+        "Victim Gender": np.asarray(GENDERS, dtype=object)[rng.integers(0, 3, n)],
+        "Weapon Used": np.asarray(WEAPONS, dtype=object)[rng.integers(0, len(WEAPONS), n)],
+        "Crime Domain": _weighted(rng, CRIME_DOMAINS, n),
+        "Police Deployed": rng.integers(1, 20, n),
+        "Case Closed": np.where(closed, "Yes", "No"),
+        "Date Case Closed": np.where(closed, closed_at.strftime(DATE_FORMAT), None)
+    })
+
+
+def write_dataset(path, rows, seed=42, chunk_size=500_000):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    tmp = path + ".tmp"
+    written = 0
+    while written < rows:
+        n = min(chunk_size, rows - written)
+        chunk = generate_chunk(rng, written + 1, n)
+        chunk.to_csv(tmp, mode="w" if written == 0 else "a", header=written == 0, index=False)
+        written += n
+    os.replace(tmp, path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic crime datasets")
+    parser.add_argument("--sizes", default="10k,1m,10m", help="comma-separated row counts (10k, 1m, 10m or integers)")
+    parser.add_argument("--out", default=os.path.join("benchmarks", "data"))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    for label in args.sizes.split(","):
+        rows = parse_size(label)
+        path = os.path.join(args.out, f"{rows}", "crime_dataset_india.csv")
+        start = time.perf_counter()
+        write_dataset(path, rows, seed=args.seed)
+        print(f"✅ {rows} rows -> {path} ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
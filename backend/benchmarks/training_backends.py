@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.synthetic_data import parse_size, write_dataset  # noqa: E402
+from classifiers import TRAINING_BACKENDS  # noqa: E402
+from streaming import DEFAULT_CHUNK_SIZE  # noqa: E402
+
+
+# ==================================================
+# TRAINING BACKEND COMPARISON
+# ==================================================
+# Trains the crime-category and location-risk models with every
+# training backend on the same CSV and reports training time, peak
+# memory and holdout accuracy side by side. Each backend runs in its own
+# process so peak RSS is not shared; exact and hist include parsing the
+# CSV into a frame, incremental streams it in --chunk-size rows.
+#
+#   python -m benchmarks.training_backends --size 1m
+#   python -m benchmarks.training_backends --data data/crime_dataset_india.csv
+
+def _rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+def _accuracy(bundle):
+    metrics = bundle["metrics"]
+    if "accuracy" in metrics:
+        return metrics["accuracy"]
+    cm = metrics["confusion_matrix"]
+    total = sum(map(sum, cm))
+    return round(sum(cm[i][i] for i in range(len(cm))) / total, 4) if total else None
+
+
+# ==================================================
+# WORKER (ONE BACKEND)
+# ==================================================
+def run_worker(args):
+    from classifiers import train_category_model, train_location_model
+    from dataset import CrimeDataset
+    from incremental import train_category_model_incremental, train_location_model_incremental
+    from streaming import StreamingCrimeSource
+
+    result = {"backend": args.backend, "rss_mb_start": round(_rss_mb(), 1), "models": {}}
+
+    if args.backend == "incremental":
+        source = StreamingCrimeSource(args.data, chunk_size=args.chunk_size)
+        trainers = {
+            "crime_category": lambda: train_category_model_incremental(source.iter_chunks),
+            "location_risk": lambda: train_location_model_incremental(source.iter_chunks)
+        }
+    else:
+        start = time.perf_counter()
+        df = CrimeDataset(args.data).frame()
+        result["load_seconds"] = round(time.perf_counter() - start, 3)
+        result["rows"] = len(df)
+        trainers = {
+            "crime_category": lambda: train_category_model(df, backend=args.backend),
+            "location_risk": lambda: train_location_model(df, backend=args.backend)
+        }
+
+    for name, train in trainers.items():
+        start = time.perf_counter()
+        bundle = train()
+        result["models"][name] = {
+            "estimator": type(bundle["model"]).__name__,
+            "train_seconds": round(time.perf_counter() - start, 3),
+            "accuracy": _accuracy(bundle),
+            "peak_rss_mb": round(_rss_mb(), 1)
+        }
+        m = result["models"][name]
+        print(f"   {name:<15} {m['estimator']:<32} {m['train_seconds']:>8.2f}s  "
+              f"acc {m['accuracy']}  peak {m['peak_rss_mb']:.0f}MB", flush=True)
+
+    result["peak_rss_mb"] = round(_rss_mb(), 1)
+    with open(args.result, "w") as fh:
+        json.dump(result, fh, indent=2)
+
+
+# ==================================================
+# DRIVER
+# ==================================================
+def run_driver(args):
+    data = args.data
+    if data is None:
+        rows = parse_size(args.size)
+        data = os.path.abspath(os.path.join(args.data_root, str(rows), "crime_dataset_india.csv"))
+        if not os.path.exists(data):
+            print(f"⏳ Generating {rows} rows ...", flush=True)
+            write_dataset(data, rows)
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "data": data,
+        "chunk_size": args.chunk_size,
+        "backends": {}
+    }
+
+    for backend in args.backends.split(","):
+        print(f"▶ {backend}", flush=True)
+        result_path = os.path.join(os.path.dirname(data), f"train_{backend}.json")
+        cmd = [
+            sys.executable, "-m", "benchmarks.training_backends", "--worker",
+            "--backend", backend, "--data", data,
+            "--chunk-size", str(args.chunk_size), "--result", result_path
+        ]
+        try:
+            subprocess.run(cmd, cwd=BACKEND_DIR, check=True, timeout=args.timeout)
+            with open(result_path) as fh:
+                report["backends"][backend] = json.load(fh)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            report["backends"][backend] = {"backend": backend, "error": str(e)}
+            print(f"❌ {backend} failed: {e}")
+
+    with open(args.report, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"✅ Report written to {args.report}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Training time / memory / accuracy per training backend")
+    parser.add_argument("--backends", default=",".join(TRAINING_BACKENDS))
+    parser.add_argument("--data", help="crime CSV to train on (default: synthetic --size rows)")
+    parser.add_argument("--size", default="1m")
+    parser.add_argument("--data-root", default=os.path.join(BACKEND_DIR, "benchmarks", "data"))
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--timeout", type=int, default=3600)
+    parser.add_argument("--report", default="training_backends_report.json")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(args)
+    else:
+        if args.data:
+            args.data = os.path.abspath(args.data)
+        run_driver(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.synthetic_data import generate_chunk  # noqa: E402
+from case_closure import (  # noqa: E402
+    encode_case_closure_records,
+    fit_case_closure_encoders
+)
+from classifiers import (  # noqa: E402
+    CATEGORY_FEATURES,
+    train_category_model,
+    train_location_model
+)
+from dataset import normalize_crime_frame  # noqa: E402
+from sklearn.ensemble import RandomForestClassifier  # noqa: E402
+from tree_engine import FlatEnsemble  # noqa: E402
+
+
+# ==================================================
+# TREE-ENSEMBLE INFERENCE BENCHMARK
+# ==================================================
+# Scores the app's three tree ensembles with sklearn's predict_proba and
+# with the flat engine at batch sizes from 1 to 100k rows, checks the
+# outputs are identical and reports latency per call and throughput.
+# Models are trained on a synthetic dataset with the app's own trainers
+# (and the notebook's settings for the case-closure forest).
+#
+#   python -m benchmarks.tree_inference --batches 1,10,100,1000,10000,100000
+
+DEFAULT_BATCHES = "1,10,100,1000,10000,100000"
+
+
+def _synthetic_frame(rows, seed):
+    df = generate_chunk(np.random.default_rng(seed), 1, rows)
+    return normalize_crime_frame(df)
+
+
+def _category_matrix(df, bundle):
+    X = df.rename(columns={"hour": "Hour"})[CATEGORY_FEATURES].dropna().copy()
+    X["City"] = bundle["encoders"]["City"].transform(X["City"])
+    X["Victim Gender"] = bundle["encoders"]["Victim Gender"].transform(X["Victim Gender"])
+    return X.astype(np.float64)
+
+
+def _location_matrix(df, bundle):
+    X = df[["Month", "Victim Age", "Police Deployed"]].assign(
+        City_encoded=bundle["encoders"]["City"].transform(df["City"])
+    )[bundle["features"]]
+    return X.fillna(0).astype(np.float64)
+
+
+def _case_closure_model(df):
+    # Notebook configuration: 200 trees, balanced classes, full depth
+    encoders = fit_case_closure_encoders(df)["encoders"]
+    records = df.drop(columns=["Date Reported"]).to_dict("records")
+    X = encode_case_closure_records(records, encoders)
+    y = df["Date Case Closed"].notna().astype(int)
+    model = RandomForestClassifier(n_estimators=200, random_state=42, class_weight="balanced")
+    return model.fit(X, y), X
+
+
+def build_models(train_rows, seed):
+    df = _synthetic_frame(train_rows, seed)
+
+    category = train_category_model(df)
+    location = train_location_model(df)
+    closure, closure_X = _case_closure_model(df)
+
+    return {
+        "crime_category (RandomForest)": (category["model"], _category_matrix(df, category)),
+        "location_risk (GradientBoosting)": (location["model"], _location_matrix(df, location)),
+        "case_closure (RandomForest)": (closure, closure_X)
+    }
+
+
+def _time_calls(fn, min_seconds, max_calls):
+    times = []
+    deadline = time.perf_counter() + min_seconds
+    while len(times) < max_calls and (not times or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def bench_model(model, pool, batches, min_seconds, max_calls, seed):
+    engine = FlatEnsemble.from_sklearn(model)
+    rng = np.random.default_rng(seed)
+    results = []
+    for n in batches:
+        X = pool.iloc[rng.integers(0, len(pool), n)].reset_index(drop=True)
+
+        expected = model.predict_proba(X)
+        got = engine.predict_proba(X)
+
+        sk = _time_calls(lambda: model.predict_proba(X), min_seconds, max_calls)
+        flat = _time_calls(lambda: engine.predict_proba(X), min_seconds, max_calls)
+        results.append({
+            "batch": n,
+            "identical": bool(np.array_equal(expected, got)),
+            "sklearn_ms": round(sk * 1000, 3),
+            "flat_ms": round(flat * 1000, 3),
+            "speedup": round(sk / flat, 2) if flat else None,
+            "sklearn_rows_per_s": round(n / sk),
+            "flat_rows_per_s": round(n / flat)
+        })
+        r = results[-1]
+        print(f"   {n:>7} rows  sklearn {r['sklearn_ms']:>10.3f}ms  flat {r['flat_ms']:>10.3f}ms  "
+              f"x{r['speedup']:<6} identical={r['identical']}", flush=True)
+    return {"engine": engine.meta, "batches": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flat tree engine vs sklearn predict_proba")
+    parser.add_argument("--batches", default=DEFAULT_BATCHES)
+    parser.add_argument("--train-rows", type=int, default=20_000)
+    parser.add_argument("--pool-rows", type=int, default=20_000, help="rows batches are sampled from")
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="timing budget per measurement")
+    parser.add_argument("--max-calls", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--report", default="tree_inference_report.json")
+    args = parser.parse_args(argv)
+
+    batches = [int(b) for b in args.batches.split(",")]
+    print(f"⏳ Training models on {args.train_rows} synthetic rows ...", flush=True)
+    models = build_models(args.train_rows, args.seed)
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "models": {}
+    }
+    for name, (model, pool) in models.items():
+        print(f"▶ {name}", flush=True)
+        report["models"][name] = bench_model(
+            model, pool.head(args.pool_rows), batches, args.min_seconds, args.max_calls, args.seed
+        )
+
+    with open(args.report, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"✅ Report written to {args.report}")
+
+    mismatched = [
+        name for name, r in report["models"].items()
+        if not all(b["identical"] for b in r["batches"])
+    ]
+    if mismatched:
+        print("❌ Outputs differ from sklearn for:", ", ".join(mismatched))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import numpy as np
+
+
+# ==================================================
+# SERVER-SIDE DISTRIBUTION SUMMARIES
+# ==================================================
+# Distributions are summarized from (distinct value, count) pairs, so the
+# payload size depends on the value range, not on the number of rows:
+#
+#   histogram  fixed-width bins, np.bincount over the value offsets
+#   box        quartiles interpolated exactly like np.quantile on the
+#              expanded rows (cumulative counts + searchsorted), and
+#              Tukey fences: the most extreme values within 1.5 IQR
+#
+# The streaming aggregates already keep exact per-age counts, so both
+# serving modes return the same summary.
+
+AGE_BIN_WIDTH = 5
+FENCE_IQR = 1.5
+
+
+def integer_counts(values):
+    """(distinct values ascending, counts) of an integer array."""
+    values = np.asarray(values, dtype=np.int64)
+    if not len(values):
+        return values, values
+    low = values.min()
+    counts = np.bincount(values - low)
+    present = np.flatnonzero(counts)
+    return present + low, counts[present]
+
+
+def weighted_quantiles(values, counts, qs):
+    """np.quantile(np.repeat(values, counts), qs) without the repeat."""
+    cum = np.cumsum(counts)
+    pos = np.asarray(qs, dtype=np.float64) * (cum[-1] - 1)
+    lo = np.floor(pos)
+    v_lo = values[np.searchsorted(cum, lo, side="right")]
+    v_hi = values[np.searchsorted(cum, np.ceil(pos), side="right")]
+    return v_lo + (v_hi - v_lo) * (pos - lo)
+
+
+def histogram(values, counts, width):
+    start = values[0] // width * width
+    bins = np.bincount((values - start) // width, weights=counts).astype(np.int64)
+    edges = start + width * np.arange(len(bins) + 1)
+    return {"edges": edges.tolist(), "counts": bins.tolist()}
+
+
+def box_summary(values, counts):
+    q1, median, q3 = weighted_quantiles(values, counts, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = (values >= q1 - FENCE_IQR * iqr) & (values <= q3 + FENCE_IQR * iqr)
+    return {
+        "q1": float(q1),
+        "median": float(median),
+        "q3": float(q3),
+        "lower_fence": float(values[inside].min()),
+        "upper_fence": float(values[inside].max()),
+        "outliers": int(counts[~inside].sum())
+    }
+
+
+def distribution_summary(values, counts, width):
+    """Count, mean, range, box and histogram of (value, count) pairs."""
+    values = np.asarray(values, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.int64)
+    keep = counts > 0
+    values, counts = values[keep], counts[keep]
+    order = np.argsort(values)
+    values, counts = values[order], counts[order]
+
+    total = int(counts.sum())
+    if not total:
+        return {"count": 0, "mean": None, "min": None, "max": None, "box": None,
+                "histogram": {"edges": [], "counts": []}}
+    return {
+        "count": total,
+        "mean": float((values * counts).sum() / total),
+        "min": int(values[0]),
+        "max": int(values[-1]),
+        "box": box_summary(values, counts),
+        "histogram": histogram(values, counts, width)
+    }
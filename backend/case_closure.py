@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+from dataset import guess_date_format
+
+
+# ==================================================
+# CASE CLOSURE PREDICTION (NOTEBOOK MODEL)
+# ==================================================
+# Serves final_crime_case_prediction_model.joblib, the RandomForest from
+# notebooks/model_training.ipynb. Requests are encoded exactly like the
+# notebook built its training matrix: label encoders fit on the string
+# values of the full dataset, missing weapons as "Not Reported" and
+# calendar features from the occurrence date + time.
+
+# Columns the notebook label-encodes
+LABEL_COLUMNS = [
+    "City",
+    "Crime Domain",
+    "Victim Gender",
+    "Weapon Used",
+    "Case Closed"
+]
+
+NUMERIC_COLUMNS = [
+    "Crime Code",
+    "Victim Age",
+    "Police Deployed"
+]
+
+# Training column order of the notebook's X
+CASE_CLOSURE_FEATURES = [
+    "City",
+    "Crime Code",
+    "Victim Age",
+    "Victim Gender",
+    "Weapon Used",
+    "Crime Domain",
+    "Police Deployed",
+    "Case Closed",
+    "year",
+    "month",
+    "day",
+    "day_of_week",
+    "hour",
+    "is_weekend"
+]
+
+MISSING_WEAPON = "Not Reported"
+
+
+def _as_label_strings(values):
+    # astype(str) as the notebook saw it: missing values become "nan"
+    values = pd.Series(values, dtype=object)
+    return values.where(values.notna(), "nan").map(str)
+
+
+def fit_case_closure_encoders(df):
+    # Registry trainer: only the encoders are fit here, the model itself
+    # comes from the notebook.
+    from sklearn.preprocessing import LabelEncoder
+
+    encoders = {}
+    for col in LABEL_COLUMNS:
+        values = df[col]
+        if col == "Weapon Used":
+            values = values.astype(object).fillna(MISSING_WEAPON)
+        # classes_ only depend on the distinct values
+        le = LabelEncoder()
+        le.fit(_as_label_strings(pd.unique(values)))
+        encoders[col] = le
+
+    return {
+        "encoders": encoders,
+        "metrics": {
+            "classes": {col: le.classes_.tolist() for col, le in encoders.items()}
+        }
+    }
+
+
+def encoders_from_classes(classes):
+    # Rebuilds fitted LabelEncoders from recorded classes_ lists
+    from sklearn.preprocessing import LabelEncoder
+
+    encoders = {}
+    for col, values in classes.items():
+        le = LabelEncoder()
+        le.classes_ = np.asarray(values, dtype=object)
+        encoders[col] = le
+    return encoders
+
+
+def _parse_datetimes(values):
+    values = pd.Series(values, dtype=object)
+    date_format = guess_date_format(values)
+    parsed = pd.to_datetime(values, format=date_format, errors="coerce")
+    if parsed.isna().any():
+        # Mixed formats in one request: fall back to per-value parsing
+        parsed = pd.to_datetime(values, format="mixed", dayfirst=True, errors="coerce")
+    return parsed
+
+
+def encode_case_closure_records(records, encoders, feature_names=None):
+    """Builds the model matrix for a list of incident dicts.
+
+    Records use the CSV column names. Raises ValueError naming the
+    missing fields, unparseable dates or unseen categories.
+    """
+    df = pd.DataFrame.from_records(records)
+    required = LABEL_COLUMNS + NUMERIC_COLUMNS + ["Date of Occurrence"]
+    missing = [c for c in required if c not in df.columns and c != "Weapon Used"]
+    if missing:
+        raise ValueError(f"Missing fields: {missing}")
+
+    X = pd.DataFrame(index=df.index)
+
+    # ---- Label encoded columns ----
+    unknown = {}
+    for col in LABEL_COLUMNS:
+        values = df[col] if col in df.columns else pd.Series(None, index=df.index, dtype=object)
+        if col == "Weapon Used":
+            values = values.astype(object).fillna(MISSING_WEAPON)
+        classes = encoders[col].classes_
+        codes = pd.Categorical(_as_label_strings(values), categories=classes).codes
+        if (codes < 0).any():
+            unknown[col] = sorted(set(_as_label_strings(values)[codes < 0]))
+        X[col] = codes
+    if unknown:
+        raise ValueError(f"Unknown categories: {unknown}")
+
+    # ---- Numeric columns ----
+    for col in NUMERIC_COLUMNS:
+        X[col] = pd.to_numeric(df[col], errors="coerce")
+    bad = [c for c in NUMERIC_COLUMNS if X[c].isna().any()]
+    if bad:
+        raise ValueError(f"Non-numeric values in: {bad}")
+
+    # ---- Calendar features (occurrence date + time of day) ----
+    date = _parse_datetimes(df["Date of Occurrence"]).dt.normalize()
+    if "Time of Occurrence" in df.columns:
+        time = _parse_datetimes(df["Time of Occurrence"])
+        occurred = date + (time - time.dt.normalize()).fillna(pd.Timedelta(0))
+    else:
+        occurred = date
+    if occurred.isna().any():
+        raise ValueError("Unparseable Date of Occurrence")
+
+    X["year"] = occurred.dt.year
+    X["month"] = occurred.dt.month
+    X["day"] = occurred.dt.day
+    X["day_of_week"] = occurred.dt.dayofweek
+    X["hour"] = occurred.dt.hour
+    X["is_weekend"] = X["day_of_week"].isin([5, 6]).astype(int)
+
+    columns = list(feature_names) if feature_names is not None else CASE_CLOSURE_FEATURES
+    return X[columns].astype(np.float64)
@@ -0,0 +1,271 @@
+import numpy as np
+import pandas as pd
+
+from metrics import stage
+from tree_engine import FlatEnsemble
+
+
+# ==================================================
+# CLASSIFICATION MODEL TRAINING
+# ==================================================
+# Each trainer takes the shared crime frame and returns a bundle dict:
+# the fitted model, its encoders and the metrics the API reports.
+# Bundles are stored and versioned by the ModelRegistry.
+#
+# Training backends (MODEL_BACKEND), all producing the same bundle:
+#   exact        RandomForest / GradientBoosting on the full frame
+#   hist         HistGradientBoosting (binned features, all cores)
+#   incremental  SGD logistic regression fit chunk by chunk from the
+#                CSV with bounded memory (see incremental.py)
+#
+# sklearn is imported inside the trainers: the app imports this module
+# at startup but only training needs it.
+TRAINING_BACKENDS = ("exact", "hist", "incremental")
+
+CATEGORY_FEATURES = [
+    "City",
+    "Victim Age",
+    "Victim Gender",
+    "Police Deployed",
+    "Month",
+    "Hour"
+]
+
+LOCATION_FEATURES = [
+    "City_encoded",
+    "Month",
+    "Victim Age",
+    "Police Deployed"
+]
+
+# Rows scored when a model has no impurity-based importances
+PERMUTATION_ROWS = 2000
+
+# HistGradientBoosting bins (and so categories per categorical feature)
+HIST_MAX_BINS = 255
+
+
+def _hist_classifier(X, categorical):
+    from sklearn.ensemble import HistGradientBoostingClassifier
+
+    # Label-encoded columns with more than HIST_MAX_BINS categories are
+    # refused as categorical; they are split as ordinal codes instead
+    native = [c for c in categorical if X[c].max() < HIST_MAX_BINS]
+    for column in categorical:
+        if column not in native:
+            print(f"⚠️ {column} has {int(X[column].max()) + 1} categories "
+                  f"(> {HIST_MAX_BINS}), using ordinal codes")
+    return HistGradientBoostingClassifier(
+        categorical_features=native or None,
+        max_bins=HIST_MAX_BINS,
+        random_state=42
+    )
+
+
+def _feature_importance(model, X_test, y_test):
+    importance = getattr(model, "feature_importances_", None)
+    if importance is not None:
+        return np.asarray(importance)
+
+    from sklearn.inspection import permutation_importance
+
+    # Permutation importance on a test sample, scaled to sum to 1 like
+    # the forest's importances
+    n = min(len(X_test), PERMUTATION_ROWS)
+    result = permutation_importance(
+        model, X_test.iloc[:n], np.asarray(y_test)[:n],
+        n_repeats=3,
+        random_state=42
+    )
+    importance = np.clip(result.importances_mean, 0, None)
+    total = importance.sum()
+    return importance / total if total > 0 else importance
+
+
+# ==================================================
+# MODULE 4.1 — CRIME CATEGORY CLASSIFIER
+# ==================================================
+def prepare_category_frame(df):
+    df = df.dropna(subset=["Crime Domain", "Date Reported"])
+    df = df.rename(columns={"hour": "Hour"})
+    return df.dropna(subset=CATEGORY_FEATURES)
+
+
+def train_category_model(df, backend="exact"):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import confusion_matrix
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder
+
+    # Clean & Prepare Data
+    df = prepare_category_frame(df)
+
+    X = df[CATEGORY_FEATURES].copy()
+    y = df["Crime Domain"]
+
+    # Encoding
+    le_city = LabelEncoder()
+    le_gender = LabelEncoder()
+    le_target = LabelEncoder()
+
+    X["City"] = le_city.fit_transform(X["City"])
+    X["Victim Gender"] = le_gender.fit_transform(X["Victim Gender"])
+    y_encoded = le_target.fit_transform(y)
+
+    # Train Test Split
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y_encoded,
+        test_size=0.3,
+        random_state=42
+    )
+
+    # Model
+    if backend == "hist":
+        model = _hist_classifier(X, ["City", "Victim Gender"])
+    else:
+        model = RandomForestClassifier(
+            n_estimators=150,
+            random_state=42
+        )
+    model.fit(X_train, y_train)
+
+    # Evaluation
+    y_pred = model.predict(X_test)
+    probs = model.predict_proba(X_test)
+    cm = confusion_matrix(y_test, y_pred)
+
+    return {
+        "model": model,
+        "backend": backend,
+        "encoders": {
+            "City": le_city,
+            "Victim Gender": le_gender,
+            "Crime Domain": le_target
+        },
+        "features": CATEGORY_FEATURES,
+        "metrics": {
+            "labels": le_target.classes_.tolist(),
+            "confusion_matrix": cm.tolist(),
+            "probabilities": probs.mean(axis=0).round(3).tolist(),
+            "feature_importance": _feature_importance(model, X_test, y_test).round(3).tolist(),
+            "feature_names": CATEGORY_FEATURES
+        }
+    }
+
+
+# ==================================================
+# MODULE 4.2 — LOCATION RISK CLASSIFIER
+# ==================================================
+def prepare_location_frame(df):
+    return df.dropna(subset=["City", "Date Reported"])
+
+
+def train_location_model(df, backend="exact"):
+    from sklearn.ensemble import GradientBoostingClassifier
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder
+
+    df = prepare_location_frame(df)
+
+    # Encode City
+    le_city = LabelEncoder()
+    city_encoded = le_city.fit_transform(df["City"])
+
+    # Risk threshold: cities above the mean incident count are high risk
+    city_counts = df["City"].value_counts()
+    threshold = city_counts.mean()
+
+    high_risk_cities = city_counts.index[city_counts > threshold]
+    y = df["City"].isin(high_risk_cities).astype(int)
+
+    X = (
+        df[["Month", "Victim Age", "Police Deployed"]]
+        .assign(City_encoded=city_encoded)[LOCATION_FEATURES]
+        .fillna(0)
+    )
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X,
+        y,
+        test_size=0.3,
+        random_state=42
+    )
+
+    if backend == "hist":
+        model = _hist_classifier(X, ["City_encoded"])
+    else:
+        model = GradientBoostingClassifier(random_state=42)
+    model.fit(X_train, y_train)
+
+    return {
+        "model": model,
+        "backend": backend,
+        # Same model as flat node arrays for low-latency scoring
+        "engine": FlatEnsemble.from_sklearn(model) if backend == "exact" else None,
+        "encoders": {"City": le_city},
+        "features": LOCATION_FEATURES,
+        "metrics": {
+            "accuracy": float(round(model.score(X_test, y_test), 4)),
+            "threshold": float(threshold),
+            # Cities in order of first appearance, as the API lists them
+            "cities": [str(c) for c in df["City"].unique()]
+        }
+    }
+
+
+# ==================================================
+# LOCATION RISK — BATCH SCORING
+# ==================================================
+# Scenario used by the location dashboard for every city
+DEFAULT_LOCATION_SCENARIO = {
+    "Month": 6,
+    "Victim Age": 30,
+    "Police Deployed": 5
+}
+
+
+def unknown_cities(bundle, cities):
+    known = bundle["encoders"]["City"].classes_
+    cities = np.asarray(cities, dtype=object)
+    return sorted(set(cities[~np.isin(cities, known)].tolist()), key=str)
+
+
+def score_location_rows(bundle, cities, months, victim_ages, police_deployed):
+    """High-risk probability for many rows in one predict_proba call.
+
+    Every argument is array-like of the same length (scalars broadcast).
+    Cities must be known to the model's encoder.
+    """
+    cities = np.asarray(cities, dtype=object)
+    n = len(cities)
+    if n == 0:
+        return np.empty(0)
+
+    X = pd.DataFrame({
+        "City_encoded": bundle["encoders"]["City"].transform(cities),
+        "Month": np.broadcast_to(np.asarray(months, dtype=float), n),
+        "Victim Age": np.broadcast_to(np.asarray(victim_ages, dtype=float), n),
+        "Police Deployed": np.broadcast_to(np.asarray(police_deployed, dtype=float), n)
+    })[bundle["features"]]
+
+    # Flat engine for small batches; hist / incremental bundles and
+    # bundles trained before it existed only have "model"
+    engine = bundle.get("engine")
+    model = engine if engine is not None and n <= engine.max_rows else bundle["model"]
+    with stage("predict", rows=n):
+        return model.predict_proba(X)[:, 1]
+
+
+def score_location_grid(bundle, cities, months, victim_age, police_deployed):
+    """City x month risk matrix, scored as one flattened batch."""
+    cities = np.asarray(cities, dtype=object)
+    months = np.asarray(months, dtype=float)
+
+    probs = score_location_rows(
+        bundle,
+        np.repeat(cities, len(months)),
+        np.tile(months, len(cities)),
+        victim_age,
+        police_deployed
+    )
+    return probs.reshape(len(cities), len(months))
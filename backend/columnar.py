@@ -0,0 +1,211 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+
+# ==================================================
+# TYPED COLUMNAR STORE
+# ==================================================
+# A store is a directory holding one .npy file per column plus a
+# meta.json describing how to rebuild each column:
+#
+#   categorical  -> integer codes + category list (in meta.json)
+#   int          -> smallest fitting integer dtype
+#   nullable int -> smallest integer dtype + boolean mask file
+#   datetime     -> datetime64[ns] (NaT preserved)
+#   float        -> float64
+#
+# Every file is a plain .npy so columns can be opened with mmap and
+# shared through the page cache.
+#
+# Appended batches are written as self-contained segment stores under
+# segments/ and listed in the parent meta.json, so an append only
+# writes the new rows.
+
+STORE_FORMAT = 1
+META_FILE = "meta.json"
+SEGMENT_DIR = "segments"
+
+
+def _smallest_int(values):
+    if len(values) == 0:
+        return np.int8
+    lo, hi = int(values.min()), int(values.max())
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return dtype
+    return np.int64
+
+
+def _is_integral(values):
+    return np.all(np.isfinite(values)) and np.all(np.mod(values, 1) == 0)
+
+
+def _encode_column(series):
+    """Returns (kind, arrays, extra meta) for one column."""
+    dtype = series.dtype
+
+    if isinstance(dtype, pd.CategoricalDtype) or dtype == object or pd.api.types.is_string_dtype(dtype):
+        cat = series.astype("category").cat
+        codes = cat.codes.to_numpy()
+        return "categorical", {"codes": codes.astype(_smallest_int(codes))}, {
+            "categories": [str(c) for c in cat.categories]
+        }
+
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        values = series.dt.tz_localize(None) if getattr(series.dt, "tz", None) else series
+        return "datetime", {"values": values.to_numpy(dtype="datetime64[ns]")}, {}
+
+    if pd.api.types.is_bool_dtype(dtype) and not series.isna().any():
+        return "bool", {"values": series.to_numpy(dtype=bool)}, {}
+
+    mask = series.isna().to_numpy()
+    if pd.api.types.is_integer_dtype(dtype) or _is_integral(series.dropna().to_numpy(dtype=float)):
+        filled = series.to_numpy(dtype=float, na_value=0)
+        int_dtype = _smallest_int(filled)
+        if mask.any():
+            return "nullable_int", {
+                "values": filled.astype(int_dtype),
+                "mask": mask
+            }, {}
+        return "int", {"values": filled.astype(int_dtype)}, {}
+
+    return "float", {"values": series.to_numpy(dtype=np.float64)}, {}
+
+
+def _decode_column(spec, store_path, mmap):
+    mode = "r" if mmap else None
+
+    def load(key):
+        return np.load(os.path.join(store_path, spec["files"][key]), mmap_mode=mode)
+
+    kind = spec["kind"]
+    if kind == "categorical":
+        categories = pd.Index(spec["categories"], dtype=object)
+        return pd.Categorical.from_codes(load("codes"), categories=categories)
+    if kind == "nullable_int":
+        values = load("values")
+        return pd.arrays.IntegerArray(values, np.asarray(load("mask")))
+    return load("values")
+
+
+def _object_categorical(series):
+    # Stores decode categories as object; batches may infer str dtype
+    cat = series.astype("category").cat
+    return pd.Categorical.from_codes(
+        cat.codes,
+        categories=pd.Index(cat.categories, dtype=object)
+    )
+
+
+def concat_frames(frames):
+    """pd.concat that keeps categorical columns categorical."""
+    frames = [f for f in frames if len(f.columns)]
+    if len(frames) == 1:
+        return frames[0]
+
+    data = {}
+    for name in frames[0].columns:
+        parts = [f[name] for f in frames]
+        if any(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            data[name] = pd.api.types.union_categoricals(
+                [_object_categorical(p) for p in parts]
+            )
+        else:
+            data[name] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(data)
+
+
+def _write_meta(store_path, meta):
+    # meta.json is written last so a half-written store is never picked up
+    tmp = os.path.join(store_path, META_FILE + ".tmp")
+    with open(tmp, "w") as fh:
+        json.dump(meta, fh, indent=2)
+    os.replace(tmp, os.path.join(store_path, META_FILE))
+
+
+def write_store(df, store_path, source=None):
+    os.makedirs(store_path, exist_ok=True)
+    # A rewritten store starts without appended segments
+    shutil.rmtree(os.path.join(store_path, SEGMENT_DIR), ignore_errors=True)
+
+    columns = []
+    for i, name in enumerate(df.columns):
+        kind, arrays, extra = _encode_column(df[name])
+        files = {}
+        for key, arr in arrays.items():
+            fname = f"c{i:03d}.{key}.npy"
+            # Replace rather than overwrite: workers may still have the
+            # old file memory-mapped, and truncating it under them faults.
+            path = os.path.join(store_path, fname)
+            with open(path + ".tmp", "wb") as fh:
+                np.save(fh, np.ascontiguousarray(arr))
+            os.replace(path + ".tmp", path)
+            files[key] = fname
+        columns.append({"name": name, "kind": kind, "files": files, **extra})
+
+    meta = {
+        "format": STORE_FORMAT,
+        "rows": int(len(df)),
+        "source": source or {},
+        "columns": columns,
+        "segments": []
+    }
+    _write_meta(store_path, meta)
+    return meta
+
+
+def append_segment(df, store_path, version):
+    """Writes ``df`` as a new segment and records it in the store meta."""
+    meta = read_meta(store_path)
+    if meta is None:
+        raise FileNotFoundError(f"No columnar store at {store_path}")
+
+    segments = meta.setdefault("segments", [])
+    name = f"{len(segments) + 1:05d}"
+    write_store(df, os.path.join(store_path, SEGMENT_DIR, name))
+
+    segments.append(name)
+    meta["rows"] += int(len(df))
+    meta["version"] = version
+    _write_meta(store_path, meta)
+    return meta
+
+
+def store_version(meta):
+    return meta.get("version") or meta.get("source", {}).get("version")
+
+
+def read_meta(store_path):
+    meta_path = os.path.join(store_path, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as fh:
+        meta = json.load(fh)
+    if meta.get("format") != STORE_FORMAT:
+        return None
+    return meta
+
+
+def read_store(store_path, columns=None, mmap=False):
+    meta = read_meta(store_path)
+    if meta is None:
+        raise FileNotFoundError(f"No columnar store at {store_path}")
+
+    specs = {spec["name"]: spec for spec in meta["columns"]}
+    wanted = list(specs) if columns is None else [c for c in columns if c in specs]
+
+    data = {name: _decode_column(specs[name], store_path, mmap) for name in wanted}
+    frame = pd.DataFrame(data, copy=False)
+
+    segments = [
+        read_store(os.path.join(store_path, SEGMENT_DIR, name), columns=wanted, mmap=mmap)
+        for name in meta.get("segments", [])
+    ]
+    if not segments:
+        return frame
+    return concat_frames([frame] + segments)
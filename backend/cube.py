@@ -0,0 +1,172 @@
+import os
+import threading
+
+from columnar import concat_frames, read_meta, read_store, write_store
+from metrics import stage
+
+
+# ==================================================
+# AGGREGATE COUNT CUBE
+# ==================================================
+# One row per observed combination of the dimensions below with the
+# number of incidents in it. Count-based endpoints roll the cube up to
+# the dimensions they need instead of scanning every incident row.
+# Missing values are kept as their own cells so rollups reproduce the
+# row-level counts exactly (including rows with an unparsable date).
+
+CUBE_DIMENSIONS = [
+    "City",
+    "Year",
+    "Month",
+    "weekday",
+    "hour",
+    "Crime Domain",
+    "Victim Gender Label"
+]
+
+DAY_NAMES = [
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday"
+]
+
+
+def build_cube(df):
+    return (
+        df.groupby(CUBE_DIMENSIONS, observed=True, dropna=False)
+          .size()
+          .reset_index(name="count")
+    )
+
+
+def merge_cubes(cube, delta):
+    """Adds the counts of ``delta`` into ``cube`` (cost ~ number of cells)."""
+    merged = concat_frames([cube, delta])
+    return (
+        merged.groupby(CUBE_DIMENSIONS, observed=True, dropna=False)["count"]
+              .sum()
+              .reset_index()
+    )
+
+
+def rollup(cube, dims, dropna=True):
+    """Counts per combination of ``dims`` (a Series, like groupby().size())."""
+    if isinstance(dims, str):
+        dims = [dims]
+    with stage("aggregate", rows=len(cube)):
+        return (
+            cube.groupby(dims, observed=True, dropna=dropna)["count"]
+                .sum()
+                .astype("int64")
+        )
+
+
+def value_counts(cube, dim):
+    """Same ordering contract as Series.value_counts(): largest first."""
+    return rollup(cube, dim).sort_values(ascending=False)
+
+
+def filter_notna(cube, *dims):
+    mask = cube[list(dims)].notna().all(axis=1)
+    return cube[mask]
+
+
+class CubeSnapshot:
+    """One cube with memoized rollups, shared by the panels of a request.
+
+    Rollups are cached per (dims, notna) and returned as-is: callers must
+    treat them as read-only.
+    """
+
+    def __init__(self, cube):
+        self.cube = cube
+        self._rollups = {}
+
+    def rollup(self, dims, notna=()):
+        """rollup() over the cells where every ``notna`` dimension is set."""
+        if isinstance(dims, str):
+            dims = [dims]
+        key = (tuple(dims), tuple(notna))
+        if key not in self._rollups:
+            cube = filter_notna(self.cube, *notna) if notna else self.cube
+            self._rollups[key] = rollup(cube, dims)
+        return self._rollups[key]
+
+    def value_counts(self, dim, notna=()):
+        return self.rollup(dim, notna).sort_values(ascending=False)
+
+
+class CrimeCube:
+    """Count cube for a CrimeDataset, rebuilt only when its version changes.
+
+    The cube is persisted under ``cube_path`` so a fresh worker picks it
+    up without touching the incident rows. ``builder`` overrides how a
+    missing cube is computed (e.g. by streaming the CSV in chunks).
+    """
+
+    def __init__(self, dataset, cube_path=None, builder=None):
+        self.dataset = dataset
+        self.cube_path = cube_path
+        self.builder = builder or (lambda: build_cube(dataset.frame()))
+        self.version = None
+        self._cube = None
+        self._lock = threading.Lock()
+
+    def _load_persisted(self, version):
+        if not self.cube_path:
+            return None
+        meta = read_meta(self.cube_path)
+        if meta is None or meta.get("source", {}).get("version") != version:
+            return None
+        with stage("cube_load", rows=meta["rows"]):
+            return read_store(self.cube_path)
+
+    def _persist(self, cube, version):
+        if not self.cube_path:
+            return
+        try:
+            write_store(cube, self.cube_path, source={"version": version})
+        except OSError as e:
+            print("⚠️ Could not persist count cube:", e)
+
+    def apply_batch(self, batch, previous_version, version):
+        """Folds newly appended rows into the cube without a rescan.
+
+        Only valid when the cube is current for ``previous_version``;
+        otherwise it is left stale and the next get() rebuilds it.
+        """
+        with self._lock:
+            if self._cube is None or self.version != previous_version:
+                return None
+            with stage("cube_merge", rows=len(batch)):
+                self._cube = merge_cubes(self._cube, build_cube(batch))
+            self.version = version
+            self._persist(self._cube, version)
+        return self._cube
+
+    def get(self):
+        version = self.dataset.current_version()
+        if version == self.version:
+            return self._cube
+
+        with self._lock:
+            if version != self.version:
+                cube = self._load_persisted(version)
+                if cube is None:
+                    with stage("cube_build") as s:
+                        cube = self.builder()
+                        s.rows = len(cube)
+                    self._persist(cube, version)
+                self._cube = cube
+                self.version = version
+        return self._cube
+
+
+def write_cube(df, cube_path, version):
+    cube = build_cube(df)
+    write_store(cube, cube_path, source={"version": version})
+    return cube
@@ -0,0 +1,173 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from metrics import stage
+
+
+# ==================================================
+# INVERTED INDEX OVER THE COUNT CUBE
+# ==================================================
+# Filters (city, crime domain, victim gender, reported-month range)
+# select cube cells, not incident rows, so a filtered endpoint rolls up
+# the matching cells exactly like the unfiltered one rolls up the whole
+# cube.
+#
+# Per filterable dimension the index keeps
+#
+#   codes     value code of every cell (forward index, -1 = missing)
+#   postings  cell positions grouped by value (one stable argsort),
+#             with offsets[v]:offsets[v + 1] the cells of value v
+#
+# Months are coded as sorted ordinals, so a date range is one
+# contiguous slice of its postings. A query takes the candidate cells
+# of the most selective filter and checks the others through their
+# forward codes (a lookup table per filter): the cost is proportional
+# to the smallest posting list, not to the size of the cube.
+
+FILTER_DIMENSIONS = {
+    "city": "City",
+    "domain": "Crime Domain",
+    "gender": "Victim Gender Label"
+}
+
+MONTH = "month"
+
+
+def month_ordinals(cube):
+    # Year * 12 + Month - 1, or -1 where either is missing
+    year = pd.to_numeric(cube["Year"], errors="coerce").to_numpy(dtype=np.float64)
+    month = pd.to_numeric(cube["Month"], errors="coerce").to_numpy(dtype=np.float64)
+    ordinal = year * 12 + month - 1
+    return np.where(np.isnan(ordinal), -1, ordinal).astype(np.int64)
+
+
+def parse_month(value):
+    """"YYYY-MM" or "YYYY-MM-DD" -> month ordinal (ValueError if invalid)."""
+    stamp = pd.Timestamp(value)
+    return stamp.year * 12 + stamp.month - 1
+
+
+def frame_mask(df, filters):
+    """Row mask of a frame with the cube columns (row-level exports)."""
+    mask = np.ones(len(df), dtype=bool)
+    for name, column in FILTER_DIMENSIONS.items():
+        if filters.get(name):
+            mask &= df[column].isin(filters[name]).to_numpy()
+
+    start, end = filters.get(MONTH) or (None, None)
+    if start is not None or end is not None:
+        ordinals = month_ordinals(df)
+        mask &= ordinals >= (0 if start is None else start)
+        if end is not None:
+            mask &= ordinals <= end
+    return mask
+
+
+class _Postings:
+
+    def __init__(self, codes, values):
+        self.codes = codes
+        self.values = values
+        self.position = {v: i for i, v in enumerate(values)}
+        valid = codes >= 0
+        self.postings = np.flatnonzero(valid)[np.argsort(codes[valid], kind="stable")]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(codes[valid], minlength=len(values)))])
+
+    def cells(self, lo, hi):
+        return self.postings[self.offsets[lo]:self.offsets[hi]]
+
+    def size(self, lo, hi):
+        return int(self.offsets[hi] - self.offsets[lo])
+
+
+class CubeIndex:
+    """Inverted index of one cube (one data version)."""
+
+    def __init__(self, cube):
+        self.cube = cube
+        self.dimensions = {}
+        for name, column in FILTER_DIMENSIONS.items():
+            codes, values = pd.factorize(cube[column], sort=True)
+            self.dimensions[name] = _Postings(codes.astype(np.int64), list(values))
+
+        ordinals = month_ordinals(cube)
+        months = np.unique(ordinals[ordinals >= 0])
+        codes = np.where(ordinals >= 0, np.searchsorted(months, ordinals), -1)
+        self.months = months
+        self.dimensions[MONTH] = _Postings(codes.astype(np.int64), list(months))
+
+    def _terms(self, filters):
+        # (postings, code ranges) per active filter
+        terms = []
+        for name, values in filters.items():
+            if name == MONTH or not values:
+                continue
+            index = self.dimensions[name]
+            codes = sorted(index.position[v] for v in set(values) if v in index.position)
+            terms.append((index, [(c, c + 1) for c in codes]))
+
+        start, end = filters.get(MONTH) or (None, None)
+        if start is not None or end is not None:
+            lo = 0 if start is None else int(np.searchsorted(self.months, start, side="left"))
+            hi = len(self.months) if end is None else int(np.searchsorted(self.months, end, side="right"))
+            terms.append((self.dimensions[MONTH], [(lo, hi)] if lo < hi else []))
+        return terms
+
+    def select(self, filters):
+        """Sorted cube positions matching every filter, or None when unfiltered.
+
+        ``filters``: {"city" / "domain" / "gender": values, "month":
+        (first ordinal or None, last ordinal or None)}.
+        """
+        terms = self._terms(filters)
+        if not terms:
+            return None
+
+        # Drive from the most selective filter
+        terms.sort(key=lambda t: sum(t[0].size(lo, hi) for lo, hi in t[1]))
+        index, ranges = terms[0]
+        cells = np.sort(np.concatenate(
+            [index.cells(lo, hi) for lo, hi in ranges] or [np.empty(0, dtype=np.int64)]
+        ))
+
+        for index, ranges in terms[1:]:
+            if not len(cells):
+                break
+            allowed = np.zeros(len(index.values) + 1, dtype=bool)
+            for lo, hi in ranges:
+                allowed[lo:hi] = True
+            # Code -1 (missing) maps to the trailing False
+            cells = cells[allowed[index.codes[cells]]]
+        return cells
+
+    def filter(self, filters):
+        cells = self.select(filters)
+        if cells is None:
+            return self.cube
+        with stage("index_filter", rows=len(cells)):
+            return self.cube.take(cells)
+
+
+class CubeIndexCache:
+    """CubeIndex of a CrimeCube, rebuilt only when the data version changes."""
+
+    def __init__(self, crime_cube):
+        self.crime_cube = crime_cube
+        self.version = None
+        self._index = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        version = self.crime_cube.dataset.current_version()
+        if version == self.version:
+            return self._index
+
+        with self._lock:
+            if version != self.version:
+                cube = self.crime_cube.get()
+                with stage("index_build", rows=len(cube)):
+                    self._index = CubeIndex(cube)
+                self.version = version
+        return self._index
@@ -0,0 +1,430 @@
+import hashlib
+import os
+import threading
+import warnings
+
+import pandas as pd
+
+from metrics import stage
+from columnar import (
+    append_segment,
+    concat_frames,
+    read_meta,
+    read_store,
+    store_version,
+    write_store
+)
+
+
+# ==================================================
+# CRIME DATASET CACHE
+# ==================================================
+# Loads the crime CSV once per worker, normalizes it once and hands
+# the same frame to every endpoint. The frame is shared: handlers must
+# treat it as read-only and never assign columns on it.
+
+# Raw date columns that are parsed once at ingest
+DATE_COLUMNS = [
+    "Date of Occurrence",
+    "Time of Occurrence",
+    "Date Case Closed"
+]
+
+# Columns added by normalize_crime_frame
+DERIVED_COLUMNS = [
+    "Year",
+    "Month",
+    "weekday",
+    "Day",
+    "hour",
+    "Victim Gender Label"
+]
+
+GENDER_LABELS = {
+    "M": "Male",
+    "F": "Female",
+    "X": "Other"
+}
+
+
+def _file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def guess_date_format(values, sample=1000):
+    """strptime format of a text date column, or None.
+
+    Candidates are guessed month-first and day-first from the first
+    values; the one parsing most of a sample wins, so a column whose
+    first dates are ambiguous (02-01-2025) is not read month-first
+    when later ones (25-01-2025) say otherwise.
+    """
+    values = values.dropna().astype(str).iloc[:sample]
+    if values.empty:
+        return None
+    with warnings.catch_warnings():
+        # "dayfirst=False but the value is day-first" notices
+        warnings.simplefilter("ignore", UserWarning)
+        candidates = [
+            fmt
+            for value in values.iloc[:20]
+            for fmt in (
+                pd.tseries.api.guess_datetime_format(value, dayfirst=False),
+                pd.tseries.api.guess_datetime_format(value, dayfirst=True)
+            )
+            if fmt is not None
+        ]
+    if not candidates:
+        return None
+    candidates = list(dict.fromkeys(candidates))
+    return max(
+        candidates,
+        key=lambda fmt: pd.to_datetime(values, format=fmt, errors="coerce").notna().sum()
+    )
+
+
+def guess_date_formats(df):
+    """{column: format} of the raw date columns present in ``df``."""
+    return {
+        col: guess_date_format(df[col])
+        for col in ["Date Reported"] + DATE_COLUMNS
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col])
+    }
+
+
+def parse_dates(values, date_format=None):
+    # With a format, values that do not match it (e.g. ISO 8601 dates in
+    # an appended JSON batch) are parsed as ISO 8601, never re-guessed
+    parsed = pd.to_datetime(values, format=date_format, errors="coerce")
+    if date_format is not None:
+        missing = parsed.isna() & values.notna()
+        if missing.any():
+            parsed[missing] = pd.to_datetime(values[missing], format="ISO8601", errors="coerce")
+    return parsed
+
+
+def normalize_crime_frame(df, date_format=None):
+    df.columns = df.columns.str.strip()
+
+    # ---- Dates ----
+    df["Date Reported"] = parse_dates(df["Date Reported"], date_format)
+    reported = df["Date Reported"].dt
+    df["Year"] = reported.year.astype("Int16")
+    df["Month"] = reported.month.astype("Int8")
+    df["weekday"] = reported.dayofweek.astype("Int8")
+    df["Day"] = reported.day_name()
+
+    # ---- Hour of occurrence ----
+    df["hour"] = (
+        pd.to_numeric(
+            df["Time of Occurrence"].astype(str).str[:2],
+            errors="coerce"
+        )
+        .fillna(0)
+        .astype("int8")
+    )
+
+    # ---- Victim gender label ----
+    df["Victim Gender Label"] = (
+        df["Victim Gender"]
+        .astype(str)
+        .str.strip()
+        .str.upper()
+        .map(GENDER_LABELS)
+        .fillna("Other")
+    )
+    return df
+
+
+def _csv_stat(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _mtime_seconds(stat):
+    return stat[1] // 1_000_000_000
+
+
+def prepare_store_frame(df, date_formats=None):
+    # ``date_formats`` ({column: format}, see guess_date_formats) pins
+    # the parsing to the ingested CSV's formats; appended batches must
+    # not re-guess them from their own first value.
+    if date_formats is None:
+        date_formats = guess_date_formats(df)
+    df = normalize_crime_frame(df, date_format=date_formats.get("Date Reported"))
+
+    # Pre-parse the remaining date columns; keep the raw text only if
+    # nothing in the column looks like a date.
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            parsed = parse_dates(df[col], date_formats.get(col))
+            if parsed.notna().any() or df[col].isna().all():
+                df[col] = parsed
+    return df
+
+
+def store_date_formats(meta):
+    """Date formats the store was ingested with.
+
+    Stores ingested before they were recorded are re-guessed from the
+    head of their source CSV.
+    """
+    source = meta.get("source", {})
+    if "date_formats" in source:
+        return source["date_formats"]
+    path = source.get("path")
+    if path and os.path.exists(path):
+        return guess_date_formats(pd.read_csv(path, nrows=1000))
+    return {}
+
+
+def ingest_csv(csv_path, store_path):
+    """Converts the crime CSV into a typed columnar store."""
+    stat = _csv_stat(csv_path)
+    digest = _file_digest(csv_path)
+
+    df = pd.read_csv(csv_path)
+    date_formats = guess_date_formats(df)
+    df = prepare_store_frame(df, date_formats)
+
+    return write_store(df, store_path, source={
+        "path": os.path.abspath(csv_path),
+        "size": stat[0],
+        "mtime_ns": stat[1],
+        "version": f"{stat[0]}-{digest}",
+        "date_formats": date_formats
+    })
+
+
+class CrimeDataset:
+    """Version-aware, process-wide cache of the parsed crime dataset.
+
+    When a columnar store built from the current CSV exists it is loaded
+    instead of the CSV, restricted to ``columns`` and optionally mmapped.
+    """
+
+    def __init__(self, path, store_path=None, columns=None, mmap=False):
+        self.path = path
+        self.store_path = store_path
+        self.columns = columns
+        self.mmap = mmap
+        self.version = None
+        self.modified = None
+        self.source = None
+        self._frame = None
+        self._pending = []
+        self._report_numbers = None
+        self._stat = None
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def _store_meta_stat(self):
+        if not self.store_path:
+            return None
+        try:
+            st = os.stat(os.path.join(self.store_path, "meta.json"))
+        except FileNotFoundError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def _current_stat(self):
+        return _csv_stat(self.path), self._store_meta_stat()
+
+    def _fresh_store_meta(self, csv_stat):
+        if not self.store_path:
+            return None
+        meta = read_meta(self.store_path)
+        if meta is None:
+            return None
+
+        # A store shipped without its CSV is trusted as-is
+        source = meta.get("source", {})
+        if csv_stat is None or (source.get("size"), source.get("mtime_ns")) == csv_stat:
+            return meta
+        if source.get("size") != csv_stat[0]:
+            return None
+
+        # Same size, new mtime (touched or copied): still fresh if the
+        # content matches the digest recorded at ingest
+        return meta if self._csv_digest(csv_stat) == source.get("version", "").partition("-")[2] else None
+
+    def _csv_digest(self, csv_stat):
+        # Hashed once per CSV stat, not on every freshness check
+        digest = self._digests.get(csv_stat)
+        if digest is None:
+            with stage("hash"):
+                digest = _file_digest(self.path)
+            self._digests = {csv_stat: digest}
+        return digest
+
+    def store_is_current(self):
+        return self._fresh_store_meta(_csv_stat(self.path)) is not None
+
+    def _load_store(self, csv_stat):
+        meta = self._fresh_store_meta(csv_stat)
+        if meta is None:
+            if self.store_path and read_meta(self.store_path) is not None:
+                print("⚠️ Columnar store is stale, falling back to CSV "
+                      "(re-run `python manage.py ingest`)")
+            return False
+
+        version = store_version(meta)
+        if self.version == version and self._frame is not None:
+            return True
+
+        with stage("read_store") as s:
+            self._frame = read_store(self.store_path, columns=self.columns, mmap=self.mmap)
+            s.rows = len(self._frame)
+        self._pending = []
+        self._report_numbers = None
+        self.version = version
+        self.modified = _mtime_seconds(self._store_meta_stat())
+        self.source = "store"
+        print(f"✅ Crime dataset loaded from store ({len(self._frame)} rows, version {self.version})")
+        return True
+
+    def _load_csv(self, csv_stat):
+        if csv_stat is None:
+            raise FileNotFoundError(f"Crime dataset not found: {self.path}")
+        digest = self._csv_digest(csv_stat)
+
+        # mtime moved but content is identical -> keep the parsed frame
+        if self._frame is not None and self.version.endswith(digest):
+            return
+
+        with stage("read_csv") as s:
+            df = pd.read_csv(self.path)
+            s.rows = len(df)
+        with stage("normalize", rows=len(df)):
+            self._frame = normalize_crime_frame(df)
+        self._pending = []
+        self._report_numbers = None
+        self.version = f"{csv_stat[0]}-{digest}"
+        self.modified = _mtime_seconds(csv_stat)
+        self.source = "csv"
+        print(f"✅ Crime dataset loaded ({len(df)} rows, version {self.version})")
+
+    def _load(self, stat):
+        csv_stat, _ = stat
+        if not self._load_store(csv_stat):
+            self._load_csv(csv_stat)
+        self._stat = stat
+
+    def current_version(self):
+        """Reloads if the files changed and returns the data version.
+
+        Unlike frame() this never folds pending appends into the frame,
+        so aggregate-only readers stay cheap after an append.
+        """
+        stat = self._current_stat()
+        if stat != self._stat:
+            with self._lock:
+                if stat != self._stat:
+                    self._load(stat)
+        return self.version
+
+    def last_modified(self):
+        """Unix time the current data version was written.
+
+        The store's meta.json mtime (ingest or last append) when loaded
+        from the store, otherwise the CSV's mtime.
+        """
+        self.current_version()
+        return self.modified
+
+    def frame(self):
+        self.current_version()
+        if self._pending:
+            with self._lock:
+                self._merge_pending()
+        return self._frame
+
+    # ---- Incremental append ----
+    def _merge_pending(self):
+        # Appended batches are folded into the frame lazily, on the
+        # first read that needs row-level data.
+        if self._pending:
+            with stage("merge_appends", rows=sum(len(p) for p in self._pending)):
+                self._frame = concat_frames([self._frame] + self._pending)
+            self._pending = []
+
+    def append(self, records):
+        """Appends raw incident records (CSV column names) to the store.
+
+        Records whose "Report Number" is already present (or repeated in
+        the batch) are dropped. Returns the normalized new rows.
+        """
+        self.current_version()
+        with self._lock:
+            if self.source != "store":
+                raise RuntimeError(
+                    "Incremental append needs the columnar store; "
+                    "run `python manage.py ingest` first"
+                )
+
+            if "Report Number" not in records.columns:
+                raise ValueError("Records must include 'Report Number'")
+
+            # Align the batch with the stored raw columns before normalizing
+            meta = read_meta(self.store_path)
+            raw_columns = [
+                spec["name"] for spec in meta["columns"]
+                if spec["name"] not in DERIVED_COLUMNS
+            ]
+            batch = records.copy()
+            batch.columns = batch.columns.str.strip()
+
+            numbers = pd.to_numeric(batch["Report Number"], errors="coerce")
+            bad = batch["Report Number"][numbers.isna() & batch["Report Number"].notna()]
+            if not bad.empty:
+                raise ValueError(f"Non-numeric 'Report Number' values: {bad.astype(str).tolist()[:10]}")
+            if (numbers.dropna() % 1 != 0).any():
+                raise ValueError("'Report Number' must be an integer")
+            batch["Report Number"] = numbers
+
+            batch = prepare_store_frame(
+                batch.reindex(columns=raw_columns), store_date_formats(meta)
+            )
+            batch = batch.dropna(subset=["Report Number"])
+            batch["Report Number"] = batch["Report Number"].astype("int64")
+            batch = batch.drop_duplicates(subset=["Report Number"])
+
+            if self._report_numbers is None:
+                self._merge_pending()
+                self._report_numbers = set(self._frame["Report Number"].tolist())
+            batch = batch[~batch["Report Number"].isin(self._report_numbers)]
+            if batch.empty:
+                return batch
+
+            batch = batch.reset_index(drop=True)
+            digest = hashlib.blake2b(
+                pd.util.hash_pandas_object(batch["Report Number"], index=False).values.tobytes(),
+                digest_size=8
+            ).hexdigest()
+            chained = hashlib.blake2b(
+                f"{self.version}:{digest}".encode(), digest_size=8
+            ).hexdigest()
+            version = f"{self.version.split('+')[0]}+{chained}"
+
+            append_segment(batch, self.store_path, version)
+
+            projected = batch if self.columns is None else batch[
+                [c for c in self.columns if c in batch.columns]
+            ]
+            self._pending.append(projected)
+            self._report_numbers.update(batch["Report Number"].tolist())
+            self.version = version
+            self._stat = self._current_stat()
+            self.modified = _mtime_seconds(self._stat[1])
+            return batch
+
+    def invalidate(self):
+        with self._lock:
+            self._stat = None
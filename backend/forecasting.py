@@ -0,0 +1,184 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cube import filter_notna, rollup
+from metrics import stage
+
+
+# ==================================================
+# MONTHLY SERIES FORECASTING (ALL SERIES AT ONCE)
+# ==================================================
+# Every City x Crime Domain pair is a monthly count series on one shared
+# calendar (first to last reported month, zero-filled). All series are
+# regressed on the same design matrix
+#
+#   intercept + linear trend + `harmonics` sin/cos pairs of the month of
+#   the year
+#
+# so the whole fit is one least-squares solve with the series as the
+# columns of the right-hand side, and the forecast one matrix product:
+# no per-series Python loop. Prediction intervals use the per-series
+# residual variance and the design's leverage at each future month
+# (shared by all series). Because the fit is linear in the counts, the
+# sum of several series' forecasts is the forecast of their sum.
+#
+# Short histories fall back to fewer seasonal terms so the number of
+# parameters stays well below the number of months.
+
+SERIES_KEYS = ["City", "Crime Domain"]
+
+FORECAST_HORIZON = 24
+SEASON = 12
+HARMONICS = 3
+
+# ~95% two-sided normal interval
+INTERVAL_Z = 1.96
+
+
+def _month_ordinal(year, month):
+    return year.astype(np.int64) * 12 + month.astype(np.int64) - 1
+
+
+def month_label(ordinal):
+    return f"{ordinal // 12:04d}-{ordinal % 12 + 1:02d}"
+
+
+def _harmonics_for(n_months):
+    # At least two seasons for the full seasonal model, one for a single
+    # harmonic, none below that
+    if n_months >= 2 * SEASON:
+        return HARMONICS
+    if n_months >= SEASON:
+        return 1
+    return 0
+
+
+def design_matrix(ordinals, origin, scale, harmonics):
+    """Rows = months (absolute ordinals), columns = regression terms."""
+    ordinals = np.asarray(ordinals, dtype=np.float64)
+    columns = [np.ones_like(ordinals), (ordinals - origin) / scale]
+    month_of_year = np.mod(ordinals, SEASON)
+    for k in range(1, harmonics + 1):
+        angle = 2 * np.pi * k * month_of_year / SEASON
+        columns += [np.sin(angle), np.cos(angle)]
+    return np.column_stack(columns)
+
+
+def monthly_series(cube):
+    """(keys frame, month ordinals, counts matrix n_series x n_months)."""
+    counts = rollup(
+        filter_notna(cube, "Year", "Month"),
+        SERIES_KEYS + ["Year", "Month"]
+    )
+    if counts.empty:
+        return pd.DataFrame(columns=SERIES_KEYS), np.empty(0, dtype=np.int64), np.empty((0, 0))
+
+    index = counts.index
+    ordinal = _month_ordinal(
+        index.get_level_values("Year").to_numpy(),
+        index.get_level_values("Month").to_numpy()
+    )
+    series_codes, keys = pd.MultiIndex.from_arrays(
+        [index.get_level_values(k) for k in SERIES_KEYS]
+    ).factorize(sort=True)
+
+    first, last = ordinal.min(), ordinal.max()
+    Y = np.zeros((len(keys), last - first + 1))
+    Y[series_codes, ordinal - first] = counts.to_numpy()
+
+    keys = keys.to_frame(index=False, name=SERIES_KEYS)
+    return keys, np.arange(first, last + 1), Y
+
+
+class SeriesForecasts:
+    """Fitted history and forecasts for every series of one data version."""
+
+    def __init__(self, keys, ordinals, Y, horizon=FORECAST_HORIZON):
+        self.keys = keys
+        self.history = Y
+        self.months = [month_label(o) for o in ordinals]
+        n_months = len(ordinals)
+
+        future = np.arange(ordinals[-1] + 1, ordinals[-1] + 1 + horizon) if n_months else np.empty(0)
+        self.forecast_months = [month_label(o) for o in future]
+
+        self.harmonics = _harmonics_for(n_months)
+        X = design_matrix(ordinals, ordinals[0] if n_months else 0, max(n_months, 1), self.harmonics)
+        X_future = design_matrix(future, ordinals[0] if n_months else 0, max(n_months, 1), self.harmonics)
+        self.params = X.shape[1]
+
+        if n_months <= self.params:
+            # Too short to fit: carry the series mean forward
+            level = Y.mean(axis=1, keepdims=True) if n_months else np.zeros((len(keys), 1))
+            self.fitted = np.broadcast_to(level, Y.shape).copy()
+            self.forecast = np.repeat(level, horizon, axis=1)
+            self.sigma = np.zeros(len(keys))
+            spread = np.zeros_like(self.forecast)
+        else:
+            # One solve for all series: Y.T is (months x series)
+            coef, _, _, _ = np.linalg.lstsq(X, Y.T, rcond=None)
+            self.fitted = (X @ coef).T
+            self.forecast = (X_future @ coef).T
+            dof = n_months - self.params
+            self.sigma = np.sqrt(((Y - self.fitted) ** 2).sum(axis=1) / dof)
+            # Leverage of each future month, the same for every series
+            leverage = np.einsum("ij,jk,ik->i", X_future, np.linalg.pinv(X.T @ X), X_future)
+            spread = INTERVAL_Z * np.outer(self.sigma, np.sqrt(1 + leverage))
+
+        # Counts are never negative
+        self.lower = np.clip(self.forecast - spread, 0, None)
+        self.upper = np.clip(self.forecast + spread, 0, None)
+        self.forecast = np.clip(self.forecast, 0, None)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def select(self, cities=None, domains=None):
+        """Row positions of the series matching the given cities / domains."""
+        mask = np.ones(len(self.keys), dtype=bool)
+        if cities:
+            mask &= self.keys["City"].isin(cities).to_numpy()
+        if domains:
+            mask &= self.keys["Crime Domain"].isin(domains).to_numpy()
+        return np.flatnonzero(mask)
+
+    def model_info(self):
+        return {
+            "series": len(self.keys),
+            "observations": len(self.months),
+            "parameters": self.params,
+            "trend": True,
+            "harmonics": self.harmonics,
+            "season": SEASON,
+            "interval": 0.95
+        }
+
+
+def fit_series_forecasts(cube, horizon=FORECAST_HORIZON):
+    keys, ordinals, Y = monthly_series(cube)
+    with stage("forecast_fit", rows=len(keys)):
+        return SeriesForecasts(keys, ordinals, Y, horizon)
+
+
+class ForecastCache:
+    """Forecasts for a CrimeCube, refit only when the data version changes."""
+
+    def __init__(self, crime_cube, horizon=FORECAST_HORIZON):
+        self.crime_cube = crime_cube
+        self.horizon = horizon
+        self.version = None
+        self._forecasts = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        version = self.crime_cube.dataset.current_version()
+        if version == self.version:
+            return self._forecasts
+
+        with self._lock:
+            if version != self.version:
+                self._forecasts = fit_series_forecasts(self.crime_cube.get(), self.horizon)
+                self.version = version
+        return self._forecasts
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+
+# ==================================================
+# CITY GAZETTEER + SPATIAL INDEX
+# ==================================================
+# Incidents are located at city level, so spatial queries resolve to
+# the cities of the gazetteer (data/city_coords.csv: City, State, lat,
+# lng) and sum their incident counts. Cities are indexed in a BallTree
+# with the haversine metric:
+#
+#   radius  query_radius around the point (great-circle km)
+#   bbox    query_radius around the box centre out to its farthest
+#           corner (the farthest point of any box up to 180 degrees
+#           wide), then an exact lat/lng test on those candidates
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class Gazetteer:
+
+    def __init__(self, path):
+        cities = pd.read_csv(path)
+        cities.columns = cities.columns.str.strip()
+        cities["City"] = cities["City"].str.strip()
+        cities = cities.dropna(subset=["City", "lat", "lng"]).drop_duplicates("City")
+
+        self.path = path
+        self.cities = cities.reset_index(drop=True)
+        self.names = self.cities["City"].to_numpy(dtype=object)
+        self.lat = self.cities["lat"].to_numpy(dtype=np.float64)
+        self.lng = self.cities["lng"].to_numpy(dtype=np.float64)
+        self._position = {name: i for i, name in enumerate(self.names)}
+        self._tree = None
+
+    @property
+    def tree(self):
+        # Built on the first spatial query (keeps sklearn out of startup)
+        if self._tree is None:
+            from sklearn.neighbors import BallTree
+
+            self._tree = BallTree(np.radians(np.column_stack([self.lat, self.lng])), metric="haversine")
+        return self._tree
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, city):
+        return city in self._position
+
+    def coords(self, city):
+        i = self._position.get(city)
+        return None if i is None else (float(self.lat[i]), float(self.lng[i]))
+
+    def missing(self, cities):
+        """Cities (e.g. from the dataset) the gazetteer has no coordinates for."""
+        return sorted(c for c in set(cities) if c not in self._position)
+
+    def within_radius(self, lat, lng, km):
+        """(positions, distances in km) of the cities within ``km`` of a point, nearest first."""
+        ind, dist = self.tree.query_radius(
+            np.radians([[lat, lng]]),
+            r=km / EARTH_RADIUS_KM,
+            return_distance=True,
+            sort_results=True
+        )
+        return ind[0], dist[0] * EARTH_RADIUS_KM
+
+    def within_bbox(self, south, west, north, east):
+        """Positions of the cities inside a lat/lng box (west <= east)."""
+        center_lat, center_lng = (south + north) / 2, (west + east) / 2
+        reach = _haversine_km(
+            center_lat, center_lng,
+            np.array([south, south, north, north]),
+            np.array([west, east, west, east])
+        ).max()
+        candidates, _ = self.within_radius(center_lat, center_lng, reach + 1e-6)
+        inside = (
+            (self.lat[candidates] >= south) & (self.lat[candidates] <= north)
+            & (self.lng[candidates] >= west) & (self.lng[candidates] <= east)
+        )
+        return np.sort(candidates[inside])
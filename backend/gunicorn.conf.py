@@ -0,0 +1,63 @@
+import gc
+import os
+import shutil
+import tempfile
+
+# ==================================================
+# GUNICORN (SHARED, PRELOADED DATASET)
+# ==================================================
+# The app is imported once in the master and the dataset, count cube and
+# registry models are loaded there before workers fork. The columnar
+# store is memory-mapped read-only, so workers share its pages through
+# the page cache and adding workers does not multiply RSS.
+#
+# Worker count comes from WEB_CONCURRENCY and the port from PORT, as
+# gunicorn reads both by default.
+
+os.environ.setdefault("CRIME_STORE_MMAP", "1")
+
+# Workers write their metrics here and /metrics sums them, so a scrape
+# sees the whole server whichever worker answers it. A fresh directory
+# per server start; removed again on exit.
+METRICS_DIR_PREFIX = "crime-metrics-"
+if "CRIME_METRICS_DIR" not in os.environ:
+    os.environ["CRIME_METRICS_DIR"] = tempfile.mkdtemp(prefix=METRICS_DIR_PREFIX)
+
+preload_app = True
+
+# Threads per worker: lets concurrent requests share a worker's mapped
+# data and be coalesced by the case-closure micro-batcher.
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+
+
+def when_ready(server):
+    import app
+    if app.STARTUP_MODE == "eager":
+        app.preload_shared_data()
+
+    # Preload stages are the master's own series; workers start empty
+    app.metrics.flush()
+
+    # Keep the cyclic GC from touching (and so copying) preloaded objects
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from metrics import metrics
+    metrics.reset()
+
+
+def post_worker_init(worker):
+    # STARTUP_MODE=background: workers accept requests at once and warm
+    # up in a thread (nothing is preloaded in the master, so scale-out
+    # does not wait for it; /readyz turns 200 when the worker is warm)
+    import app
+    if app.STARTUP_MODE == "background":
+        app.warmup.start()
+
+
+def on_exit(server):
+    # Only the temporary directory made above, never a configured one
+    path = os.environ["CRIME_METRICS_DIR"]
+    if os.path.dirname(path) == tempfile.gettempdir() and os.path.basename(path).startswith(METRICS_DIR_PREFIX):
+        shutil.rmtree(path, ignore_errors=True)
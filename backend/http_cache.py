@@ -0,0 +1,139 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request, make_response
+from werkzeug.http import http_date, parse_date
+
+
+# ==================================================
+# HTTP RESPONSE CACHE (ETag / CONDITIONAL GET)
+# ==================================================
+# Successful GET responses are kept pre-serialized and pre-gzipped in an
+# LRU keyed on (endpoint, query string, dataset version). Clients get an
+# ETag + Last-Modified and are answered with 304 when nothing changed.
+# A new dataset version changes every key, so stale entries simply age
+# out of the LRU. Last-Modified is the data's own modification time
+# (``modified_fn``), so it is the same in every worker and survives
+# eviction and refill.
+
+def _accepts_gzip():
+    # Honors q-values ("gzip;q=0" refuses gzip); an explicit gzip entry
+    # takes precedence over "*".
+    accept = request.accept_encodings
+    for value, quality in accept:
+        if value.lower() == "gzip":
+            return quality > 0
+    return accept["*"] > 0
+
+
+class ResponseCache:
+
+    def __init__(self, version_fn, modified_fn, max_bytes=64 * 1024 * 1024, min_gzip_bytes=512):
+        self.version_fn = version_fn
+        self.modified_fn = modified_fn
+        self.max_bytes = max_bytes
+        self.min_gzip_bytes = min_gzip_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ---- LRU ----
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key, entry):
+        if entry["bytes"] > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= old["bytes"]
+            self._entries[key] = entry
+            self.size += entry["bytes"]
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= evicted["bytes"]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    # ---- Entries ----
+    def _build_entry(self, response):
+        body = response.get_data()
+        compressed = None
+        if len(body) >= self.min_gzip_bytes:
+            compressed = gzip.compress(body, compresslevel=6)
+        return {
+            "body": body,
+            "gzip": compressed,
+            "mimetype": response.mimetype,
+            "etag": '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest(),
+            "last_modified": self.modified_fn(),
+            "bytes": len(body) + (len(compressed) if compressed else 0)
+        }
+
+    def _not_modified(self, entry):
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match:
+            tags = [t.strip() for t in if_none_match.split(",")]
+            return entry["etag"] in tags or "*" in tags
+
+        since = parse_date(request.headers.get("If-Modified-Since"))
+        return since is not None and entry["last_modified"] <= since.timestamp()
+
+    def _respond(self, entry, cache_status):
+        if self._not_modified(entry):
+            response = make_response("", 304)
+        else:
+            use_gzip = entry["gzip"] is not None and _accepts_gzip()
+            response = make_response(entry["gzip"] if use_gzip else entry["body"])
+            response.mimetype = entry["mimetype"]
+            if use_gzip:
+                response.headers["Content-Encoding"] = "gzip"
+
+        response.headers["ETag"] = entry["etag"]
+        response.headers["Last-Modified"] = http_date(entry["last_modified"])
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["Vary"] = "Accept-Encoding"
+        response.headers["X-Cache"] = cache_status
+        return response
+
+    def cached(self, view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != "GET":
+                return view(*args, **kwargs)
+
+            key = (
+                request.endpoint,
+                tuple(sorted(request.args.items(multi=True))),
+                tuple(sorted(kwargs.items())),
+                self.version_fn()
+            )
+
+            entry = self._get(key)
+            if entry is not None:
+                self.hits += 1
+                return self._respond(entry, "HIT")
+
+            self.misses += 1
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.direct_passthrough:
+                return response
+
+            entry = self._build_entry(response)
+            self._put(key, entry)
+            return self._respond(entry, "MISS")
+
+        return wrapper
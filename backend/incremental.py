@@ -0,0 +1,260 @@
+import numpy as np
+import pandas as pd
+
+from classifiers import (
+    CATEGORY_FEATURES,
+    LOCATION_FEATURES,
+    prepare_category_frame,
+    prepare_location_frame
+)
+
+
+# ==================================================
+# INCREMENTAL (OUT-OF-CORE) TRAINING
+# ==================================================
+# The "incremental" training backend. Trainers take a `chunks` callable
+# returning a fresh iterator of normalized crime chunks (the streaming
+# reader) and never hold more than one chunk:
+#
+#   pass 1  category sets, city counts and running mean/variance of the
+#           numeric features
+#   pass 2  SGD logistic regression, partial_fit on every chunk's
+#           training rows (repeated for `epochs`)
+#   pass 3  holdout metrics, accumulated chunk by chunk
+#
+# The holdout split is drawn per chunk from a generator reseeded at the
+# start of every pass, so each pass sees the same train / test rows.
+# Memory is bounded by the chunk size, not the dataset size. As in
+# classifiers.py, sklearn is imported when training starts.
+
+TEST_SIZE = 0.3
+
+
+class IncrementalLogisticModel:
+    """SGD logistic regression over the same encoded frame as the tree models.
+
+    ``categorical`` maps a feature to its number of label-encoder codes;
+    those columns are one-hot encoded, the others standardized with the
+    fitted ``scaler``. Exposes classes_, feature_names_in_,
+    feature_importances_, predict_proba and predict like an sklearn
+    classifier.
+    """
+
+    def __init__(self, features, categorical, scaler, classes, random_state=42):
+        from sklearn.linear_model import SGDClassifier
+
+        self.features = list(features)
+        self.categorical = dict(categorical)
+        self.numeric = [f for f in self.features if f not in self.categorical]
+        self.scaler = scaler
+        self.classes_ = np.asarray(classes)
+        self.feature_names_in_ = np.asarray(self.features, dtype=object)
+        self.sgd = SGDClassifier(loss="log_loss", alpha=1e-4, random_state=random_state)
+
+        # Feature each design-matrix column came from
+        owner = [self.features.index(f) for f in self.numeric]
+        for f in self.categorical:
+            owner += [self.features.index(f)] * self.categorical[f]
+        self._owner = np.asarray(owner)
+
+    def _design(self, X):
+        blocks = [self.scaler.transform(X[self.numeric].to_numpy(dtype=np.float64))]
+        for f, n in self.categorical.items():
+            codes = X[f].to_numpy(dtype=np.int64)
+            onehot = np.zeros((len(codes), n))
+            onehot[np.arange(len(codes)), codes] = 1.0
+            blocks.append(onehot)
+        return np.hstack(blocks)
+
+    def partial_fit(self, X, y):
+        self.sgd.partial_fit(self._design(X), y, classes=self.classes_)
+        return self
+
+    def predict_proba(self, X):
+        return self.sgd.predict_proba(self._design(X))
+
+    def predict(self, X):
+        return self.sgd.predict(self._design(X))
+
+    @property
+    def feature_importances_(self):
+        # Mean |coefficient| per design column, summed per source feature
+        weights = np.abs(self.sgd.coef_).mean(axis=0)
+        importance = np.bincount(self._owner, weights=weights, minlength=len(self.features))
+        total = importance.sum()
+        return importance / total if total > 0 else importance
+
+
+def _label_encoder(values):
+    from sklearn.preprocessing import LabelEncoder
+
+    le = LabelEncoder()
+    le.fit(pd.Series(sorted(values)))
+    return le
+
+
+def _holdout(rng, n):
+    return rng.random(n) < TEST_SIZE
+
+
+# ==================================================
+# MODULE 4.1 — CRIME CATEGORY CLASSIFIER (INCREMENTAL)
+# ==================================================
+def _category_matrix(df, encoders):
+    X = df[CATEGORY_FEATURES].copy()
+    X["City"] = encoders["City"].transform(X["City"])
+    X["Victim Gender"] = encoders["Victim Gender"].transform(X["Victim Gender"])
+    return X, encoders["Crime Domain"].transform(df["Crime Domain"])
+
+
+def train_category_model_incremental(chunks, epochs=1, seed=42):
+    from sklearn.metrics import confusion_matrix
+    from sklearn.preprocessing import StandardScaler
+
+    numeric = [f for f in CATEGORY_FEATURES if f not in ("City", "Victim Gender")]
+
+    # ---- Pass 1: category sets + feature scaling ----
+    seen = {"City": set(), "Victim Gender": set(), "Crime Domain": set()}
+    scaler = StandardScaler()
+    rows = 0
+    for chunk in chunks():
+        df = prepare_category_frame(chunk)
+        for col, values in seen.items():
+            values.update(df[col].unique().tolist())
+        if len(df):
+            scaler.partial_fit(df[numeric].to_numpy(dtype=np.float64))
+        rows += len(df)
+
+    encoders = {col: _label_encoder(values) for col, values in seen.items()}
+    model = IncrementalLogisticModel(
+        CATEGORY_FEATURES,
+        {
+            "City": len(encoders["City"].classes_),
+            "Victim Gender": len(encoders["Victim Gender"].classes_)
+        },
+        scaler,
+        classes=np.arange(len(encoders["Crime Domain"].classes_)),
+        random_state=seed
+    )
+
+    # ---- Pass 2: partial_fit on the training rows ----
+    for _ in range(epochs):
+        rng = np.random.default_rng(seed)
+        for chunk in chunks():
+            df = prepare_category_frame(chunk)
+            test = _holdout(rng, len(df))
+            if (~test).any():
+                X, y = _category_matrix(df[~test], encoders)
+                model.partial_fit(X, y)
+
+    # ---- Pass 3: holdout metrics ----
+    k = len(model.classes_)
+    cm = np.zeros((k, k), dtype=np.int64)
+    prob_sum = np.zeros(k)
+    n_test = 0
+    rng = np.random.default_rng(seed)
+    for chunk in chunks():
+        df = prepare_category_frame(chunk)
+        test = _holdout(rng, len(df))
+        if test.any():
+            X, y = _category_matrix(df[test], encoders)
+            probs = model.predict_proba(X)
+            cm += confusion_matrix(y, model.classes_[probs.argmax(axis=1)], labels=model.classes_)
+            prob_sum += probs.sum(axis=0)
+            n_test += len(X)
+
+    return {
+        "model": model,
+        "backend": "incremental",
+        "rows": rows,
+        "encoders": encoders,
+        "features": CATEGORY_FEATURES,
+        "metrics": {
+            "labels": encoders["Crime Domain"].classes_.tolist(),
+            "confusion_matrix": cm.tolist(),
+            "probabilities": (prob_sum / max(n_test, 1)).round(3).tolist(),
+            "feature_importance": model.feature_importances_.round(3).tolist(),
+            "feature_names": CATEGORY_FEATURES
+        }
+    }
+
+
+# ==================================================
+# MODULE 4.2 — LOCATION RISK CLASSIFIER (INCREMENTAL)
+# ==================================================
+def _location_matrix(df, encoders, high_risk):
+    X = (
+        df[["Month", "Victim Age", "Police Deployed"]]
+        .assign(City_encoded=encoders["City"].transform(df["City"]))[LOCATION_FEATURES]
+        .fillna(0)
+    )
+    return X, df["City"].isin(high_risk).astype(int).to_numpy()
+
+
+def train_location_model_incremental(chunks, epochs=1, seed=42):
+    from sklearn.preprocessing import StandardScaler
+
+    numeric = [f for f in LOCATION_FEATURES if f != "City_encoded"]
+
+    # ---- Pass 1: city counts (for the risk threshold) + scaling ----
+    city_counts = pd.Series(dtype="int64")
+    first_seen = {}
+    scaler = StandardScaler()
+    rows = 0
+    for chunk in chunks():
+        df = prepare_location_frame(chunk)
+        counts = df["City"].value_counts()
+        city_counts = city_counts.add(counts, fill_value=0).astype("int64")
+        first_seen.update(dict.fromkeys(df["City"].unique().tolist()))
+        if len(df):
+            scaler.partial_fit(df[numeric].fillna(0).to_numpy(dtype=np.float64))
+        rows += len(df)
+
+    # Risk threshold: cities above the mean incident count are high risk
+    threshold = city_counts.mean()
+    high_risk = city_counts.index[city_counts > threshold]
+
+    cities = list(first_seen)
+    encoders = {"City": _label_encoder(cities)}
+    model = IncrementalLogisticModel(
+        LOCATION_FEATURES,
+        {"City_encoded": len(encoders["City"].classes_)},
+        scaler,
+        classes=np.array([0, 1]),
+        random_state=seed
+    )
+
+    # ---- Pass 2: partial_fit on the training rows ----
+    for _ in range(epochs):
+        rng = np.random.default_rng(seed)
+        for chunk in chunks():
+            df = prepare_location_frame(chunk)
+            test = _holdout(rng, len(df))
+            if (~test).any():
+                model.partial_fit(*_location_matrix(df[~test], encoders, high_risk))
+
+    # ---- Pass 3: holdout accuracy ----
+    correct = n_test = 0
+    rng = np.random.default_rng(seed)
+    for chunk in chunks():
+        df = prepare_location_frame(chunk)
+        test = _holdout(rng, len(df))
+        if test.any():
+            X, y = _location_matrix(df[test], encoders, high_risk)
+            correct += int((model.predict(X) == y).sum())
+            n_test += len(y)
+
+    return {
+        "model": model,
+        "backend": "incremental",
+        "rows": rows,
+        "engine": None,
+        "encoders": encoders,
+        "features": LOCATION_FEATURES,
+        "metrics": {
+            "accuracy": float(round(correct / max(n_test, 1), 4)),
+            "threshold": float(threshold),
+            # Cities in order of first appearance, as the API lists them
+            "cities": [str(c) for c in cities]
+        }
+    }
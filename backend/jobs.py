@@ -0,0 +1,330 @@
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+# ==================================================
+# BACKGROUND JOB QUEUE (PROCESS POOL)
+# ==================================================
+# Model training and other heavy work runs in a small pool of worker
+# processes so request threads only submit and poll. Jobs are keyed:
+# submitting a key that is already queued or running returns the
+# existing job instead of starting a second one. Finished jobs are kept
+# (most recent `keep_finished`) so their results can be fetched.
+#
+# Tasks must be module-level functions. Pool processes are spawned, not
+# forked, so they never inherit locks held by the server's threads; each
+# one imports the task's module once and reuses it.
+#
+# With a JobStore (a small SQLite table) the job records are shared by
+# every process on the host: a status URL works whichever gunicorn
+# worker answers it, and a key already queued or running in another
+# worker is not submitted again. The submitting worker still owns its
+# jobs (pool + done callback); a job whose owner died is marked failed
+# the next time it is read.
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def _run(store_path, job_id, fn, args):
+    # Pool-side wrapper: records that the job started
+    if store_path is not None:
+        JobStore(store_path).started(job_id)
+    return fn(*args)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Job:
+
+    def __init__(self, kind, key, future):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.future = future
+        self.submitted_at = time.time()
+        self.finished_at = None
+
+    @property
+    def status(self):
+        if self.future.done():
+            return FAILED if self.future.exception() is not None else DONE
+        return RUNNING if self.future.running() else QUEUED
+
+    @property
+    def finished(self):
+        return self.future.done()
+
+    def result(self):
+        return self.future.result()
+
+    @property
+    def error(self):
+        return str(self.future.exception()) if self.status == FAILED else None
+
+    def to_dict(self):
+        status = self.status
+        info = {
+            "id": self.id,
+            "kind": self.kind,
+            "status": status,
+            "submitted_at": self.submitted_at,
+            "finished_at": self.finished_at
+        }
+        if self.finished_at is not None:
+            info["seconds"] = round(self.finished_at - self.submitted_at, 3)
+        if status == FAILED:
+            info["error"] = self.error
+        return info
+
+
+class StoredJob(Job):
+    """A job record read from the JobStore (possibly another worker's)."""
+
+    def __init__(self, row):
+        self.id, self.kind, self.key, self._status, self.pid = row[:5]
+        self.submitted_at, self.finished_at, self._error, self._result = row[5:]
+        self.future = None
+
+    @property
+    def status(self):
+        return self._status
+
+    @property
+    def finished(self):
+        return self._status in (DONE, FAILED)
+
+    @property
+    def error(self):
+        return self._error
+
+    def result(self):
+        if self._status == FAILED:
+            raise RuntimeError(self._error)
+        return json.loads(self._result)
+
+
+class JobStore:
+    """Job records in a SQLite table shared by the processes of a host."""
+
+    COLUMNS = "id, kind, key, status, pid, submitted_at, finished_at, error, result"
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT, key TEXT, status TEXT, pid INTEGER, "
+                "submitted_at REAL, finished_at REAL, error TEXT, result TEXT)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, status)")
+
+    def _connect(self):
+        # One short-lived connection per call: safe across threads and forks
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    @staticmethod
+    def key_text(key):
+        return json.dumps(list(key), default=str)
+
+    def _reap(self, db, rows):
+        # Unfinished jobs whose owning process is gone will never finish
+        reaped = []
+        for row in rows:
+            if row[3] in (QUEUED, RUNNING) and not _alive(row[4]):
+                row = (*row[:3], FAILED, row[4], row[5], time.time(),
+                       "worker exited before the job finished", None)
+                db.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                    (FAILED, row[6], row[7], row[0])
+                )
+            reaped.append(row)
+        return reaped
+
+    def claim(self, job, keep_finished):
+        """Inserts ``job`` unless its key is in flight; returns that job if so."""
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = db.execute(
+                    f"SELECT {self.COLUMNS} FROM jobs WHERE key = ? AND status IN (?, ?)",
+                    (self.key_text(job.key), QUEUED, RUNNING)
+                ).fetchall()
+                rows = [r for r in self._reap(db, rows) if r[3] in (QUEUED, RUNNING)]
+                if rows:
+                    db.execute("COMMIT")
+                    return StoredJob(rows[0])
+
+                db.execute(
+                    "INSERT INTO jobs (id, kind, key, status, pid, submitted_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (job.id, job.kind, self.key_text(job.key), QUEUED, os.getpid(), job.submitted_at)
+                )
+                db.execute(
+                    "DELETE FROM jobs WHERE finished_at IS NOT NULL AND id NOT IN "
+                    "(SELECT id FROM jobs WHERE finished_at IS NOT NULL "
+                    "ORDER BY finished_at DESC LIMIT ?)",
+                    (keep_finished,)
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return None
+
+    def started(self, job_id):
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = ? WHERE id = ? AND status = ?",
+                (RUNNING, job_id, QUEUED)
+            )
+
+    def finish(self, job):
+        result = None
+        if job.status == DONE:
+            result = json.dumps(job.result(), default=str)
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ?, result = ? WHERE id = ?",
+                (job.status, job.finished_at, job.error, result, job.id)
+            )
+
+    def get(self, job_id):
+        with self._connect() as db:
+            rows = db.execute(
+                f"SELECT {self.COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchall()
+            rows = self._reap(db, rows)
+        return StoredJob(rows[0]) if rows else None
+
+    def jobs(self):
+        with self._connect() as db:
+            rows = self._reap(db, db.execute(
+                f"SELECT {self.COLUMNS} FROM jobs ORDER BY submitted_at"
+            ).fetchall())
+        return [StoredJob(row) for row in rows]
+
+
+class JobQueue:
+    """Deduplicating job queue backed by a ProcessPoolExecutor.
+
+    ``max_workers=0`` runs every job inline in the submitting thread,
+    which is what command-line tools and benchmarks want. ``store_path``
+    shares job records (and the dedup) with the host's other processes.
+    """
+
+    def __init__(self, max_workers=2, keep_finished=256, start_method="spawn", store_path=None):
+        self.max_workers = max_workers
+        self.keep_finished = keep_finished
+        self.start_method = start_method
+        self.store = JobStore(store_path) if store_path is not None else None
+        self._executor = None
+        self._jobs = OrderedDict()      # id -> Job
+        self._in_flight = {}            # key -> Job
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.start_method)
+            )
+        return self._executor
+
+    def _run_inline(self, fn, args):
+        future = Future()
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _start(self, job, fn, args):
+        args = (self.store.path if self.store is not None else None, job.id, fn, args)
+        if self.max_workers == 0:
+            return self._run_inline(_run, args)
+        try:
+            return self._pool().submit(_run, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start a fresh pool once
+            print("⚠️ Job pool was broken, restarting it")
+            self._executor = None
+            return self._pool().submit(_run, *args)
+
+    def submit(self, kind, fn, *args, key=None):
+        key = key if key is not None else (kind, fn.__name__) + args
+        with self._lock:
+            job = self._in_flight.get(key)
+            if job is not None and not job.finished:
+                return job
+
+            job = Job(kind, key, Future())
+            if self.store is not None:
+                running = self.store.claim(job, self.keep_finished)
+                if running is not None:
+                    return running
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+            self._prune()
+
+        job.future = self._start(job, fn, args)
+        job.future.add_done_callback(lambda _: self._finish(job))
+        return job
+
+    def _finish(self, job):
+        job.finished_at = time.time()
+        if self.store is not None:
+            try:
+                self.store.finish(job)
+            except Exception as e:
+                print(f"⚠️ Could not record job {job.id}:", e)
+        with self._lock:
+            if self._in_flight.get(job.key) is job:
+                del self._in_flight[job.key]
+
+        if job.status == FAILED:
+            print(f"❌ Job {job.kind} {job.id} failed:", job.future.exception())
+
+    def _prune(self):
+        finished = [j for j in self._jobs.values() if j.finished]
+        for job in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None and self.store is not None:
+            job = self.store.get(job_id)
+        return job
+
+    def jobs(self):
+        if self.store is not None:
+            # Local jobs have the live status; the store has everyone's
+            local = self._jobs
+            return [local.get(job.id, job) for job in self.store.jobs()]
+        return list(self._jobs.values())
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -0,0 +1,99 @@
+import argparse
+import time
+
+import joblib
+import pandas as pd
+
+from app import (
+    CASE_CLOSURE_ARTIFACT,
+    CRIME_CUBE,
+    CRIME_DATA,
+    CRIME_STORE,
+    FORECAST_MODEL_PATH,
+    append_crime_records,
+    crime_data,
+    model_registry
+)
+from columnar import read_store
+from cube import write_cube
+from dataset import ingest_csv
+from model_artifacts import save_model_artifact
+
+
+# ==================================================
+# COMMAND LINE TASKS
+# ==================================================
+def cmd_ingest(args):
+    start = time.perf_counter()
+    meta = ingest_csv(args.csv, args.out)
+    cube = write_cube(read_store(args.out), args.cube, meta["source"]["version"])
+    elapsed = time.perf_counter() - start
+    print(f"✅ Wrote {meta['rows']} rows ({len(meta['columns'])} columns) "
+          f"to {args.out} in {elapsed:.2f}s")
+    for spec in meta["columns"]:
+        print(f"   {spec['name']:<22} {spec['kind']}")
+    print(f"✅ Count cube: {len(cube)} cells written to {args.cube}")
+
+
+def cmd_append(args):
+    start = time.perf_counter()
+    for path in args.files:
+        result = append_crime_records(pd.read_csv(path))
+        print(f"✅ {path}: {result['added']} added, {result['duplicates']} duplicates "
+              f"(version {result['version']})")
+    print(f"   done in {time.perf_counter() - start:.2f}s")
+
+
+def cmd_train(args):
+    names = args.models or model_registry.names()
+    for name in names:
+        if args.force:
+            model_registry.train(name)
+        else:
+            model_registry.get(name)
+
+
+def cmd_export_model(args):
+    model = joblib.load(args.source)
+    encoders = model_registry.get("case_closure_encoders")
+    meta = save_model_artifact(
+        model,
+        args.out,
+        encoder_classes=encoders["metrics"]["classes"],
+        data_version=crime_data.current_version(),
+        extra={"source": args.source}
+    )
+    print(f"✅ Exported {meta['estimator']} to {args.out} "
+          f"({meta['bytes'] / 1e6:.1f} MB, {len(meta['features'] or [])} features)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crime analytics maintenance tasks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("ingest", help="convert the crime CSV into the columnar store")
+    p.add_argument("--csv", default=CRIME_DATA)
+    p.add_argument("--out", default=CRIME_STORE)
+    p.add_argument("--cube", default=CRIME_CUBE)
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser("append", help="append new incident CSVs to the columnar store")
+    p.add_argument("files", nargs="+")
+    p.set_defaults(func=cmd_append)
+
+    p = sub.add_parser("train", help="train registry models for the current dataset version")
+    p.add_argument("models", nargs="*", help="model names (default: all)")
+    p.add_argument("--force", action="store_true", help="retrain even if up to date")
+    p.set_defaults(func=cmd_train)
+
+    p = sub.add_parser("export-model", help="export the case closure model as an mmap-loadable artifact")
+    p.add_argument("--source", default=FORECAST_MODEL_PATH)
+    p.add_argument("--out", default=CASE_CLOSURE_ARTIFACT)
+    p.set_defaults(func=cmd_export_model)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
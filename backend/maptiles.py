@@ -0,0 +1,169 @@
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from cube import rollup
+from metrics import stage
+
+
+# ==================================================
+# TILED MAP CLUSTERS (WEB MERCATOR)
+# ==================================================
+# Map points (gazetteer cities with their incident counts) are binned
+# per zoom level into a GRID x GRID grid inside every 256px web-mercator
+# tile; all points in a bin are merged into one cluster (total count,
+# count-weighted centroid, number of points, largest point's label). A
+# tile therefore never returns more than GRID * GRID clusters, however
+# many points it covers.
+#
+# A zoom level is clustered for the whole world at once (one np.unique
+# over packed bin keys) the first time it is requested, with clusters
+# ordered by tile; serving a tile is then a searchsorted range lookup.
+# Levels are built per (data version, domain filter) and kept in a small
+# LRU, so new data simply ages the old ones out.
+
+GRID = 8
+MAX_ZOOM = 18
+MAX_TILES = 64
+
+# Web-mercator latitude limit
+MAX_LAT = 85.05112878
+
+
+def mercator(lat, lng):
+    """Normalized web-mercator coordinates in [0, 1) (x east, y south)."""
+    lat = np.radians(np.clip(lat, -MAX_LAT, MAX_LAT))
+    x = (np.asarray(lng, dtype=np.float64) + 180.0) / 360.0
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / np.pi) / 2.0
+    return np.clip(x, 0, np.nextafter(1, 0)), np.clip(y, 0, np.nextafter(1, 0))
+
+
+def tile_bounds(z, x, y):
+    """(south, west, north, east) of tile z/x/y in degrees."""
+    n = 2 ** z
+
+    def lat(ty):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+
+    return lat(y + 1), x / n * 360.0 - 180.0, lat(y), (x + 1) / n * 360.0 - 180.0
+
+
+def tile_range(z, south, west, north, east):
+    """(x0, x1, y0, y1) inclusive tile ranges covering a bbox at zoom z."""
+    n = 2 ** z
+    (x0, x1), (y1, y0) = (
+        np.floor(v * n).astype(int) for v in mercator([south, north], [west, east])
+    )
+    return int(x0), int(min(x1, n - 1)), int(y0), int(min(y1, n - 1))
+
+
+class _Level:
+    # Clusters of one zoom level, ordered by (tile x, tile y)
+
+    def __init__(self, z, wx, wy, lat, lng, counts, labels):
+        self.z = z
+        if not len(counts):
+            # No weighted points (empty data or a filter matching nothing)
+            self.tiles = np.empty(0, dtype=np.int64)
+            self.count = self.points = np.empty(0, dtype=np.int64)
+            self.lat = self.lng = np.empty(0, dtype=np.float64)
+            self.label = np.empty(0, dtype=object)
+            return
+
+        bins = 2 ** z * GRID
+        bx = (wx * bins).astype(np.int64)
+        by = (wy * bins).astype(np.int64)
+
+        cells, inverse = np.unique(bx * bins + by, return_inverse=True)
+        total = np.bincount(inverse, weights=counts, minlength=len(cells))
+        self.count = total.astype(np.int64)
+        self.lat = np.bincount(inverse, weights=counts * lat, minlength=len(cells)) / total
+        self.lng = np.bincount(inverse, weights=counts * lng, minlength=len(cells)) / total
+        self.points = np.bincount(inverse, minlength=len(cells))
+
+        # Label of the largest point in each cluster
+        order = np.lexsort((-counts, inverse))
+        first = np.flatnonzero(np.r_[True, inverse[order][1:] != inverse[order][:-1]])
+        self.label = labels[order[first]]
+
+        # Order clusters by tile for range lookups
+        tiles = (cells // bins // GRID) * (2 ** z) + (cells % bins) // GRID
+        by_tile = np.argsort(tiles, kind="stable")
+        self.tiles = tiles[by_tile]
+        for name in ("count", "lat", "lng", "points", "label"):
+            setattr(self, name, getattr(self, name)[by_tile])
+
+    def tile(self, x, y):
+        key = x * (2 ** self.z) + y
+        start, end = np.searchsorted(self.tiles, [key, key + 1])
+        return [
+            {
+                "lat": round(float(self.lat[i]), 5),
+                "lng": round(float(self.lng[i]), 5),
+                "count": int(self.count[i]),
+                "points": int(self.points[i]),
+                "label": str(self.label[i])
+            }
+            for i in range(start, end)
+        ]
+
+
+class TileIndex:
+    """Zoom-level clusters over a set of weighted points."""
+
+    def __init__(self, lat, lng, counts, labels):
+        keep = np.asarray(counts) > 0
+        self.lat = np.asarray(lat, dtype=np.float64)[keep]
+        self.lng = np.asarray(lng, dtype=np.float64)[keep]
+        self.counts = np.asarray(counts, dtype=np.float64)[keep]
+        self.labels = np.asarray(labels, dtype=object)[keep]
+        self.wx, self.wy = mercator(self.lat, self.lng)
+        self._levels = {}
+        self._lock = threading.Lock()
+
+    def level(self, z):
+        level = self._levels.get(z)
+        if level is None:
+            with self._lock:
+                level = self._levels.get(z)
+                if level is None:
+                    with stage("tile_level", rows=len(self.counts)):
+                        level = _Level(z, self.wx, self.wy, self.lat, self.lng, self.counts, self.labels)
+                    self._levels[z] = level
+        return level
+
+    def tile(self, z, x, y):
+        return self.level(z).tile(x, y)
+
+
+class MapTiles:
+    """TileIndex of the gazetteer cities per (data version, domains)."""
+
+    def __init__(self, crime_cube, gazetteer, max_entries=8):
+        self.crime_cube = crime_cube
+        self.gazetteer = gazetteer
+        self.max_entries = max_entries
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def index(self, domains=()):
+        key = (self.crime_cube.dataset.current_version(), tuple(sorted(domains)))
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                return index
+
+        cube = self.crime_cube.get()
+        if domains:
+            cube = cube[cube["Crime Domain"].isin(domains)]
+        counts = rollup(cube, "City").reindex(self.gazetteer.names, fill_value=0)
+        index = TileIndex(self.gazetteer.lat, self.gazetteer.lng, counts.to_numpy(), self.gazetteer.names)
+
+        with self._lock:
+            self._indexes[key] = index
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+        return index
@@ -0,0 +1,325 @@
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+
+# ==================================================
+# LIGHTWEIGHT STAGE INSTRUMENTATION
+# ==================================================
+# Handlers and the data/model layers wrap their expensive steps in
+# `stage("read_csv")`, `stage("model_fit")`, ... Each stage records its
+# duration, optional row count and RSS delta under the route of the
+# request it ran in ("background" outside requests). /metrics exposes
+# everything in the Prometheus text format. Cost per stage is two
+# perf_counter calls, one read of /proc/self/statm and a lock.
+#
+# Under gunicorn every worker keeps its own series, and a scrape is
+# answered by whichever worker gets it. With a metrics directory
+# (CRIME_METRICS_DIR, set up by gunicorn.conf.py) each process also
+# writes its series to <dir>/<pid>.json (from a thread, every
+# FLUSH_SECONDS while it has new data) and /metrics renders the sum
+# over all files. Files of exited workers
+# are kept so counters never go backwards; only the RSS gauge is
+# limited to live processes.
+
+# Seconds between snapshot writes to the metrics directory
+FLUSH_SECONDS = 1.0
+
+# Latency buckets in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_bytes():
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class Histogram:
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, counts, total, count):
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+        self.sum += total
+        self.count += count
+
+
+def _labels(**labels):
+    inner = ",".join(
+        '%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in labels.items()
+    )
+    return "{%s}" % inner if inner else ""
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Metrics:
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+        self.reset()
+
+    def reset(self):
+        # Forked workers start empty: the master's series are in its own file
+        self.request_latency = {}   # (route, method) -> Histogram
+        self.request_count = {}     # (route, status) -> int
+        self.stage_latency = {}     # (route, stage) -> Histogram
+        self.stage_rows = {}        # (route, stage) -> int
+        self.stage_rss = {}         # (route, stage) -> [sum of deltas, count]
+        self._dirty = False
+
+    # ---- Recording ----
+    def observe_request(self, route, method, status, seconds):
+        with self._lock:
+            self.request_latency.setdefault((route, method), Histogram()).observe(seconds)
+            key = (route, status)
+            self.request_count[key] = self.request_count.get(key, 0) + 1
+            self._dirty = True
+        if self.directory is not None and self._flusher_pid != os.getpid():
+            self._start_flusher()
+
+    def observe_stage(self, route, name, seconds, rows=None, rss_delta=None):
+        key = (route, name)
+        with self._lock:
+            self.stage_latency.setdefault(key, Histogram()).observe(seconds)
+            if rows is not None:
+                self.stage_rows[key] = self.stage_rows.get(key, 0) + int(rows)
+            if rss_delta is not None:
+                total = self.stage_rss.setdefault(key, [0, 0])
+                total[0] += rss_delta
+                total[1] += 1
+            self._dirty = True
+
+    # ---- Snapshots (metrics directory) ----
+    def snapshot(self):
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "rss": current_rss_bytes(),
+                "request_latency": [[*k, h.counts, h.sum, h.count] for k, h in self.request_latency.items()],
+                "request_count": [[*k, v] for k, v in self.request_count.items()],
+                "stage_latency": [[*k, h.counts, h.sum, h.count] for k, h in self.stage_latency.items()],
+                "stage_rows": [[*k, v] for k, v in self.stage_rows.items()],
+                "stage_rss": [[*k, *v] for k, v in self.stage_rss.items()]
+            }
+
+    def _start_flusher(self):
+        # One thread per process (threads do not survive a fork)
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+
+        def loop():
+            while True:
+                time.sleep(FLUSH_SECONDS)
+                if self._dirty:
+                    self.flush()
+
+        threading.Thread(target=loop, name="metrics-flush", daemon=True).start()
+
+    def flush(self):
+        if self.directory is None:
+            return
+        self._dirty = False
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        try:
+            with open(path + ".tmp", "w") as fh:
+                json.dump(self.snapshot(), fh)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            print("⚠️ Could not write metrics snapshot:", e)
+
+    def _collect(self):
+        # Sum of every process's snapshot (this one's is current)
+        self.flush()
+        total = Metrics()
+        rss = {}
+        for path in glob.glob(os.path.join(self.directory, "*.json")):
+            try:
+                with open(path) as fh:
+                    snap = json.load(fh)
+            except (OSError, ValueError):
+                continue
+            if _alive(snap["pid"]):
+                rss[snap["pid"]] = snap["rss"]
+            for route, method, counts, hist_sum, count in snap["request_latency"]:
+                total.request_latency.setdefault((route, method), Histogram()).merge(counts, hist_sum, count)
+            for route, status, count in snap["request_count"]:
+                total.request_count[(route, status)] = total.request_count.get((route, status), 0) + count
+            for route, name, counts, hist_sum, count in snap["stage_latency"]:
+                total.stage_latency.setdefault((route, name), Histogram()).merge(counts, hist_sum, count)
+            for route, name, rows in snap["stage_rows"]:
+                total.stage_rows[(route, name)] = total.stage_rows.get((route, name), 0) + rows
+            for route, name, delta, count in snap["stage_rss"]:
+                acc = total.stage_rss.setdefault((route, name), [0, 0])
+                acc[0] += delta
+                acc[1] += count
+        return total, rss
+
+    # ---- Exposition ----
+    def _histogram_lines(self, name, series, label_names):
+        lines = []
+        for key, hist in sorted(series.items()):
+            labels = dict(zip(label_names, key))
+            cumulative = 0
+            for bound, count in zip(hist.buckets, hist.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {hist.count}")
+            lines.append(f"{name}_sum{_labels(**labels)} {hist.sum:.6f}")
+            lines.append(f"{name}_count{_labels(**labels)} {hist.count}")
+        return lines
+
+    def render(self):
+        if self.directory is not None:
+            total, rss = self._collect()
+            return total._render(rss)
+        return self._render({os.getpid(): current_rss_bytes()})
+
+    def _render(self, rss):
+        with self._lock:
+            lines = [
+                "# HELP crime_request_duration_seconds Request latency per route.",
+                "# TYPE crime_request_duration_seconds histogram",
+            ]
+            lines += self._histogram_lines(
+                "crime_request_duration_seconds", self.request_latency, ("route", "method")
+            )
+
+            lines += [
+                "# HELP crime_requests_total Requests per route and status.",
+                "# TYPE crime_requests_total counter",
+            ]
+            for (route, status), count in sorted(self.request_count.items()):
+                lines.append(f"crime_requests_total{_labels(route=route, status=status)} {count}")
+
+            lines += [
+                "# HELP crime_stage_duration_seconds Latency per processing stage.",
+                "# TYPE crime_stage_duration_seconds histogram",
+            ]
+            lines += self._histogram_lines(
+                "crime_stage_duration_seconds", self.stage_latency, ("route", "stage")
+            )
+
+            lines += [
+                "# HELP crime_stage_rows_total Rows processed per stage.",
+                "# TYPE crime_stage_rows_total counter",
+            ]
+            for (route, name), rows in sorted(self.stage_rows.items()):
+                lines.append(f"crime_stage_rows_total{_labels(route=route, stage=name)} {rows}")
+
+            lines += [
+                "# HELP crime_stage_rss_delta_bytes Resident memory change across a stage.",
+                "# TYPE crime_stage_rss_delta_bytes summary",
+            ]
+            for (route, name), (total, count) in sorted(self.stage_rss.items()):
+                labels = _labels(route=route, stage=name)
+                lines.append(f"crime_stage_rss_delta_bytes_sum{labels} {total}")
+                lines.append(f"crime_stage_rss_delta_bytes_count{labels} {count}")
+
+            lines += [
+                "# HELP crime_process_resident_memory_bytes Current RSS per live process.",
+                "# TYPE crime_process_resident_memory_bytes gauge",
+            ]
+            for pid, value in sorted(rss.items()):
+                lines.append(f"crime_process_resident_memory_bytes{_labels(pid=pid)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def current_route():
+    if has_request_context():
+        return request.url_rule.rule if request.url_rule is not None else "unmatched"
+    return "background"
+
+
+class StageTimer:
+    """Handle yielded by stage(); set ``rows`` once the count is known."""
+
+    def __init__(self, rows=None):
+        self.rows = rows
+
+
+@contextmanager
+def stage(name, rows=None):
+    timer = StageTimer(rows)
+    rss_before = current_rss_bytes()
+    start = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        metrics.observe_stage(
+            current_route(),
+            name,
+            time.perf_counter() - start,
+            rows=timer.rows,
+            rss_delta=current_rss_bytes() - rss_before
+        )
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that times serialization as the "serialize" stage."""
+
+    def dumps(self, obj, **kwargs):
+        with stage("serialize"):
+            return super().dumps(obj, **kwargs)
+
+
+def init_metrics(app, directory=None):
+    """Request timing + JSON stage for ``app``; ``directory`` shares the
+    series of all processes (see the module comment)."""
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+        metrics.directory = directory
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def _start_timer():
+        request.environ["crime.start"] = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = request.environ.get("crime.start")
+        if start is not None:
+            metrics.observe_request(
+                current_route(),
+                request.method,
+                response.status_code,
+                time.perf_counter() - start
+            )
+        return response
@@ -0,0 +1,126 @@
+import json
+import os
+import shutil
+import time
+
+from metrics import stage
+from tree_engine import FlatEnsemble, HybridEnsemble
+
+
+# ==================================================
+# MODEL ARTIFACTS (MMAP-LOADABLE)
+# ==================================================
+# A model artifact is a directory:
+#
+#   meta.json       features, classes, encoder classes, data version, files
+#   model.joblib    the estimator, dumped uncompressed
+#   flat/           the same ensemble as flat node arrays (tree_engine)
+#
+# Uncompressed joblib files keep every numpy array as a raw buffer, so
+# joblib.load(mmap_mode="r") maps them instead of unpickling copies and
+# workers share those pages through the page cache. The metadata makes
+# the artifact self-describing: serving never has to refit encoders or
+# guess the feature order.
+#
+# sklearn copies tree nodes into its own buffers when unpickling, so the
+# serving path loads flat/ instead: every node array stays a mapping.
+
+ARTIFACT_FORMAT = 1
+META_FILE = "meta.json"
+MODEL_FILE = "model.joblib"
+FLAT_DIR = "flat"
+
+
+def _dir_bytes(path):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def read_artifact_meta(artifact_dir):
+    try:
+        with open(os.path.join(artifact_dir, META_FILE)) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return None
+
+
+def save_model_artifact(model, artifact_dir, encoder_classes=None, data_version=None, extra=None):
+    import joblib
+    import sklearn
+
+    tmp = artifact_dir + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    joblib.dump(model, os.path.join(tmp, MODEL_FILE), compress=0)
+
+    files = {"model": MODEL_FILE}
+    try:
+        FlatEnsemble.from_sklearn(model).save(os.path.join(tmp, FLAT_DIR))
+        files["flat"] = FLAT_DIR
+    except ValueError as e:
+        print(f"⚠️ {type(model).__name__} not flattened, serving it through sklearn:", e)
+
+    features = getattr(model, "feature_names_in_", None)
+    classes = getattr(model, "classes_", None)
+    meta = {
+        "format": ARTIFACT_FORMAT,
+        "estimator": type(model).__name__,
+        "features": [str(f) for f in features] if features is not None else None,
+        "classes": classes.tolist() if classes is not None else None,
+        "encoder_classes": encoder_classes or {},
+        "data_version": data_version,
+        "sklearn_version": sklearn.__version__,
+        "created_at": time.time(),
+        "files": files,
+        **(extra or {})
+    }
+    meta["bytes"] = _dir_bytes(tmp)
+    with open(os.path.join(tmp, META_FILE), "w") as fh:
+        json.dump(meta, fh, indent=2)
+
+    # Swap in the new directory; workers that mapped the old files keep
+    # their (unlinked) pages until they reload.
+    old = artifact_dir + ".old"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(artifact_dir):
+        os.replace(artifact_dir, old)
+    os.replace(tmp, artifact_dir)
+    shutil.rmtree(old, ignore_errors=True)
+    return meta
+
+
+def load_model_artifact(artifact_dir, mmap=True, flat=True):
+    """Returns (model, meta); meta gains load_seconds, mmap and engine.
+
+    With ``flat`` the flattened ensemble (switching to the sklearn model
+    for large batches) is returned when the artifact has one; it has the
+    same predict_proba / classes_ / feature_names_in_.
+    """
+    meta = read_artifact_meta(artifact_dir)
+    if meta is None:
+        raise FileNotFoundError(f"No model artifact at {artifact_dir}")
+
+    def load_sklearn():
+        import joblib
+
+        return joblib.load(
+            os.path.join(artifact_dir, meta["files"]["model"]),
+            mmap_mode="r" if mmap else None
+        )
+
+    start = time.perf_counter()
+    with stage("model_load"):
+        if flat and "flat" in meta["files"]:
+            engine = FlatEnsemble.load(os.path.join(artifact_dir, meta["files"]["flat"]), mmap=mmap)
+            model = HybridEnsemble(engine, load_sklearn)
+            meta["engine"] = "flat"
+        else:
+            model = load_sklearn()
+            meta["engine"] = "sklearn"
+    meta["load_seconds"] = round(time.perf_counter() - start, 3)
+    meta["mmap"] = mmap
+    return model, meta
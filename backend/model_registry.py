@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+
+from metrics import stage
+
+
+# ==================================================
+# MODEL REGISTRY
+# ==================================================
+# Trains each registered model at most once per dataset version and
+# keeps the result in memory and on disk (MODEL_DIR/registry/<name>.joblib).
+# A worker that starts after training picks the persisted bundle up
+# instead of refitting; a new dataset version triggers one retrain.
+#
+# A model registered with `chunks` (a streaming source with iter_chunks
+# and current_version) is trained out of core: its trainer receives the
+# source's iter_chunks instead of the in-memory frame, and it is
+# versioned by that source. A registered `backend` is stored with the
+# bundle, so switching backends retrains instead of reusing a bundle
+# from another backend.
+
+class ModelRegistry:
+
+    def __init__(self, dataset, registry_dir):
+        self.dataset = dataset
+        self.registry_dir = registry_dir
+        self._trainers = {}
+        self._backends = {}
+        self._sources = {}
+        self._bundles = {}
+        self._locks = {}
+        self._stale = {}     # name -> mtime of a persisted bundle for an old version
+
+    def register(self, name, trainer, backend=None, chunks=None):
+        self._trainers[name] = trainer
+        self._backends[name] = backend
+        self._sources[name] = chunks
+        self._locks[name] = threading.Lock()
+
+    def backend(self, name):
+        return self._backends[name]
+
+    def _version(self, name):
+        return (self._sources[name] or self.dataset).current_version()
+
+    def names(self):
+        return list(self._trainers)
+
+    def _path(self, name):
+        return os.path.join(self.registry_dir, f"{name}.joblib")
+
+    def _load_persisted(self, name, version):
+        path = self._path(name)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        if self._stale.get(name) == mtime:
+            return None
+        import joblib
+
+        try:
+            with stage("model_load"):
+                bundle = joblib.load(path, mmap_mode="r")
+        except Exception as e:
+            print(f"⚠️ Could not load registry model {name}:", e)
+            return None
+        if bundle.get("version") != version or bundle.get("backend") != self._backends[name]:
+            self._stale[name] = mtime
+            return None
+        return bundle
+
+    def _persist(self, name, bundle):
+        import joblib
+
+        os.makedirs(self.registry_dir, exist_ok=True)
+        tmp = self._path(name) + ".tmp"
+        joblib.dump(bundle, tmp)
+        os.replace(tmp, self._path(name))
+
+    def train(self, name):
+        source = self._sources[name]
+        start = time.perf_counter()
+        if source is not None:
+            version = source.current_version()
+            with stage("model_fit") as timer:
+                bundle = self._trainers[name](source.iter_chunks)
+                timer.rows = bundle.get("rows")
+        else:
+            df = self.dataset.frame()
+            version = self.dataset.version
+            with stage("model_fit", rows=len(df)):
+                bundle = self._trainers[name](df)
+        bundle["name"] = name
+        bundle["version"] = version
+        bundle["backend"] = self._backends[name]
+        bundle["trained_at"] = time.time()
+        bundle["train_seconds"] = round(time.perf_counter() - start, 3)
+
+        try:
+            self._persist(name, bundle)
+        except OSError as e:
+            print(f"⚠️ Could not persist registry model {name}:", e)
+        print(f"✅ Trained {name} in {bundle['train_seconds']}s (data version {version})")
+        return bundle
+
+    def _current(self, name, version, train):
+        bundle = self._bundles.get(name)
+        if bundle is not None and bundle["version"] == version:
+            return bundle
+
+        with self._locks[name]:
+            bundle = self._bundles.get(name)
+            if bundle is None or bundle["version"] != version:
+                bundle = self._load_persisted(name, version)
+                if bundle is None:
+                    if not train:
+                        return None
+                    bundle = self.train(name)
+                self._bundles[name] = bundle
+        return bundle
+
+    def get(self, name):
+        return self._current(name, self._version(name), train=True)
+
+    def peek(self, name):
+        # Current bundle if one is in memory or on disk, without training
+        return self._current(name, self._version(name), train=False)
+
+    def train_all(self):
+        return {name: self.get(name) for name in self._trainers}
@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+
+from metrics import stage
+
+
+# ==================================================
+# DEFERRED LOADING + WARMUP
+# ==================================================
+# Heavy imports (sklearn, scipy, joblib) happen where they are used, and
+# models / data load on first use, so importing the app (every gunicorn
+# worker boot) stays cheap. Warmup runs the same loads ahead of traffic
+# as named, timed steps:
+#
+#   run()    inline (the gunicorn master before forking, or
+#            `python app.py` before serving)
+#   start()  in a background thread of the current process. A warmup
+#            still running when the process forked is restarted in the
+#            child, where the thread does not exist; steps already done
+#            are cache hits there.
+#
+# The app is ready once every step has run without error; /readyz
+# starts the warmup if nothing else has.
+
+
+class Lazy:
+    """Value built by ``loader`` on first get(), once per process.
+
+    A failed load is remembered and re-raised instead of retried.
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.loaded = False
+        self.error = None
+        self._value = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if not self.loaded:
+            with self._lock:
+                if not self.loaded:
+                    try:
+                        self._value = self.loader()
+                    except Exception as e:
+                        self.error = e
+                    self.loaded = True
+        if self.error is not None:
+            raise self.error
+        return self._value
+
+
+class Warmup:
+    """Named warmup steps with per-step timings."""
+
+    def __init__(self):
+        self.steps = []
+        self.state = "pending"
+        self.timings = {}
+        self.errors = {}
+        self.seconds = None
+        self.imports = {}
+        self.pid = None
+        self._lock = threading.Lock()
+
+    def step(self, name, fn):
+        self.steps.append((name, fn))
+
+    def _claim(self):
+        # True when this call should run the steps
+        with self._lock:
+            if self.state == "ready" or (self.state == "running" and self.pid == os.getpid()):
+                return False
+            self.state = "running"
+            self.pid = os.getpid()
+            self.timings, self.errors = {}, {}
+            return True
+
+    def run(self):
+        if self._claim():
+            self._run()
+
+    def start(self):
+        if self._claim():
+            threading.Thread(target=self._run, name="warmup", daemon=True).start()
+
+    def _run(self):
+        start = time.perf_counter()
+        for name, fn in self.steps:
+            step_start = time.perf_counter()
+            try:
+                with stage(f"warmup_{name}"):
+                    fn()
+            except Exception as e:
+                self.errors[name] = str(e)
+                print(f"❌ Warmup step {name} failed:", e)
+            self.timings[name] = round(time.perf_counter() - step_start, 3)
+
+        self.seconds = round(time.perf_counter() - start, 3)
+        self.state = "ready"
+        print(f"✅ Warmup finished in {self.seconds}s"
+              + (f" ({len(self.errors)} failed)" if self.errors else ""))
+
+    @property
+    def ready(self):
+        return self.state == "ready" and not self.errors
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "state": self.state,
+            "imports": self.imports,
+            "warmup_seconds": self.seconds,
+            "steps": {
+                name: {
+                    "seconds": self.timings.get(name),
+                    **({"error": self.errors[name]} if name in self.errors else {})
+                }
+                for name, _ in self.steps
+            }
+        }
@@ -0,0 +1,197 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cube import build_cube, merge_cubes
+from dataset import _csv_stat, _file_digest, _mtime_seconds, guess_date_format, normalize_crime_frame
+from metrics import stage
+
+
+# ==================================================
+# BOUNDED-MEMORY STREAMING AGGREGATION
+# ==================================================
+# Walks CRIME_DATA in chunks of `chunk_size` rows and combines partial
+# results, so memory is bounded by the chunk size plus the size of the
+# aggregates (count cube cells, a few moments), never by the history.
+# Larger chunks trade memory for throughput.
+
+# Raw columns the count/statistics endpoints need
+STREAM_COLUMNS = [
+    "City",
+    "Date Reported",
+    "Time of Occurrence",
+    "Crime Domain",
+    "Victim Gender",
+    "Victim Age",
+    "Police Deployed"
+]
+
+DEFAULT_CHUNK_SIZE = 200_000
+
+
+class Moments:
+    """Mergeable count/mean/variance/co-moment for two columns.
+
+    Univariate means skip missing values per column (like Series.mean());
+    the co-moment uses pairwise complete rows (like DataFrame.dropna().corr()).
+    Partial results are combined with Chan et al.'s parallel update.
+    """
+
+    def __init__(self):
+        self.n_x = 0
+        self.sum_x = 0.0
+        self.n_y = 0
+        self.sum_y = 0.0
+        # pairwise-complete moments
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.m2_x = 0.0
+        self.m2_y = 0.0
+        self.c_xy = 0.0
+
+    def update(self, x, y):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+
+        ok_x = ~np.isnan(x)
+        ok_y = ~np.isnan(y)
+        self.n_x += int(ok_x.sum())
+        self.sum_x += float(x[ok_x].sum())
+        self.n_y += int(ok_y.sum())
+        self.sum_y += float(y[ok_y].sum())
+
+        both = ok_x & ok_y
+        n_b = int(both.sum())
+        if n_b == 0:
+            return
+        xb, yb = x[both], y[both]
+        mean_xb, mean_yb = xb.mean(), yb.mean()
+        dx, dy = xb - mean_xb, yb - mean_yb
+
+        n_a = self.n
+        n = n_a + n_b
+        delta_x = mean_xb - self.mean_x
+        delta_y = mean_yb - self.mean_y
+
+        self.m2_x += float(dx @ dx) + delta_x * delta_x * n_a * n_b / n
+        self.m2_y += float(dy @ dy) + delta_y * delta_y * n_a * n_b / n
+        self.c_xy += float(dx @ dy) + delta_x * delta_y * n_a * n_b / n
+        self.mean_x += delta_x * n_b / n
+        self.mean_y += delta_y * n_b / n
+        self.n = n
+
+    def mean(self, which):
+        if which == "x":
+            return self.sum_x / self.n_x if self.n_x else float("nan")
+        return self.sum_y / self.n_y if self.n_y else float("nan")
+
+    def corr(self):
+        if self.n < 2 or self.m2_x == 0 or self.m2_y == 0:
+            r = float("nan")
+        else:
+            r = self.c_xy / np.sqrt(self.m2_x * self.m2_y)
+        return np.array([[1.0, r], [r, 1.0]])
+
+
+class StreamingAggregates:
+
+    def __init__(self):
+        self.rows = 0
+        self.cube = None
+        self.socio = Moments()      # x = Victim Age, y = Police Deployed
+        self.age_counts = pd.Series(dtype="int64")
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+
+        partial = build_cube(chunk)
+        self.cube = partial if self.cube is None else merge_cubes(self.cube, partial)
+
+        age = pd.to_numeric(chunk["Victim Age"], errors="coerce")
+        police = pd.to_numeric(chunk["Police Deployed"], errors="coerce")
+        self.socio.update(age, police)
+
+        counts = age.dropna().astype(int).value_counts()
+        self.age_counts = self.age_counts.add(counts, fill_value=0).astype("int64")
+
+
+def iter_crime_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, columns=STREAM_COLUMNS):
+    """Yields normalized chunks of the crime CSV, ``chunk_size`` rows each."""
+    date_format = None
+    reader = pd.read_csv(
+        path,
+        usecols=lambda c: c.strip() in columns,
+        chunksize=chunk_size
+    )
+    with reader:
+        for chunk in reader:
+            chunk.columns = chunk.columns.str.strip()
+            # Pin the date format seen at the start of the file so every
+            # chunk parses "Date Reported" the way a full-file load would.
+            if date_format is None:
+                date_format = guess_date_format(chunk["Date Reported"])
+            yield normalize_crime_frame(chunk, date_format=date_format)
+
+
+def stream_aggregates(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    aggregates = StreamingAggregates()
+    for chunk in iter_crime_chunks(path, chunk_size):
+        with stage("stream_chunk", rows=len(chunk)):
+            aggregates.update(chunk)
+    return aggregates
+
+
+class StreamingCrimeSource:
+    """Drop-in data source for aggregate-only serving of large CSVs.
+
+    Exposes the same ``current_version()`` as CrimeDataset (same version
+    string for the same file), but never holds the incident rows.
+    """
+
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.version = None
+        self.modified = None
+        self._stat = None
+        self._aggregates = None
+        self._aggregates_version = None
+        self._lock = threading.Lock()
+
+    def current_version(self):
+        stat = _csv_stat(self.path)
+        if stat is None:
+            raise FileNotFoundError(f"Crime dataset not found: {self.path}")
+        if stat != self._stat:
+            with self._lock:
+                if stat != self._stat:
+                    self.version = f"{stat[0]}-{_file_digest(self.path)}"
+                    self.modified = _mtime_seconds(stat)
+                    self._stat = stat
+        return self.version
+
+    def last_modified(self):
+        self.current_version()
+        return self.modified
+
+    def aggregates(self):
+        version = self.current_version()
+        if version != self._aggregates_version:
+            with self._lock:
+                if version != self._aggregates_version:
+                    self._aggregates = stream_aggregates(self.path, self.chunk_size)
+                    self._aggregates_version = version
+                    print(f"✅ Streamed {self._aggregates.rows} rows "
+                          f"in chunks of {self.chunk_size} (version {version})")
+        return self._aggregates
+
+    def build_cube(self):
+        return self.aggregates().cube
+
+    def iter_chunks(self, columns=STREAM_COLUMNS):
+        return iter_crime_chunks(self.path, self.chunk_size, columns)
+
+    def frame(self):
+        raise RuntimeError("Row-level data is not loaded in streaming mode")
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from anomalies import AnomalyDetector, WindowStats
+
+
+def _stats():
+    keys = pd.DataFrame({"City": ["Delhi", "Pune"], "Crime Domain": ["Other Crime", "Other Crime"]})
+    ordinals = np.arange(24_000, 24_006)
+    Y = np.array([[5, 6, 5, 7, 6, 5], [1, 2, 1, 2, 1, 3]], dtype=float)
+    return WindowStats(keys, ordinals, Y)
+
+
+def test_append_does_not_modify_published_stats():
+    detector = AnomalyDetector(crime_cube=None)
+    before = _stats()
+    detector._state = ("v1", before)
+    keys, current, mean = before.keys.copy(), before.current.copy(), before.mean.copy()
+
+    # A new series in the current month and a new month for an old one
+    batch = pd.DataFrame({
+        "City": ["Agra", "Delhi"],
+        "Crime Domain": ["Other Crime", "Other Crime"],
+        "Year": [2000, 2000],
+        "Month": [6, 7]
+    })
+    after = detector.apply_batch(batch, "v1", "v2")
+
+    assert after is not before
+    assert detector._state == ("v2", after)
+    assert len(after) == 3 and len(after.current) == 3
+    pd.testing.assert_frame_equal(before.keys, keys)
+    np.testing.assert_array_equal(before.current, current)
+    np.testing.assert_array_equal(before.mean, mean)
+    assert len(before.scores()) == len(before.keys) == 2
+
+
+def test_stale_append_leaves_state_alone():
+    detector = AnomalyDetector(crime_cube=None)
+    detector._state = ("v1", _stats())
+    assert detector.apply_batch(pd.DataFrame(), "v0", "v2") is None
+    assert detector.version == "v1"
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from classifiers import HIST_MAX_BINS, train_category_model, train_location_model
+
+
+def _frame(cities, rows=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    names = np.array([f"City {i}" for i in range(cities)], dtype=object)
+    return pd.DataFrame({
+        "City": names[np.arange(rows) % cities],
+        "Date Reported": pd.Timestamp("2024-01-01"),
+        "Crime Domain": rng.choice(["Violent Crime", "Other Crime"], rows),
+        "Victim Age": rng.integers(10, 80, rows),
+        "Victim Gender": rng.choice(["M", "F", "X"], rows),
+        "Police Deployed": rng.integers(1, 20, rows),
+        "Month": rng.integers(1, 13, rows),
+        "hour": rng.integers(0, 24, rows)
+    })
+
+
+@pytest.mark.parametrize("cities", [12, HIST_MAX_BINS + 45])
+def test_hist_backend_trains_with_any_city_cardinality(cities):
+    df = _frame(cities)
+
+    category = train_category_model(df, backend="hist")
+    assert len(category["metrics"]["feature_importance"]) == len(category["features"])
+
+    location = train_location_model(df, backend="hist")
+    assert len(location["encoders"]["City"].classes_) == cities
+    assert 0 <= location["metrics"]["accuracy"] <= 1
+
+
+def test_hist_backend_keeps_small_cardinality_categorical():
+    model = train_location_model(_frame(12), backend="hist")["model"]
+    assert model.is_categorical_[0]
+
+    model = train_location_model(_frame(HIST_MAX_BINS + 45), backend="hist")["model"]
+    assert model.is_categorical_ is None or not model.is_categorical_.any()
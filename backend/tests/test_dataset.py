@@ -0,0 +1,53 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from dataset import CrimeDataset, ingest_csv
+
+HEADER = ("Report Number,Date Reported,Date of Occurrence,Time of Occurrence,City,Crime Code,"
+          "Crime Description,Victim Age,Victim Gender,Weapon Used,Crime Domain,Police Deployed,"
+          "Case Closed,Date Case Closed")
+
+
+def _row(number, date):
+    return f"{number},{date},{date},{date},Delhi,100,FRAUD,30,M,,Other Crime,5,No,"
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    csv = tmp_path / "crimes.csv"
+    csv.write_text("\n".join([HEADER, _row(1, "25-12-2024 10:00"), _row(2, "13-11-2024 09:30")]) + "\n")
+    ingest_csv(str(csv), str(tmp_path / "store"))
+    data = CrimeDataset(str(csv), store_path=str(tmp_path / "store"))
+    data.frame()
+    return data
+
+
+def _records(*rows):
+    return pd.read_csv(pd.io.common.StringIO("\n".join([HEADER, *rows]) + "\n"))
+
+
+def test_append_parses_ambiguous_dates_day_first(dataset):
+    added = dataset.append(_records(_row(3, "02-01-2025 11:00")))
+    assert added["Date Reported"].iloc[0] == pd.Timestamp("2025-01-02 11:00")
+    assert int(added["Month"].iloc[0]) == 1
+
+    frame = dataset.frame()
+    assert frame.loc[frame["Report Number"] == 3, "Date Reported"].iloc[0] == pd.Timestamp("2025-01-02 11:00")
+
+
+def test_append_rejects_non_numeric_report_numbers(dataset):
+    with pytest.raises(ValueError, match="Report Number"):
+        dataset.append(_records(_row("abc", "02-01-2025 11:00")))
+
+
+def test_touched_csv_keeps_the_store_until_its_content_changes(dataset):
+    path = Path(dataset.path)
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+    assert dataset.store_is_current()
+
+    # Same size, different content
+    path.write_text(path.read_text().replace("Delhi", "Dehli"))
+    assert not dataset.store_is_current()
@@ -0,0 +1,51 @@
+from flask import Flask, jsonify
+from werkzeug.http import parse_date
+
+from http_cache import ResponseCache
+
+MODIFIED = 1_700_000_000
+
+
+def _client(state):
+    app = Flask(__name__)
+    cache = ResponseCache(lambda: state["version"], lambda: state["modified"], min_gzip_bytes=0)
+
+    @app.route("/data")
+    @cache.cached
+    def data():
+        return jsonify({"rows": list(range(100))})
+
+    return app.test_client(), cache
+
+
+def test_last_modified_is_the_data_modification_time():
+    state = {"version": "v1", "modified": MODIFIED}
+    client, cache = _client(state)
+
+    first = client.get("/data")
+    cache.clear()
+    refilled = client.get("/data")
+
+    for response in (first, refilled):
+        assert parse_date(response.headers["Last-Modified"]).timestamp() == MODIFIED
+    assert client.get("/data", headers={
+        "If-Modified-Since": first.headers["Last-Modified"]
+    }).status_code == 304
+
+    state.update(version="v2", modified=MODIFIED + 60)
+    assert client.get("/data", headers={
+        "If-Modified-Since": first.headers["Last-Modified"]
+    }).status_code == 200
+
+
+def test_gzip_honors_accept_encoding_q_values():
+    client, _ = _client({"version": "v1", "modified": MODIFIED})
+
+    def encoding(accept):
+        return client.get("/data", headers={"Accept-Encoding": accept}).headers.get("Content-Encoding")
+
+    assert encoding("gzip, deflate") == "gzip"
+    assert encoding("*") == "gzip"
+    assert encoding("gzip;q=0") is None
+    assert encoding("gzip;q=0, *") is None
+    assert encoding("identity") is None
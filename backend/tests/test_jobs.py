@@ -0,0 +1,45 @@
+import subprocess
+import sys
+from concurrent.futures import Future
+
+from jobs import DONE, FAILED, QUEUED, Job, JobQueue, JobStore
+
+
+def square(x):
+    return {"value": x * x}
+
+
+def test_inline_job_is_visible_to_other_queues(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    job = JobQueue(max_workers=0, store_path=path).submit("math", square, 4)
+    assert job.finished
+
+    # Another worker's queue, same store
+    other = JobQueue(max_workers=0, store_path=path).get(job.id)
+    assert other.status == DONE
+    assert other.result() == {"value": 16}
+
+
+def test_key_in_flight_in_another_process_is_not_submitted_again(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    first = Job("train", ("train", "model", "v1"), Future())
+    assert store.claim(first, keep_finished=10) is None
+
+    second = Job("train", ("train", "model", "v1"), Future())
+    running = store.claim(second, keep_finished=10)
+    assert running.id == first.id
+    assert running.status == QUEUED
+
+
+def test_job_of_a_dead_process_is_failed(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job = Job("train", ("train", "model", "v1"), Future())
+    store.claim(job, keep_finished=10)
+
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    with store._connect() as db:
+        db.execute("UPDATE jobs SET pid = ? WHERE id = ?", (dead.pid, job.id))
+
+    assert store.get(job.id).status == FAILED
+    assert store.claim(Job("train", job.key, Future()), keep_finished=10) is None
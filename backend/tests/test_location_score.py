@@ -0,0 +1,23 @@
+import pytest
+
+SCORE = "/api/classification/location/score"
+
+
+@pytest.fixture(scope="module")
+def client():
+    import app
+    return app.app.test_client()
+
+
+@pytest.mark.parametrize("body, error", [
+    ({"rows": [{"city": "Delhi", "month": "x", "victim_age": "abc"}]}, "Non-numeric values in: ['month', 'victim_age']"),
+    ({"rows": [{"city": "Delhi", "police_deployed": "many"}]}, "Non-numeric values in: ['police_deployed']"),
+    ({"rows": [{"month": 3}, {"city": "Delhi"}]}, "Missing fields: ['city']"),
+    ({"grid": {"cities": ["Delhi"], "months": [1, "x"]}}, "Non-numeric values in: ['months']"),
+    ({"grid": {"cities": ["Delhi"], "victim_age": "old"}}, "Non-numeric values in: ['victim_age']"),
+    ({"grid": {"cities": ["Delhi", None]}}, "Expected 'cities' to be a list of city names"),
+])
+def test_invalid_fields_return_400(client, body, error):
+    response = client.post(SCORE, json=body)
+    assert response.status_code == 400
+    assert response.get_json()["error"] == error
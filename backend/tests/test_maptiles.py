@@ -0,0 +1,34 @@
+import numpy as np
+
+from maptiles import TileIndex
+
+
+def test_empty_index_returns_no_clusters():
+    index = TileIndex([], [], [], [])
+    assert index.tile(0, 0, 0) == []
+    assert index.tile(5, 22, 13) == []
+
+
+def test_filtered_out_points_return_no_clusters():
+    # Every point has a zero count, as with a domain filter matching nothing
+    index = TileIndex([28.6, 19.1], [77.2, 72.9], [0, 0], ["Delhi", "Mumbai"])
+    assert index.tile(0, 0, 0) == []
+
+
+def test_tile_endpoints_answer_200_for_filtered_out_domain():
+    import app
+
+    client = app.app.test_client()
+    response = client.get("/api/map/tiles/0/0/0?domain=Nope")
+    assert response.status_code == 200
+    assert response.get_json()["clusters"] == []
+
+    response = client.get("/api/map/clusters?south=5&west=60&north=40&east=100&zoom=3&domain=Nope")
+    assert response.status_code == 200
+    assert response.get_json()["clusters"] == []
+
+
+def test_level_totals_are_conserved():
+    counts = np.array([5, 3, 0, 7])
+    index = TileIndex([28.6, 19.1, 12.9, 13.0], [77.2, 72.9, 77.6, 80.2], counts, ["A", "B", "C", "D"])
+    assert sum(c["count"] for c in index.tile(0, 0, 0)) == counts.sum()
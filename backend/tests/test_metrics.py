@@ -0,0 +1,38 @@
+import json
+import re
+import subprocess
+import sys
+
+from metrics import Metrics
+
+
+def _total(text, route):
+    match = re.search(r'crime_requests_total\{route="%s",status="200"\} (\d+)' % re.escape(route), text)
+    return int(match.group(1)) if match else 0
+
+
+def test_render_sums_every_process_in_the_directory(tmp_path):
+    other = Metrics()
+    for _ in range(3):
+        other.observe_request("/api/dashboard", "GET", 200, 0.01)
+    snapshot = other.snapshot()
+
+    # A worker that has exited: its counters stay, its RSS gauge does not
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    snapshot["pid"] = dead.pid
+    (tmp_path / f"{dead.pid}.json").write_text(json.dumps(snapshot))
+
+    metrics = Metrics(str(tmp_path))
+    metrics.observe_request("/api/dashboard", "GET", 200, 0.02)
+    text = metrics.render()
+
+    assert _total(text, "/api/dashboard") == 4
+    assert 'crime_request_duration_seconds_count{route="/api/dashboard",method="GET"} 4' in text
+    assert f'pid="{dead.pid}"' not in text
+
+
+def test_without_directory_only_this_process_is_rendered():
+    metrics = Metrics()
+    metrics.observe_request("/healthz", "GET", 200, 0.001)
+    assert _total(metrics.render(), "/healthz") == 1
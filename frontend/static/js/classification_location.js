@@ -4,8 +4,7 @@ document.addEventListener("DOMContentLoaded", loadLocationPrediction);
 
 function loadLocationPrediction() {
 
-  fetch("/api/classification/location")
-    .then(res => res.json())
+  fetchWhenReady("/api/classification/location")
     .then(data => {
 
       if (data.error) {
@@ -99,3 +98,33 @@ function renderDistribution(data) {
     }
   });
 }
+
+/* ===============================
+   WAIT FOR BACKGROUND TRAINING
+   (202 = model is being trained)
+=============================== */
+function fetchWhenReady(url) {
+  return fetch(url).then(res => {
+    if (res.status !== 202) {
+      return res.json();
+    }
+    return res.json().then(accepted => waitForJob(accepted.status_url))
+      .then(() => fetchWhenReady(url));
+  });
+}
+
+function waitForJob(statusUrl) {
+  return new Promise((resolve, reject) => {
+    const poll = () => {
+      fetch(statusUrl)
+        .then(res => res.json())
+        .then(job => {
+          if (job.status === "done") resolve(job);
+          else if (job.status === "failed") reject(new Error(job.error));
+          else setTimeout(poll, 2000);
+        })
+        .catch(reject);
+    };
+    poll();
+  });
+}
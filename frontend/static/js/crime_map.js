@@ -1,6 +1,26 @@
 console.log("Crime map JS loaded");
 
-document.addEventListener("DOMContentLoaded", () => {
+// Up to this zoom the map shows one marker per city from the page's
+// batched panels request (home.js); zoomed in further it loads
+// clusters per tile.
+const CITY_MARKERS_MAX_ZOOM = 5;
+
+function crimeMarker(lat, lng, count, label) {
+  return L.circleMarker([lat, lng], {
+    radius: Math.sqrt(count) * 0.4,
+    fillColor: "#ec4899",
+    color: "#ec4899",
+    weight: 1,
+    opacity: 0.9,
+    fillOpacity: 0.45
+  })
+  .bindPopup(`
+    <strong>${label}</strong><br>
+    Crimes Reported: ${count}
+  `);
+}
+
+function createCrimeMap() {
 
   // Initialize map centered on India
   const map = L.map("crimeMap", {
@@ -19,33 +39,69 @@ setTimeout(() => {
     attribution: "&copy; OpenStreetMap contributors"
   }).addTo(map);
 
-  // Fetch crime data from backend
-  fetch("/api/map/crimes")
-    .then(res => res.json())
-    .then(data => {
-      console.log("Map data:", data);
+  // Crime clusters, fetched per map tile: the backend returns at most
+  // a fixed number of pre-aggregated clusters per tile at each zoom
+  const ClusterLayer = L.GridLayer.extend({
+
+    initialize(options) {
+      L.GridLayer.prototype.initialize.call(this, options);
+      this._markers = {};
+    },
 
-      data.forEach(item => {
+    createTile(coords, done) {
+      const tile = document.createElement("div");
+      const key = this._tileCoordsToKey(coords);
 
-        const radius = Math.sqrt(item.count) * 0.4;
+      fetch(`/api/map/tiles/${coords.z}/${coords.x}/${coords.y}`)
+        .then(res => res.json())
+        .then(data => {
+          // Tile may have been unloaded while the request was in flight
+          if (!this._tiles[key]) return;
 
-        L.circleMarker([item.lat, item.lng], {
-          radius: radius,
-          fillColor: "#ec4899",
-          color: "#ec4899",
-          weight: 1,
-          opacity: 0.9,
-          fillOpacity: 0.45
+          this._markers[key] = (data.clusters || []).map(item => {
+            const label = item.points > 1
+              ? `${item.label} + ${item.points - 1} more`
+              : item.label;
+
+            return crimeMarker(item.lat, item.lng, item.count, label).addTo(this._map);
+          });
+          done(null, tile);
         })
-        .addTo(map)
-        .bindPopup(`
-          <strong>${item.city}</strong><br>
-          Crimes Reported: ${item.count}
-        `);
-      });
-    })
-    .catch(err => {
-      console.error("Map load failed:", err);
-    });
-
-});
+        .catch(err => {
+          console.error("Map tile load failed:", err);
+          done(err, tile);
+        });
+
+      return tile;
+    }
+  });
+
+  const clusters = new ClusterLayer({ minZoom: CITY_MARKERS_MAX_ZOOM + 1 });
+
+  clusters.on("tileunload", e => {
+    const key = clusters._tileCoordsToKey(e.coords);
+    (clusters._markers[key] || []).forEach(marker => marker.remove());
+    delete clusters._markers[key];
+  });
+
+  clusters.addTo(map);
+
+  // City markers for the zoomed-out views
+  const cities = L.layerGroup();
+  const toggleCities = () => {
+    if (map.getZoom() <= CITY_MARKERS_MAX_ZOOM) cities.addTo(map);
+    else cities.remove();
+  };
+  map.on("zoomend", toggleCities);
+  toggleCities();
+
+  return {
+    map: map,
+    showCities(data) {
+      cities.clearLayers();
+      data.filter(d => d.count > 0).forEach(d =>
+        crimeMarker(d.lat, d.lng, d.count, d.city).addTo(cities)
+      );
+    }
+  };
+}
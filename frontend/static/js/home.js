@@ -1,11 +1,13 @@
 console.log("Home.js loaded — connecting to backend");
 
-window.addEventListener("load", fetchDashboardData);
+window.addEventListener("load", fetchHomePanels);
 
-function fetchDashboardData() {
-  console.log("Fetching /api/dashboard");
+function fetchHomePanels() {
+  console.log("Fetching /api/panels (dashboard, crime_map)");
+  const crimeMap = createCrimeMap();
 
-  fetch("/api/dashboard")
+  // KPI, charts and the map's city markers in one request
+  fetch("/api/panels?panels=dashboard,crime_map")
     .then(res => {
       if (!res.ok) {
         throw new Error("API response not OK");
@@ -13,18 +15,28 @@ function fetchDashboardData() {
       return res.json();
     })
     .then(data => {
-      console.log("Dashboard data received:", data);
+      const panels = data.panels || {};
+      Object.entries(data.errors || {}).forEach(([name, error]) =>
+        console.error(`Panel ${name} failed:`, error)
+      );
+
+      if (panels.dashboard) {
+        console.log("Dashboard data received:", panels.dashboard);
+
+        // KPI
+        const totalEl = document.getElementById("kpi-total");
+        if (totalEl) {
+          totalEl.innerText = panels.dashboard.total_records.toLocaleString();
+        }
 
-      // KPI
-      const totalEl = document.getElementById("kpi-total");
-      if (totalEl) {
-        totalEl.innerText = data.total_records.toLocaleString();
+        renderCharts(panels.dashboard);
+      }
+      if (panels.crime_map) {
+        crimeMap.showCities(panels.crime_map);
       }
-
-      renderCharts(data);
     })
     .catch(err => {
-      console.error("Dashboard fetch failed:", err);
+      console.error("Home panels fetch failed:", err);
     });
 }
 
@@ -114,38 +126,3 @@ function renderCharts(data) {
     }
   });
 }
-function loadCrimeMap() {
-
-  const map = L.map("crimeMap").setView([22.5, 80.9], 5);
-
-  L.tileLayer(
-    "https://{s}.basemaps.cartocdn.com/dark_all/{z}/{x}/{y}{r}.png"
-  ).addTo(map);
-
-  fetch("/api/map/crimes")
-    .then(res => res.json())
-    .then(data => {
-
-      data.forEach(d => {
-
-        const color =
-          d.count > 1500 ? "#ef4444" :
-          d.count > 800  ? "#a855f7" :
-                           "#22d3ee";
-
-        L.circleMarker([d.lat, d.lng], {
-          radius: Math.min(30, d.count / 30),
-          color: "#e0e7ff",
-          weight: 2,
-          fillColor: color,
-          fillOpacity: 0.85
-        })
-        .addTo(map)
-        .bindPopup(`
-          <strong>${d.city}</strong><br>
-          Total Crimes: ${d.count}
-        `);
-      });
-
-    });
-}
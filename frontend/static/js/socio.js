@@ -10,9 +10,19 @@ fetch("/api/criminogenic/socio")
     /* =========================
        1️⃣ BOX PLOT — AGE
     ========================= */
+    // Quartiles and fences are computed server-side
+    const box = data.age.box || {};
+
     Plotly.newPlot("ageBox", [{
-      y: data.ages,
       type: "box",
+      name: "Victim Age",
+      x: ["Victim Age"],
+      q1: [box.q1],
+      median: [box.median],
+      q3: [box.q3],
+      lowerfence: [box.lower_fence],
+      upperfence: [box.upper_fence],
+      mean: [data.age.mean],
       marker: { color: "#6366f1" }
     }], {
       title: "Victim Age Distribution",